@@ -1,11 +1,48 @@
 import frappe
 from frappe import _
-from frappe.utils import now_datetime, getdate, add_to_date, get_datetime
+from frappe.utils import now_datetime, getdate, add_to_date, get_datetime, cint
 from frappe.utils.caching import redis_cache
+from frappe.utils.data import get_system_timezone
+from zoneinfo import ZoneInfo
+import base64
+import datetime
 import json
 
+from on_desk.utils.activity_log import log_ticket_activity
+from on_desk.utils.capabilities import has_doctype
+from on_desk.utils.display_names import get_display_names
+from on_desk.utils.etag import (
+    NOT_MODIFIED,
+    conditional_get,
+    get_resource_version,
+    is_not_modified,
+    make_etag,
+    wants_etag,
+)
+from on_desk.utils.filter_options import (
+    get_cached_filter_options,
+    get_filter_role_scope,
+)
+from on_desk.utils.request_guard import idempotent, throttle
+from on_desk.utils.ticket_assignment import get_assigned_ticket_condition
+from on_desk.utils.ticket_cache import (
+    get_cached_ticket_list,
+    get_ticket_count,
+    make_ticket_cache_key,
+    normalize_ticket_filters,
+    set_cached_ticket_list,
+)
+from on_desk.utils.ticket_search import get_ranked_ticket_names, search_tickets
+
+# Tickets a client (IP or login session) can create in a burst, and how fast
+# that allowance comes back: 5 at once, then one per minute
+CREATE_TICKET_BURST = 5
+CREATE_TICKET_RATE = 1 / 60
+
 
 @frappe.whitelist(allow_guest=True)
+@idempotent("create_ticket")
+@throttle("create_ticket", rate=CREATE_TICKET_RATE, capacity=CREATE_TICKET_BURST)
 def create_ticket(**kwargs):
     """Create a new ticket in the system."""
     # Extract parameters from kwargs or form_dict
@@ -36,7 +73,7 @@ def create_ticket(**kwargs):
         )
 
         # Check if we have the HD Ticket doctype
-        if frappe.db.exists("DocType", "HD Ticket"):
+        if has_doctype("HD Ticket"):
             # Create a new ticket
             ticket = frappe.new_doc("HD Ticket")
 
@@ -59,7 +96,7 @@ def create_ticket(**kwargs):
             ticket.insert(ignore_permissions=False)
 
             # Create a sample activity log
-            create_ticket_activity(
+            log_ticket_activity(
                 ticket.name,
                 "Ticket Created",
                 f"Ticket was created by {frappe.session.user}",
@@ -133,30 +170,35 @@ def update_ticket(ticket, status=None, priority=None):
             frappe.throw(_("You don't have permission to update tickets"))
 
         ticket_doc = frappe.get_doc("HD Ticket", ticket)
+        activities = []
 
         # Update status if provided
         if status and ticket_doc.status != status:
-            old_status = ticket_doc.status
-            ticket_doc.status = status
-            create_ticket_activity(
-                ticket,
-                "Status Updated",
-                f"Status changed from {old_status} to {status}",
+            activities.append(
+                (
+                    "Status Updated",
+                    f"Status changed from {ticket_doc.status} to {status}",
+                )
             )
+            ticket_doc.status = status
 
         # Update priority if provided
         if priority and ticket_doc.priority != priority:
-            old_priority = ticket_doc.priority
-            ticket_doc.priority = priority
-            create_ticket_activity(
-                ticket,
-                "Priority Updated",
-                f"Priority changed from {old_priority} to {priority}",
+            activities.append(
+                (
+                    "Priority Updated",
+                    f"Priority changed from {ticket_doc.priority} to {priority}",
+                )
             )
+            ticket_doc.priority = priority
 
         # Save the changes
         ticket_doc.save(ignore_permissions=False)
 
+        # Logged once the save went through, written with the commit
+        for action, description in activities:
+            log_ticket_activity(ticket, action, description)
+
         return {"success": True, "message": _("Ticket updated successfully")}
     except Exception as e:
         frappe.log_error(f"Error updating ticket: {str(e)}", "Ticket Update Error")
@@ -192,7 +234,7 @@ def assign_ticket(ticket, user):
             }
         )
 
-        create_ticket_activity(ticket, "Assignment", f"Ticket assigned to {user}")
+        log_ticket_activity(ticket, "Assignment", f"Ticket assigned to {user}")
 
         return {"success": True, "message": _("Ticket assigned successfully")}
     except Exception as e:
@@ -220,7 +262,7 @@ def add_comment(ticket, comment):
         comment_doc.is_pinned = 0
         comment_doc.insert(ignore_permissions=False)
 
-        create_ticket_activity(
+        log_ticket_activity(
             ticket, "Comment Added", f"Comment added by {frappe.session.user}"
         )
 
@@ -234,35 +276,61 @@ def add_comment(ticket, comment):
         return {"success": False, "message": str(e)}
 
 
-def create_ticket_activity(ticket, action, description):
-    """Create an activity log entry for a ticket."""
-    try:
-        # Check if the HD Ticket Activity doctype exists
-        if frappe.db.exists("DocType", "HD Ticket Activity"):
-            activity = frappe.new_doc("HD Ticket Activity")
-            activity.reference_ticket = ticket
-            activity.action = action
-            activity.description = description
-            activity.insert(ignore_permissions=True)
-        else:
-            # Fallback to creating a Comment
-            frappe.get_doc(
-                {
-                    "doctype": "Comment",
-                    "comment_type": "Info",
-                    "reference_doctype": "ToDo",
-                    "reference_name": ticket,
-                    "content": f"{action}: {description}",
-                }
-            ).insert(ignore_permissions=True)
-    except Exception as e:
-        frappe.logger().error(f"Error creating activity log: {str(e)}")
+# Enhanced Filtering System API Functions
 
 
-# Enhanced Filtering System API Functions
+TICKET_LIST_FIELDS = [
+    "name",
+    "subject",
+    "status",
+    "priority",
+    "creation",
+    "modified",
+    "raised_by",
+    "contact",
+    "customer",
+    "agent_group",
+    "ticket_type",
+    "_assign",
+    "response_by",
+    "resolution_by",
+]
+
+# Columns the compact response format can return
+COMPACT_TICKET_FIELDS = TICKET_LIST_FIELDS + [
+    "status_color",
+    "priority_color",
+    "customer_name",
+    "assigned_agents",
+]
+
+DEFAULT_COMPACT_FIELDS = [
+    "name",
+    "subject",
+    "status",
+    "priority",
+    "status_color",
+    "priority_color",
+    "customer_name",
+    "assigned_agents",
+    "creation",
+    "modified",
+]
+
+# Sort keys that are never empty and backed by an index, so cursor pagination
+# can seek on (sort key, name) instead of skipping rows
+KEYSET_SORT_FIELDS = ["modified", "creation", "name"]
+
+# Typeahead searches return at most this many matches, the user types more
+# of the name instead of paging
+TYPEAHEAD_LIMIT = 20
+
+# Ticket fields counted by get_ticket_facets, keyed like the filters
+TICKET_FACET_FIELDS = ["status", "priority", "agent_group", "ticket_type"]
 
 
 @frappe.whitelist()
+@conditional_get
 def get_tickets_advanced(
     filters=None,
     search_text=None,
@@ -270,6 +338,12 @@ def get_tickets_advanced(
     sort_order="desc",
     page=1,
     page_size=20,
+    cursor=None,
+    pagination=None,
+    with_count=None,
+    count_mode="exact",
+    response_format=None,
+    fields=None,
 ):
     """
     Get tickets with advanced filtering, search, and pagination
@@ -281,6 +355,16 @@ def get_tickets_advanced(
         sort_order (str): Sort order (asc/desc)
         page (int): Page number for pagination
         page_size (int): Number of records per page
+        cursor (str): Opaque cursor returned as next_cursor/prev_cursor by a previous call
+        pagination (str): "cursor" to page on (sort key, name) instead of offsets.
+            Only sorts by KEYSET_SORT_FIELDS, searches are then not ranked
+        with_count (bool): Whether to count all matching tickets. Defaults to
+            true for offset pagination and false for cursor pagination
+        count_mode (str): "exact" or "estimated". Estimated mode returns the
+            planner's row estimate for very large result sets
+        response_format (str): "compact" to return columns once and rows as
+            arrays, with raw ISO timestamps instead of relative dates
+        fields (list): Columns to return in compact format
     """
     try:
         # Parse filters if passed as string
@@ -288,68 +372,121 @@ def get_tickets_advanced(
             filters = json.loads(filters) if filters else {}
 
         # Check if HD Ticket DocType exists
-        if not frappe.db.exists("DocType", "HD Ticket"):
+        if not has_doctype("HD Ticket"):
             return get_sample_tickets_advanced(
                 filters, search_text, sort_by, sort_order, page, page_size
             )
 
+        compact = response_format == "compact"
+        if compact:
+            fields = get_compact_ticket_fields(fields)
+
+        use_cursor = bool(cursor) or pagination == "cursor"
+        if use_cursor and (sort_by or "modified") not in KEYSET_SORT_FIELDS:
+            frappe.throw(
+                _("Cursor pagination can only sort by {0}").format(
+                    ", ".join(KEYSET_SORT_FIELDS)
+                ),
+                frappe.ValidationError,
+            )
+        if with_count is None:
+            with_count = not use_cursor
+        else:
+            with_count = cint(with_count)
+
+        # Serve repeated list calls of the same scope from the cache
+        scope = get_user_ticket_scope()
+        cache_key = make_ticket_cache_key(
+            "ticket_list",
+            scope,
+            normalize_ticket_filters(filters),
+            (search_text or "").strip(),
+            sort_by,
+            sort_order,
+            None if use_cursor else int(page),
+            int(page_size),
+            cursor,
+            use_cursor,
+            with_count,
+            count_mode,
+            fields if compact else None,
+        )
+        # The cache key changes whenever the tickets could, and the display
+        # names version when a customer or agent is renamed. Only compact
+        # results are served with an ETag, the others embed relative dates
+        # like "2 minutes ago" that go stale on their own.
+        if compact and is_not_modified(
+            make_etag(cache_key, get_resource_version("display_names"))
+        ):
+            return NOT_MODIFIED
+
+        cached = get_cached_ticket_list(cache_key)
+        if cached is not None:
+            return cached
+
         # Build base query conditions based on user role
-        base_conditions = get_user_ticket_conditions()
+        base_conditions = get_user_ticket_conditions(scope)
 
         # Build advanced filter conditions
         filter_conditions = build_filter_conditions(filters)
 
         # Build search conditions
-        search_conditions = build_search_conditions(search_text)
+        search_conditions, relevance = build_search_conditions(search_text)
 
         # Combine all conditions
         all_conditions = base_conditions + filter_conditions + search_conditions
 
-        # Build sort order
-        order_by = build_sort_order(sort_by, sort_order)
-
-        # Calculate pagination
-        start = (int(page) - 1) * int(page_size)
-
-        # Get tickets with all conditions
-        tickets = frappe.get_all(
-            "HD Ticket",
-            fields=[
-                "name",
-                "subject",
-                "status",
-                "priority",
-                "creation",
-                "modified",
-                "raised_by",
-                "contact",
-                "customer",
-                "agent_group",
-                "ticket_type",
-                "_assign",
-                "response_by",
-                "resolution_by",
-            ],
-            filters=all_conditions,
-            order_by=order_by,
-            start=start,
-            page_length=int(page_size),
-        )
+        page_size = int(page_size)
+        result = {"success": True, "page_size": page_size}
 
-        # Get total count for pagination
-        total_count = frappe.db.count("HD Ticket", filters=all_conditions)
+        if relevance and not sort_by and not use_cursor:
+            # Searches without an explicit sort are ordered by relevance
+            start = (int(page) - 1) * page_size
+            tickets = get_ticket_page_by_rank(
+                all_conditions, relevance, start, page_size
+            )
+            result["page"] = int(page)
+        elif use_cursor:
+            tickets, cursors = get_ticket_page_by_cursor(
+                all_conditions, sort_by, sort_order, cursor, page_size
+            )
+            result.update(cursors)
+        else:
+            # Build sort order
+            order_by = build_sort_order(sort_by, sort_order)
+
+            # Calculate pagination
+            start = (int(page) - 1) * page_size
+
+            # Get tickets with all conditions
+            tickets = frappe.get_all(
+                "HD Ticket",
+                fields=TICKET_LIST_FIELDS,
+                filters=all_conditions,
+                order_by=order_by,
+                start=start,
+                page_length=page_size,
+            )
+            result["page"] = int(page)
 
         # Enhance ticket data
-        enhanced_tickets = enhance_ticket_data(tickets)
+        if compact:
+            tickets = enhance_ticket_data(tickets, fields=fields, format_dates=False)
+            result.update(get_compact_ticket_rows(tickets, fields))
+        else:
+            result["tickets"] = enhance_ticket_data(tickets)
 
-        return {
-            "success": True,
-            "tickets": enhanced_tickets,
-            "total_count": total_count,
-            "page": int(page),
-            "page_size": int(page_size),
-            "total_pages": (total_count + int(page_size) - 1) // int(page_size),
-        }
+        # Get total count for pagination
+        if with_count:
+            total_count, estimated = get_ticket_count(
+                all_conditions, scope, count_mode
+            )
+            result["total_count"] = total_count
+            result["total_count_estimated"] = estimated
+            result["total_pages"] = (total_count + page_size - 1) // page_size
+
+        set_cached_ticket_list(cache_key, result)
+        return result
 
     except Exception as e:
         frappe.log_error(
@@ -358,35 +495,193 @@ def get_tickets_advanced(
         return {"success": False, "message": str(e), "tickets": [], "total_count": 0}
 
 
-def get_user_ticket_conditions():
-    """Get base filter conditions based on user role"""
-    user_roles = frappe.get_roles(frappe.session.user)
-    conditions = []
+def get_ticket_page_by_cursor(conditions, sort_by, sort_order, cursor, page_size):
+    """
+    Fetch one page of tickets by seeking past the (sort key, name) of a cursor.
+
+    Returns the tickets and a dict with next_cursor, prev_cursor and has_more.
+    """
+    sort_by = sort_by or "modified"
+    sort_order = "asc" if (sort_order or "").lower() == "asc" else "desc"
+
+    position = decode_ticket_cursor(cursor) if cursor else None
+    backwards = bool(position) and position.get("direction") == "prev"
+
+    # Walking backwards reads the previous page in reverse order
+    scan_order = sort_order
+    if backwards:
+        scan_order = "desc" if sort_order == "asc" else "asc"
+
+    conditions = list(conditions)
+    or_conditions = None
+    if position:
+        operator = "<" if scan_order == "desc" else ">"
+        # (sort_by, name) < (value, name) written as filters frappe understands:
+        # sort_by <= value AND (sort_by < value OR name < name)
+        conditions.append([sort_by, operator + "=", position["value"]])
+        if sort_by == "name":
+            conditions.append(["name", operator, position["name"]])
+        else:
+            or_conditions = [
+                [sort_by, operator, position["value"]],
+                ["name", operator, position["name"]],
+            ]
+
+    order_by = f"{sort_by} {scan_order}"
+    if sort_by != "name":
+        order_by += f", name {scan_order}"
+
+    tickets = frappe.get_all(
+        "HD Ticket",
+        fields=TICKET_LIST_FIELDS,
+        filters=conditions,
+        or_filters=or_conditions,
+        order_by=order_by,
+        page_length=page_size + 1,
+    )
+
+    has_more = len(tickets) > page_size
+    tickets = tickets[:page_size]
+    if backwards:
+        tickets.reverse()
+
+    cursors = {"next_cursor": None, "prev_cursor": None, "has_more": has_more}
+    if tickets:
+        first, last = tickets[0], tickets[-1]
+        has_next = has_more if not backwards else True
+        has_prev = bool(position) if not backwards else has_more
+        if has_next:
+            cursors["next_cursor"] = encode_ticket_cursor(last, sort_by, "next")
+        if has_prev:
+            cursors["prev_cursor"] = encode_ticket_cursor(first, sort_by, "prev")
+        cursors["has_more"] = has_next
+
+    return tickets, cursors
+
+
+def get_compact_ticket_fields(fields):
+    """Validate the columns requested for the compact format"""
+    if isinstance(fields, str):
+        fields = json.loads(fields) if fields.startswith("[") else fields.split(",")
+
+    fields = [field.strip() for field in fields or [] if field and field.strip()]
+    if not fields:
+        return list(DEFAULT_COMPACT_FIELDS)
+
+    unknown = [field for field in fields if field not in COMPACT_TICKET_FIELDS]
+    if unknown:
+        frappe.throw(_("Unknown ticket fields: {0}").format(", ".join(unknown)))
+
+    return fields
+
+
+def get_compact_ticket_rows(tickets, fields):
+    """Turn ticket dicts into a columns + rows payload"""
+    timezone = ZoneInfo(get_system_timezone())
+
+    def to_value(value):
+        # Raw timestamps stay valid forever, the client formats them
+        if isinstance(value, datetime.datetime):
+            return value.replace(tzinfo=timezone).isoformat(timespec="seconds")
+        if isinstance(value, datetime.date):
+            return value.isoformat()
+        return value
+
+    return {
+        "format": "compact",
+        "columns": fields,
+        "rows": [[to_value(ticket.get(field)) for field in fields] for ticket in tickets],
+    }
+
+
+def get_ticket_page_by_rank(conditions, relevance, start, page_size):
+    """Fetch one page of search results in relevance order"""
+    page_names = get_ranked_ticket_names(conditions, relevance, start, page_size)
+    if not page_names:
+        return []
+
+    tickets = frappe.get_all(
+        "HD Ticket",
+        fields=TICKET_LIST_FIELDS,
+        filters=[["name", "in", page_names]],
+    )
+    position = {name: i for i, name in enumerate(page_names)}
+    tickets.sort(key=lambda ticket: position[ticket.name])
+    return tickets
+
+
+def encode_ticket_cursor(ticket, sort_by, direction):
+    """Encode a ticket's position in the sort order as an opaque cursor"""
+    position = {
+        "value": str(ticket.get(sort_by)),
+        "name": ticket.get("name"),
+        "direction": direction,
+    }
+    return base64.urlsafe_b64encode(json.dumps(position).encode()).decode()
+
+
+def decode_ticket_cursor(cursor):
+    """Decode a cursor produced by encode_ticket_cursor"""
+    try:
+        position = json.loads(base64.urlsafe_b64decode(cursor.encode()).decode())
+    except Exception:
+        frappe.throw(_("Invalid pagination cursor"))
+
+    if not isinstance(position, dict) or not position.get("name"):
+        frappe.throw(_("Invalid pagination cursor"))
+
+    return position
+
+
+def get_user_ticket_scope(user=None):
+    """
+    Get the tickets a user can see as scope tokens
+
+    Users with the same tokens see the same tickets, so the tokens double as
+    the visibility part of ticket list cache keys.
+    """
+    user = user or frappe.session.user
+    user_roles = frappe.get_roles(user)
 
     if any(
         role in user_roles
         for role in ["Administrator", "System Manager", "Helpdesk Manager"]
     ):
-        # Admins and managers can see all tickets - no additional conditions
-        pass
+        # Admins and managers can see all tickets
+        return ["all"]
     elif "Helpdesk Agent" in user_roles or "Agent" in user_roles:
         # Agents can see tickets assigned to them or their team
         agent_groups = []
-        if frappe.db.exists("DocType", "HD Team Member"):
+        if has_doctype("HD Team Member"):
             agent_groups = frappe.get_all(
                 "HD Team Member",
-                filters={"user": frappe.session.user},
+                filters={"user": user},
                 fields=["parent"],
             )
-        agent_group_names = [d.parent for d in agent_groups]
+        agent_group_names = sorted(d.parent for d in agent_groups)
 
         if agent_group_names:
-            conditions.append(["agent_group", "in", agent_group_names])
-        else:
-            conditions.append(["_assign", "like", f"%{frappe.session.user}%"])
+            return [f"team:{name}" for name in agent_group_names]
+        return [f"assigned:{user}"]
     else:
         # Regular users can only see their own tickets
-        conditions.append(["raised_by", "=", frappe.session.user])
+        return [f"raised_by:{user}"]
+
+
+def get_user_ticket_conditions(scope=None):
+    """Get base filter conditions based on user role"""
+    scope = scope or get_user_ticket_scope()
+    conditions = []
+
+    teams = [token[len("team:") :] for token in scope if token.startswith("team:")]
+    if teams:
+        conditions.append(["agent_group", "in", teams])
+
+    for token in scope:
+        if token.startswith("assigned:"):
+            conditions.append(get_assigned_ticket_condition(token[len("assigned:") :]))
+        elif token.startswith("raised_by:"):
+            conditions.append(["raised_by", "=", token[len("raised_by:") :]])
 
     return conditions
 
@@ -435,7 +730,7 @@ def build_filter_conditions(filters):
 
     # Assigned Agent filter
     if filters.get("assigned_agent") and filters["assigned_agent"] != "All":
-        conditions.append(["_assign", "like", f"%{filters['assigned_agent']}%"])
+        conditions.append(get_assigned_ticket_condition(filters["assigned_agent"]))
 
     # Date range filters
     if filters.get("date_range"):
@@ -457,26 +752,13 @@ def build_filter_conditions(filters):
 
 
 def build_search_conditions(search_text):
-    """Build search conditions for text search across multiple fields"""
-    conditions = []
-
-    if not search_text or not search_text.strip():
-        return conditions
-
-    search_text = search_text.strip()
-
-    # Search across multiple fields using OR conditions
-    search_fields = ["name", "subject", "raised_by", "customer"]
-
-    # Build OR conditions for search
-    or_conditions = []
-    for field in search_fields:
-        or_conditions.append([field, "like", f"%{search_text}%"])
-
-    if or_conditions:
-        conditions.append(or_conditions)
+    """
+    Build search conditions for text search across multiple fields
 
-    return conditions
+    Returns the conditions and, for full-text matches, the query to rank
+    them by relevance with
+    """
+    return search_tickets(search_text)
 
 
 def build_sort_order(sort_by, sort_order):
@@ -490,8 +772,15 @@ def build_sort_order(sort_by, sort_order):
     return f"{sort_by} {sort_order}"
 
 
-def enhance_ticket_data(tickets):
-    """Enhance ticket data with additional information"""
+def enhance_ticket_data(tickets, fields=None, format_dates=True):
+    """
+    Enhance ticket data with additional information
+
+    Args:
+        tickets (list): Ticket rows to enhance in place
+        fields (list): Only compute the extra fields in this list
+        format_dates (bool): Add relative creation/modified dates
+    """
     try:
         from on_desk.www.on_desk.tickets.index import (
             pretty_date,
@@ -517,38 +806,48 @@ def enhance_ticket_data(tickets):
             color_map = {"High": "danger", "Medium": "warning", "Low": "success"}
             return color_map.get(priority, "secondary")
 
+    def wanted(field):
+        return fields is None or field in fields
+
+    # Resolve customers and assignees for the whole page at once
+    customer_names = {}
+    if wanted("customer_name") and has_doctype("HD Customer"):
+        customer_names = get_display_names(
+            "HD Customer", [ticket.get("customer") for ticket in tickets]
+        )
+
+    assignees = {}
+    for ticket in tickets if wanted("assigned_agents") else []:
+        try:
+            assignees[ticket.get("name")] = (
+                json.loads(ticket.get("_assign")) if ticket.get("_assign") else []
+            )
+        except ValueError:
+            assignees[ticket.get("name")] = []
+
+    agent_names = get_display_names(
+        "User", [user for users in assignees.values() for user in users]
+    )
+
     for ticket in tickets:
         # Format dates
-        ticket.creation_formatted = pretty_date(ticket.creation)
-        ticket.modified_formatted = pretty_date(ticket.modified)
+        if format_dates:
+            ticket.creation_formatted = pretty_date(ticket.creation)
+            ticket.modified_formatted = pretty_date(ticket.modified)
 
         # Get status and priority colors
         ticket.status_color = get_status_color(ticket.status)
         ticket.priority_color = get_priority_color(ticket.priority)
 
         # Get customer name if available
-        if ticket.customer and frappe.db.exists("DocType", "HD Customer"):
-            try:
-                customer_doc = frappe.get_cached_doc("HD Customer", ticket.customer)
-                ticket.customer_name = customer_doc.customer_name or customer_doc.name
-            except:
-                ticket.customer_name = ticket.raised_by
-        else:
-            ticket.customer_name = ticket.raised_by
+        ticket.customer_name = (
+            customer_names.get(ticket.get("customer")) or ticket.get("raised_by")
+        )
 
         # Get assigned agent names
-        if ticket._assign:
-            try:
-                assigned_users = json.loads(ticket._assign) if ticket._assign else []
-                agent_names = []
-                for user in assigned_users:
-                    user_doc = frappe.get_cached_doc("User", user)
-                    agent_names.append(user_doc.full_name or user)
-                ticket.assigned_agents = ", ".join(agent_names)
-            except:
-                ticket.assigned_agents = ""
-        else:
-            ticket.assigned_agents = ""
+        ticket.assigned_agents = ", ".join(
+            agent_names.get(user, user) for user in assignees.get(ticket.get("name"), [])
+        )
 
     return tickets
 
@@ -638,18 +937,254 @@ def get_sample_tickets_advanced(
 
 
 @frappe.whitelist()
+def export_tickets(
+    filters=None, search_text=None, sort_by=None, sort_order="desc", file_format="CSV"
+):
+    """
+    Export the tickets matching a ticket list query
+
+    Args:
+        filters (dict): Advanced filter criteria, as for get_tickets_advanced
+        search_text (str): Text to search across multiple fields
+        sort_by (str): Field to sort by
+        sort_order (str): Sort order (asc/desc)
+        file_format (str): "CSV" to download directly, "XLSX" to build the
+            file in a background job and get its URL through the
+            on_desk_ticket_export realtime event
+    """
+    # Import here to avoid circular import
+    from on_desk.utils.ticket_export import export_tickets_csv
+
+    if isinstance(filters, str):
+        filters = json.loads(filters) if filters else {}
+
+    if not has_doctype("HD Ticket"):
+        frappe.throw(_("Tickets are not available"))
+
+    if (file_format or "").upper() == "XLSX":
+        frappe.enqueue(
+            "on_desk.utils.ticket_export.export_tickets_xlsx",
+            queue="long",
+            timeout=3600,
+            user=frappe.session.user,
+            filters=filters,
+            search_text=search_text,
+            sort_by=sort_by,
+            sort_order=sort_order,
+        )
+        return {
+            "success": True,
+            "message": _("Your export is being prepared, you will be notified when it is ready"),
+        }
+
+    return export_tickets_csv(filters, search_text, sort_by, sort_order)
+
+
+def parse_bulk_tickets(tickets, filters):
+    """
+    Parse the tickets and filters arguments of the bulk endpoints
+
+    Args:
+        tickets (list | str): Ticket names, as a list, a JSON array or a
+            comma separated string
+        filters (dict | str): Advanced filter criteria, or the same as JSON
+
+    Returns:
+        tuple: (ticket names without blanks, filters dict)
+    """
+    if isinstance(tickets, str):
+        tickets = json.loads(tickets) if tickets.startswith("[") else tickets.split(",")
+    tickets = [ticket.strip() for ticket in tickets or [] if ticket and ticket.strip()]
+
+    if isinstance(filters, str):
+        filters = json.loads(filters) if filters else {}
+
+    return tickets, filters
+
+
+@frappe.whitelist()
+def bulk_update_tickets(
+    tickets=None, filters=None, search_text=None, status=None, priority=None
+):
+    """
+    Set the status and/or priority of many tickets at once
+
+    Args:
+        tickets (list): Ticket names, takes precedence over filters
+        filters (dict): Advanced filter criteria, as for get_tickets_advanced
+        search_text (str): Text to search across multiple fields
+        status (str): New status
+        priority (str): New priority
+
+    Sets of more than BULK_BACKGROUND_THRESHOLD tickets are updated in a
+    background job, which reports through the on_desk_bulk_ticket_progress
+    and on_desk_bulk_ticket_done realtime events.
+    """
+    # Import here to avoid circular import
+    from on_desk.utils.bulk_tickets import get_bulk_ticket_names, start_bulk_operation
+
+    try:
+        if not frappe.has_permission("HD Ticket", "write"):
+            frappe.throw(_("You don't have permission to update tickets"))
+
+        values = {
+            field: value
+            for field, value in (("status", status), ("priority", priority))
+            if value
+        }
+        if not values:
+            frappe.throw(_("Select a status or priority to set"))
+
+        tickets, filters = parse_bulk_tickets(tickets, filters)
+        names = get_bulk_ticket_names(tickets, filters, search_text)
+
+        return start_bulk_operation("update", names, values=values)
+    except Exception as e:
+        frappe.log_error(f"Error updating tickets: {str(e)}", "Bulk Ticket Error")
+        return {"success": False, "message": str(e)}
+
+
+@frappe.whitelist()
+def bulk_assign_tickets(user, tickets=None, filters=None, search_text=None):
+    """
+    Assign many tickets to a user at once
+
+    Args:
+        user (str): User the tickets are assigned to
+        tickets (list): Ticket names, takes precedence over filters
+        filters (dict): Advanced filter criteria, as for get_tickets_advanced
+        search_text (str): Text to search across multiple fields
+
+    Large sets run in a background job, as with bulk_update_tickets.
+    """
+    # Import here to avoid circular import
+    from on_desk.utils.bulk_tickets import get_bulk_ticket_names, start_bulk_operation
+
+    try:
+        if not frappe.has_permission("HD Ticket", "write"):
+            frappe.throw(_("You don't have permission to assign tickets"))
+
+        if not frappe.db.exists("User", user):
+            frappe.throw(_("User {0} does not exist").format(user))
+
+        tickets, filters = parse_bulk_tickets(tickets, filters)
+        names = get_bulk_ticket_names(tickets, filters, search_text)
+
+        return start_bulk_operation("assign", names, assignee=user)
+    except Exception as e:
+        frappe.log_error(f"Error assigning tickets: {str(e)}", "Bulk Ticket Error")
+        return {"success": False, "message": str(e)}
+
+
+@frappe.whitelist()
+@conditional_get
+def get_ticket_facets(filters=None, search_text=None):
+    """
+    Count matching tickets per status, priority, team and type
+
+    Each facet is counted with every filter except its own, so the counts
+    show what selecting another value would return.
+
+    Args:
+        filters (dict): Advanced filter criteria, as for get_tickets_advanced
+        search_text (str): Text to search across multiple fields
+    """
+    try:
+        if isinstance(filters, str):
+            filters = json.loads(filters) if filters else {}
+        filters = normalize_ticket_filters(filters)
+
+        if not has_doctype("HD Ticket"):
+            return {"success": True, "facets": {}}
+
+        scope = get_user_ticket_scope()
+        cache_key = make_ticket_cache_key(
+            "ticket_facets", scope, filters, (search_text or "").strip()
+        )
+        if is_not_modified(make_etag(cache_key)):
+            return NOT_MODIFIED
+
+        cached = get_cached_ticket_list(cache_key)
+        if cached is not None:
+            return cached
+
+        base_conditions = get_user_ticket_conditions(scope)
+        search_conditions, _relevance = build_search_conditions(search_text)
+
+        # One grouped query per facet, sent to the database as a single UNION
+        queries = []
+        for field in TICKET_FACET_FIELDS:
+            other_filters = {k: v for k, v in filters.items() if k != field}
+            query = frappe.get_all(
+                "HD Ticket",
+                fields=[f"{field} as value", "count(*) as count"],
+                filters=base_conditions
+                + build_filter_conditions(other_filters)
+                + search_conditions,
+                group_by=field,
+                order_by=f"{field} asc",
+                run=0,
+            )
+            queries.append(
+                f"SELECT {frappe.db.escape(field)} AS facet, value, count FROM ({query}) AS f"
+            )
+
+        facets = {field: [] for field in TICKET_FACET_FIELDS}
+        for row in frappe.db.sql(" UNION ALL ".join(queries), as_dict=True):
+            if row.value:
+                facets[row.facet].append({"name": row.value, "count": cint(row.count)})
+
+        for counts in facets.values():
+            counts.sort(key=lambda d: d["count"], reverse=True)
+
+        result = {"success": True, "facets": facets}
+        set_cached_ticket_list(cache_key, result)
+        return result
+
+    except Exception as e:
+        frappe.log_error(f"Error getting ticket facets: {str(e)}", "Ticket Facets Error")
+        return {"success": False, "message": str(e)}
+
+
+@frappe.whitelist()
+def get_filter_presets():
+    """Get the current user's filter presets with their match counts"""
+    try:
+        # Import here to avoid circular import
+        from on_desk.on_desk.doctype.od_filter_preset.od_filter_preset import (
+            get_user_filter_presets,
+        )
+        from on_desk.utils.preset_counts import get_preset_counts
+
+        presets = get_user_filter_presets()
+
+        counts = {}
+        if has_doctype("HD Ticket"):
+            counts = get_preset_counts(presets)
+
+        for preset in presets:
+            preset.match_count = counts.get(preset.name)
+
+        return {"success": True, "presets": presets}
+    except Exception as e:
+        frappe.log_error(
+            f"Error getting filter presets: {str(e)}", "Filter Presets Error"
+        )
+        return {"success": False, "message": str(e)}
+
+
+@frappe.whitelist()
+@conditional_get
 def get_filter_options():
     """Get all available filter options for tickets"""
     try:
-        options = {
-            "statuses": get_ticket_statuses_for_filter(),
-            "priorities": get_ticket_priorities_for_filter(),
-            "agent_groups": get_agent_groups_for_filter(),
-            "ticket_types": get_ticket_types_for_filter(),
-            "customers": get_customers_for_filter(),
-            "agents": get_agents_for_filter(),
-        }
-        return {"success": True, "options": options}
+        role_scope = get_filter_role_scope()
+        if wants_etag() and is_not_modified(
+            make_etag(get_resource_version("filter_options"), role_scope)
+        ):
+            return NOT_MODIFIED
+
+        return {"success": True, "options": get_cached_filter_options(role_scope)}
     except Exception as e:
         frappe.log_error(
             f"Error getting filter options: {str(e)}", "Filter Options Error"
@@ -657,10 +1192,22 @@ def get_filter_options():
         return {"success": False, "message": str(e)}
 
 
+def build_filter_options():
+    """Build the filter options bundle cached by get_cached_filter_options"""
+    return {
+        "statuses": get_ticket_statuses_for_filter(),
+        "priorities": get_ticket_priorities_for_filter(),
+        "agent_groups": get_agent_groups_for_filter(),
+        "ticket_types": get_ticket_types_for_filter(),
+        "customers": get_customers_for_filter(),
+        "agents": get_agents_for_filter(),
+    }
+
+
 def get_ticket_statuses_for_filter():
     """Get ticket statuses for filtering"""
     try:
-        if frappe.db.exists("DocType", "HD Ticket"):
+        if has_doctype("HD Ticket"):
             # Get unique statuses from tickets
             statuses = frappe.db.sql(
                 """
@@ -691,13 +1238,13 @@ def get_ticket_statuses_for_filter():
 def get_ticket_priorities_for_filter():
     """Get ticket priorities for filtering"""
     try:
-        if frappe.db.exists("DocType", "HD Ticket Priority"):
+        if has_doctype("HD Ticket Priority"):
             priorities = frappe.get_all(
                 "HD Ticket Priority",
                 fields=["name", "name as label"],
                 order_by="integer_value",
             )
-        elif frappe.db.exists("DocType", "HD Ticket"):
+        elif has_doctype("HD Ticket"):
             # Get unique priorities from tickets
             priorities = frappe.db.sql(
                 """
@@ -726,7 +1273,7 @@ def get_ticket_priorities_for_filter():
 def get_agent_groups_for_filter():
     """Get agent groups for filtering"""
     try:
-        if frappe.db.exists("DocType", "HD Team"):
+        if has_doctype("HD Team"):
             groups = frappe.get_all(
                 "HD Team", fields=["name", "team_name as label"], order_by="team_name"
             )
@@ -743,7 +1290,7 @@ def get_agent_groups_for_filter():
 def get_ticket_types_for_filter():
     """Get ticket types for filtering"""
     try:
-        if frappe.db.exists("DocType", "HD Ticket Type"):
+        if has_doctype("HD Ticket Type"):
             types = frappe.get_all(
                 "HD Ticket Type", fields=["name", "name as label"], order_by="name"
             )
@@ -759,49 +1306,134 @@ def get_ticket_types_for_filter():
 
 def get_customers_for_filter():
     """Get customers for filtering"""
-    try:
-        if frappe.db.exists("DocType", "HD Customer"):
-            customers = frappe.get_all(
-                "HD Customer",
-                fields=["name", "customer_name as label"],
-                order_by="customer_name",
-                limit=100,  # Limit to avoid too many options
-            )
-        else:
-            customers = []
-
-        # Add "All" option at the beginning
-        customers.insert(0, {"name": "All", "label": "All Customers"})
-        return customers
-    except Exception:
-        return [{"name": "All", "label": "All Customers"}]
+    # Customers are searched on demand with search_customers
+    return [{"name": "All", "label": "All Customers"}]
 
 
 def get_agents_for_filter():
     """Get agents for filtering"""
-    try:
-        if frappe.db.exists("DocType", "HD Agent"):
-            agents = frappe.get_all(
-                "HD Agent",
-                fields=["user as name", "agent_name as label"],
-                filters={"is_active": 1},
-                order_by="agent_name",
-            )
-        else:
-            # Get users with Agent role
-            agents = frappe.db.sql(
-                """
-                SELECT DISTINCT u.name, u.full_name as label
-                FROM `tabUser` u
-                INNER JOIN `tabHas Role` hr ON hr.parent = u.name
-                WHERE hr.role = 'Agent' AND u.enabled = 1
-                ORDER BY u.full_name
-            """,
-                as_dict=True,
-            )
+    # Agents are searched on demand with search_agents
+    return [{"name": "All", "label": "All Agents"}]
 
-        # Add "All" option at the beginning
-        agents.insert(0, {"name": "All", "label": "All Agents"})
-        return agents
-    except Exception:
-        return [{"name": "All", "label": "All Agents"}]
+
+def escape_like(txt):
+    """Escape LIKE wildcards so user input only matches literally"""
+    return txt.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_")
+
+
+def search_by_prefix(doctype, fields, label_field, txt, limit, filters=None):
+    """
+    Find records whose label or name starts with txt, in label order.
+
+    Prefix LIKE patterns are range scans on the label and name indexes, and
+    the results are capped at TYPEAHEAD_LIMIT.
+    """
+    txt = (txt or "").strip()
+    limit = min(cint(limit) or TYPEAHEAD_LIMIT, TYPEAHEAD_LIMIT)
+
+    or_filters = None
+    if txt:
+        pattern = f"{escape_like(txt)}%"
+        or_filters = [[label_field, "like", pattern], ["name", "like", pattern]]
+
+    return frappe.get_all(
+        doctype,
+        fields=fields,
+        filters=filters,
+        or_filters=or_filters,
+        order_by=f"{label_field} asc",
+        limit=limit,
+    )
+
+
+def can_search_directory():
+    """Customers, contacts and agents are only listed to agents and managers"""
+    return get_filter_role_scope() != "customer"
+
+
+@frappe.whitelist()
+def search_customers(txt=None, limit=TYPEAHEAD_LIMIT):
+    """
+    Search customers by name prefix for typeahead fields
+
+    Args:
+        txt (str): Start of the customer name or ID
+        limit (int): Maximum number of results
+    """
+    if not can_search_directory() or not has_doctype("HD Customer"):
+        return {"success": True, "results": []}
+
+    results = search_by_prefix(
+        "HD Customer",
+        ["name", "customer_name as label"],
+        "customer_name",
+        txt,
+        limit,
+    )
+    return {"success": True, "results": results}
+
+
+@frappe.whitelist()
+def search_contacts(txt=None, limit=TYPEAHEAD_LIMIT):
+    """
+    Search contacts by name prefix for typeahead fields
+
+    Args:
+        txt (str): Start of the contact name or ID
+        limit (int): Maximum number of results
+    """
+    if not can_search_directory():
+        return {"success": True, "results": []}
+
+    results = search_by_prefix(
+        "Contact",
+        ["name", "full_name as label", "email_id", "mobile_no"],
+        "full_name",
+        txt,
+        limit,
+    )
+    return {"success": True, "results": results}
+
+
+@frappe.whitelist()
+def search_agents(txt=None, limit=TYPEAHEAD_LIMIT):
+    """
+    Search active agents by name prefix for typeahead fields
+
+    Args:
+        txt (str): Start of the agent name or user ID
+        limit (int): Maximum number of results
+    """
+    if not can_search_directory():
+        return {"success": True, "results": []}
+
+    if has_doctype("HD Agent"):
+        results = search_by_prefix(
+            "HD Agent",
+            ["user as name", "agent_name as label"],
+            "agent_name",
+            txt,
+            limit,
+            filters={"is_active": 1},
+        )
+    else:
+        # Users with the Agent role
+        txt = (txt or "").strip()
+        results = frappe.db.sql(
+            """
+            SELECT DISTINCT u.name, u.full_name as label
+            FROM `tabUser` u
+            INNER JOIN `tabHas Role` hr ON hr.parent = u.name
+            WHERE hr.role = 'Agent' AND u.enabled = 1
+                AND (u.full_name LIKE %(pattern)s OR u.name LIKE %(pattern)s)
+            ORDER BY u.full_name
+            LIMIT %(limit)s
+        """,
+            {
+                "pattern": f"{escape_like(txt)}%",
+                "limit": min(cint(limit) or TYPEAHEAD_LIMIT, TYPEAHEAD_LIMIT),
+            },
+            as_dict=True,
+        )
+
+    return {"success": True, "results": results}
@@ -11,7 +11,10 @@ app_license = "mit"
 
 # include js, css files in header of desk.html
 # app_include_css = "/assets/on_desk/css/on_desk.css"
-app_include_js = "/assets/on_desk/js/hd_ticket_whatsapp.js"
+app_include_js = [
+    "/assets/on_desk/js/conditional_call.js",
+    "/assets/on_desk/js/hd_ticket_whatsapp.js",
+]
 
 # include js, css files in header of web template
 web_include_css = [
@@ -98,8 +101,20 @@ website_redirects = [
 # ------------
 
 # before_install = "on_desk.install.before_install"
-after_install = "on_desk.setup.whatsapp_integration.setup_whatsapp_integration"
-after_migrate = "on_desk.setup.whatsapp_integration.setup_whatsapp_integration"
+after_install = [
+    "on_desk.setup.whatsapp_integration.setup_whatsapp_integration",
+    "on_desk.setup.indexes.add_query_indexes",
+    "on_desk.utils.capabilities.refresh_capabilities",
+]
+after_migrate = [
+    "on_desk.setup.whatsapp_integration.setup_whatsapp_integration",
+    "on_desk.utils.ticket_search.setup_ticket_search_index",
+    "on_desk.utils.ticket_assignment.setup_ticket_assignment_index",
+    "on_desk.utils.capabilities.refresh_capabilities",
+    "on_desk.utils.filter_options.warm_filter_options",
+    "on_desk.utils.dashboard_counters.reconcile_dashboard_counters",
+    "on_desk.utils.response_times.rebuild_response_sketches",
+]
 
 # Uninstallation
 # ------------
@@ -155,9 +170,99 @@ after_migrate = "on_desk.setup.whatsapp_integration.setup_whatsapp_integration"
 
 doc_events = {
     "HD Ticket": {
-        "on_update": "on_desk.on_desk.doctype.od_whatsapp_integration.api.process_ticket_update",
-        "after_insert": "on_desk.on_desk.doctype.od_whatsapp_integration.api.process_ticket_creation",
-    }
+        "on_update": [
+            "on_desk.on_desk.doctype.od_whatsapp_integration.api.process_ticket_update",
+            "on_desk.utils.ticket_cache.invalidate_ticket_scopes",
+            "on_desk.utils.ticket_search.update_ticket_search_index",
+            "on_desk.utils.filter_options.invalidate_ticket_filter_options",
+            "on_desk.utils.preset_counts.update_preset_counts",
+            "on_desk.utils.dashboard_counters.update_dashboard_counters",
+            "on_desk.utils.response_times.record_ticket_times",
+        ],
+        "after_insert": [
+            "on_desk.on_desk.doctype.od_whatsapp_integration.api.process_ticket_creation",
+            "on_desk.utils.dashboard_counters.update_dashboard_counters",
+        ],
+        "on_trash": [
+            "on_desk.utils.ticket_cache.invalidate_ticket_scopes",
+            "on_desk.utils.ticket_search.remove_ticket_search_index",
+            "on_desk.utils.ticket_assignment.remove_ticket_assignments",
+            "on_desk.utils.preset_counts.update_preset_counts",
+            "on_desk.utils.dashboard_counters.update_dashboard_counters",
+        ],
+    },
+    "ToDo": {
+        "on_update": "on_desk.utils.ticket_assignment.sync_assignments_from_todo",
+        "on_trash": "on_desk.utils.ticket_assignment.sync_assignments_from_todo",
+    },
+    "HD Customer": {
+        "after_insert": "on_desk.utils.dashboard_counters.update_customer_count",
+        "on_update": [
+            "on_desk.utils.display_names.clear_display_name",
+            "on_desk.utils.filter_options.invalidate_filter_options",
+            "on_desk.utils.ticket_search.refresh_name_in_search_index",
+        ],
+        "after_rename": "on_desk.utils.ticket_search.refresh_name_in_search_index",
+        "on_trash": [
+            "on_desk.utils.display_names.clear_display_name",
+            "on_desk.utils.filter_options.invalidate_filter_options",
+            "on_desk.utils.dashboard_counters.update_customer_count",
+        ],
+    },
+    "User": {
+        "on_update": [
+            "on_desk.utils.display_names.clear_display_name",
+            "on_desk.utils.filter_options.invalidate_filter_options",
+            "on_desk.utils.page_context.clear_page_user",
+        ],
+        "on_trash": [
+            "on_desk.utils.display_names.clear_display_name",
+            "on_desk.utils.filter_options.invalidate_filter_options",
+            "on_desk.utils.page_context.clear_page_user",
+        ],
+    },
+    "Has Role": {
+        "on_update": "on_desk.utils.page_context.clear_page_user",
+        "on_trash": "on_desk.utils.page_context.clear_page_user",
+    },
+    "Website Settings": {
+        "on_update": "on_desk.utils.page_context.clear_app_name",
+    },
+    "HD Agent": {
+        "on_update": "on_desk.utils.filter_options.invalidate_filter_options",
+        "on_trash": "on_desk.utils.filter_options.invalidate_filter_options",
+    },
+    "HD Team": {
+        "on_update": "on_desk.utils.filter_options.invalidate_filter_options",
+        "on_trash": "on_desk.utils.filter_options.invalidate_filter_options",
+    },
+    "HD Ticket Type": {
+        "on_update": "on_desk.utils.filter_options.invalidate_filter_options",
+        "on_trash": "on_desk.utils.filter_options.invalidate_filter_options",
+    },
+    "HD Ticket Priority": {
+        "on_update": "on_desk.utils.filter_options.invalidate_filter_options",
+        "on_trash": "on_desk.utils.filter_options.invalidate_filter_options",
+    },
+    "Custom Field": {
+        "on_update": "on_desk.utils.capabilities.refresh_capabilities",
+        "on_trash": "on_desk.utils.capabilities.refresh_capabilities",
+    },
+    "OD Social Media Message": {
+        "on_update": [
+            "on_desk.utils.etag.invalidate_conversations",
+            "on_desk.utils.response_times.record_message_response",
+        ],
+        "on_trash": "on_desk.utils.etag.invalidate_conversations",
+    },
+    "Contact": {
+        "on_update": [
+            "on_desk.utils.etag.invalidate_conversations",
+            "on_desk.utils.ticket_search.refresh_name_in_search_index",
+        ],
+        "after_rename": "on_desk.utils.ticket_search.refresh_name_in_search_index",
+        "on_trash": "on_desk.utils.etag.invalidate_conversations",
+    },
 }
 
 # Scheduled Tasks
@@ -165,13 +270,16 @@ doc_events = {
 
 scheduler_events = {
     "all": [
-        "on_desk.on_desk.doctype.od_social_media_message.od_social_media_message.update_message_statuses"
+        "on_desk.on_desk.doctype.od_social_media_message.od_social_media_message.update_message_statuses",
+        "on_desk.utils.maintenance_rules.run_maintenance_rules",
     ],
     "daily": [
         "on_desk.on_desk.doctype.od_whatsapp_template.od_whatsapp_template.update_template_statuses"
     ],
     "hourly": [
-        "on_desk.on_desk.doctype.od_whatsapp_integration.api.process_pending_messages"
+        "on_desk.on_desk.doctype.od_whatsapp_integration.api.process_pending_messages",
+        "on_desk.utils.preset_counts.reconcile_preset_counts",
+        "on_desk.utils.dashboard_counters.reconcile_dashboard_counters",
     ],
 }
 
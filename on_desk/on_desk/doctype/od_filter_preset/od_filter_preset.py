@@ -3,6 +3,7 @@
 
 import frappe
 from frappe.model.document import Document
+from on_desk.utils.preset_counts import clear_preset_counts
 
 
 class ODFilterPreset(Document):
@@ -32,10 +33,12 @@ class ODFilterPreset(Document):
     def on_update(self):
         # Clear cache when preset is updated
         frappe.cache().delete_key(f"filter_presets_{self.user}")
+        clear_preset_counts([self.name])
     
     def on_trash(self):
         # Clear cache when preset is deleted
         frappe.cache().delete_key(f"filter_presets_{self.user}")
+        clear_preset_counts([self.name])
 
 
 def get_user_filter_presets(user=None):
@@ -6,6 +6,13 @@ import json
 import requests
 from frappe.model.document import Document
 from frappe.utils import now
+from on_desk.utils.etag import (
+    NOT_MODIFIED,
+    conditional_get,
+    get_resource_version,
+    is_not_modified,
+    make_etag,
+)
 from on_desk.utils.whatsapp import get_whatsapp_integration
 
 
@@ -46,7 +53,8 @@ class ODSocialMediaMessage(Document):
             }
 
             # Make the API request
-            url = f"{settings.api_endpoint}/{settings.phone_number_id}/messages/{self.message_id}"
+            phone_number_id = self.phone_number_id or settings.phone_number_id
+            url = f"{settings.api_endpoint}/{phone_number_id}/messages/{self.message_id}"
             response = requests.get(url, headers=headers)
             response_data = response.json()
 
@@ -183,11 +191,16 @@ class ODSocialMediaMessage(Document):
 
 
 @frappe.whitelist()
+@conditional_get
 def get_messages_for_ticket(ticket_name):
     """Get all social media messages for a ticket"""
     if not frappe.db.exists("HD Ticket", ticket_name):
         return []
 
+    etag = make_etag(get_resource_version(f"ticket_messages:{ticket_name}"))
+    if is_not_modified(etag):
+        return NOT_MODIFIED
+
     messages = frappe.get_all(
         "OD Social Media Message",
         filters={"reference_ticket": ticket_name},
@@ -249,32 +262,16 @@ def send_whatsapp_message_from_ticket(
 
     # Send the WhatsApp message
     settings = get_whatsapp_integration(throw_if_not_found=True)
-    response = settings.send_message(phone_number, message, template, template_params)
+    response = settings.send_message(
+        phone_number,
+        message,
+        template,
+        template_params,
+        reference_ticket=ticket_name,
+        reference_contact=ticket.contact,
+    )
 
     if response:
-        # Update the message with the ticket reference
-        message_id = response.get("messages", [{}])[0].get("id", "")
-        if message_id:
-            message_doc = frappe.get_all(
-                "OD Social Media Message",
-                filters={"message_id": message_id},
-                fields=["name"],
-            )
-
-            if message_doc:
-                frappe.db.set_value(
-                    "OD Social Media Message",
-                    message_doc[0].name,
-                    "reference_ticket",
-                    ticket_name,
-                )
-                frappe.db.set_value(
-                    "OD Social Media Message",
-                    message_doc[0].name,
-                    "reference_contact",
-                    ticket.contact,
-                )
-
         return response
 
     return None
@@ -302,7 +299,7 @@ def update_message_statuses():
             "status": ["in", ["Sent", "Delivered"]],
             "creation": [">", frappe.utils.add_days(frappe.utils.now(), -1)],
         },
-        fields=["name", "message_id"],
+        fields=["name", "message_id", "phone_number_id"],
         limit=50,  # Process in batches to avoid overloading
     )
 
@@ -319,7 +316,8 @@ def update_message_statuses():
     for message_data in messages:
         try:
             # Make the API request
-            url = f"{settings.api_endpoint}/{settings.phone_number_id}/messages/{message_data.message_id}"
+            phone_number_id = message_data.phone_number_id or settings.phone_number_id
+            url = f"{settings.api_endpoint}/{phone_number_id}/messages/{message_data.message_id}"
             response = requests.get(url, headers=headers)
 
             if response.status_code == 200:
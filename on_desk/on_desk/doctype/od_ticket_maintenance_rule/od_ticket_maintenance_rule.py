@@ -0,0 +1,21 @@
+# Copyright (c) 2025, Sydney Kibanga and contributors
+# For license information, please see license.txt
+
+import frappe
+from frappe.model.document import Document
+
+
+class ODTicketMaintenanceRule(Document):
+	def validate(self):
+		if self.age_days and self.age_days < 0:
+			frappe.throw("Age (Days) cannot be negative")
+
+		if self.chunk_size is not None and self.chunk_size <= 0:
+			self.chunk_size = 100
+
+		# A pass over different tickets starts from the beginning
+		if any(
+			self.has_value_changed(field)
+			for field in ("ticket_status", "ticket_priority", "age_field", "age_days", "action", "action_value")
+		):
+			self.checkpoint = None
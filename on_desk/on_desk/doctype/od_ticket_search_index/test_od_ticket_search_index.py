@@ -0,0 +1,9 @@
+# Copyright (c) 2025, Sydney Kibanga and Contributors
+# See license.txt
+
+# import frappe
+from frappe.tests.utils import FrappeTestCase
+
+
+class TestODTicketSearchIndex(FrappeTestCase):
+	pass
@@ -8,7 +8,10 @@ import hashlib
 import datetime
 from frappe import _
 from frappe.utils import get_datetime, now
-from on_desk.utils.whatsapp import get_whatsapp_integration
+from on_desk.utils.whatsapp import (
+    get_whatsapp_integration,
+    remember_conversation_sender,
+)
 
 
 @frappe.whitelist(allow_guest=True)
@@ -138,6 +141,10 @@ def process_message(message, value, settings):
     from_number = message.get("from")
     timestamp = message.get("timestamp")
 
+    # Keep the conversation on the business number the customer wrote to
+    phone_number_id = value.get("metadata", {}).get("phone_number_id")
+    remember_conversation_sender(from_number, phone_number_id)
+
     # Check message type
     if message.get("type") == "text":
         text = message.get("text", {}).get("body", "")
@@ -249,6 +256,7 @@ def create_social_media_message(
     message_doc.timestamp = datetime.datetime.fromtimestamp(int(timestamp))
     message_doc.status = "Received"
     message_doc.raw_response = json.dumps(value)
+    message_doc.phone_number_id = value.get("metadata", {}).get("phone_number_id")
 
     if media_type:
         message_doc.media_type = media_type
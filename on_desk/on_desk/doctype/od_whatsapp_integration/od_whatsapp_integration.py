@@ -4,14 +4,84 @@
 import frappe
 import requests
 import json
+import time
 from frappe.model.document import Document
-from frappe.utils import get_url
-from on_desk.utils.whatsapp import get_whatsapp_integration
+from frappe.utils import get_url, cint
+from on_desk.utils.whatsapp import (
+    get_whatsapp_integration,
+    get_conversation_sender,
+    remember_conversation_sender,
+)
 
 
 class ODWhatsAppIntegration(Document):
     def validate(self):
         self.set_webhook_url()
+        self.validate_sender_numbers()
+
+    def validate_sender_numbers(self):
+        """Make sure each phone number appears only once in the sender pool"""
+        seen = set()
+        for row in self.get("sender_numbers") or []:
+            if row.phone_number_id in seen:
+                frappe.throw(
+                    f"Phone Number ID {row.phone_number_id} is added to the sender pool more than once"
+                )
+            seen.add(row.phone_number_id)
+
+    def get_sender_pool(self):
+        """Get the enabled phone numbers of the sender pool"""
+        if not self.get("use_sender_pool"):
+            return []
+
+        return [
+            row
+            for row in self.get("sender_numbers") or []
+            if row.enabled and row.phone_number_id
+        ]
+
+    def select_sender(self, to_number):
+        """
+        Pick the phone number ID to send from.
+
+        A conversation stays on the number the customer last wrote to. New
+        conversations are handed out round-robin, skipping numbers that have
+        already used up their per-second throughput, so outbound capacity grows
+        with every number added to the pool.
+        """
+        pool = self.get_sender_pool()
+        if not pool:
+            return self.phone_number_id
+
+        pool_ids = [row.phone_number_id for row in pool]
+
+        sticky = get_conversation_sender(to_number)
+        if sticky and (sticky in pool_ids or sticky == self.phone_number_id):
+            return sticky
+
+        cache = frappe.cache()
+        offset = cache.incr(cache.make_key("on_desk:whatsapp_sender_rr"))
+        second = int(time.time())
+
+        selected = None
+        for i in range(len(pool)):
+            row = pool[(offset + i) % len(pool)]
+            rate_key = cache.make_key(
+                f"on_desk:whatsapp_sender_rate:{row.phone_number_id}:{second}"
+            )
+            sent = cache.incr(rate_key)
+            if sent == 1:
+                cache.expire(rate_key, 2)
+            if sent <= (cint(row.messages_per_second) or 80):
+                selected = row.phone_number_id
+                break
+
+        # Every number is saturated for this second, let Meta queue the message
+        if not selected:
+            selected = pool[offset % len(pool)].phone_number_id
+
+        remember_conversation_sender(to_number, selected)
+        return selected
 
     def set_webhook_url(self):
         """Set the webhook URL based on the site URL"""
@@ -19,13 +89,28 @@ class ODWhatsAppIntegration(Document):
         # Use the raw_verify endpoint for webhook verification
         self.webhook_url = f"{site_url}/api/method/on_desk.on_desk.doctype.od_whatsapp_integration.api.raw_verify"
 
-    def send_message(self, to_number, message, template=None, template_params=None):
+    def send_message(
+        self,
+        to_number,
+        message,
+        template=None,
+        template_params=None,
+        reference_ticket=None,
+        reference_contact=None,
+    ):
         """Send a WhatsApp message using the configured provider"""
         if not self.enabled:
             frappe.throw("WhatsApp integration is not enabled")
 
         if self.provider == "Meta":
-            return self.send_message_meta(to_number, message, template, template_params)
+            return self.send_message_meta(
+                to_number,
+                message,
+                template,
+                template_params,
+                reference_ticket=reference_ticket,
+                reference_contact=reference_contact,
+            )
         elif self.provider == "Twilio":
             return self.send_message_twilio(to_number, message)
         elif self.provider == "Custom":
@@ -34,7 +119,13 @@ class ODWhatsAppIntegration(Document):
             frappe.throw(f"Unsupported provider: {self.provider}")
 
     def send_message_meta(
-        self, to_number, message, template=None, template_params=None
+        self,
+        to_number,
+        message,
+        template=None,
+        template_params=None,
+        reference_ticket=None,
+        reference_contact=None,
     ):
         """Send a WhatsApp message using Meta's WhatsApp Business API"""
         import traceback
@@ -52,7 +143,7 @@ class ODWhatsAppIntegration(Document):
             frappe.throw(error_msg)
 
         # Check if phone_number_id is configured
-        if not self.phone_number_id:
+        if not self.phone_number_id and not self.get_sender_pool():
             error_msg = "Phone Number ID is not configured"
             frappe.log_error(message=error_msg, title="WhatsApp Debug")
             frappe.throw(error_msg)
@@ -110,7 +201,8 @@ class ODWhatsAppIntegration(Document):
             }
             frappe.log_error(message="Using text message", title="WhatsApp Debug")
 
-        url = f"{self.api_endpoint}/{self.phone_number_id}/messages"
+        phone_number_id = self.select_sender(to_number)
+        url = f"{self.api_endpoint}/{phone_number_id}/messages"
         frappe.log_error(message=f"API URL: {url}", title="WhatsApp Debug")
         frappe.log_error(
             message=f"Request payload: {json.dumps(payload)}", title="WhatsApp Debug"
@@ -147,7 +239,13 @@ class ODWhatsAppIntegration(Document):
                 # Create a record of the sent message
                 try:
                     record_name = self.create_message_record(
-                        to_number, message, "Outgoing", response_data
+                        to_number,
+                        message,
+                        "Outgoing",
+                        response_data,
+                        phone_number_id=phone_number_id,
+                        reference_ticket=reference_ticket,
+                        reference_contact=reference_contact,
                     )
                     frappe.log_error(
                         message=f"Created message record: {record_name}",
@@ -198,14 +296,27 @@ class ODWhatsAppIntegration(Document):
         # Implementation for custom provider
         frappe.throw("Custom provider integration not implemented yet")
 
-    def create_message_record(self, to_number, message, direction, response=None):
+    def create_message_record(
+        self,
+        to_number,
+        message,
+        direction,
+        response=None,
+        phone_number_id=None,
+        reference_ticket=None,
+        reference_contact=None,
+    ):
         """Create a record of the WhatsApp message"""
         message_doc = frappe.new_doc("OD Social Media Message")
         message_doc.channel = "WhatsApp"
         message_doc.direction = direction
         message_doc.to_number = to_number
+        message_doc.phone_number_id = phone_number_id or self.phone_number_id
         message_doc.message = message
         message_doc.status = "Sent" if direction == "Outgoing" else "Received"
+        # Linked on insert, so the insert hooks see the ticket
+        message_doc.reference_ticket = reference_ticket
+        message_doc.reference_contact = reference_contact
 
         if response:
             message_doc.message_id = response.get("messages", [{}])[0].get("id", "")
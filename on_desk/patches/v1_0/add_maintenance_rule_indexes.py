@@ -0,0 +1,5 @@
+from on_desk.setup.indexes import MAINTENANCE_RULE_INDEXES, add_indexes
+
+
+def execute():
+    add_indexes(MAINTENANCE_RULE_INDEXES)
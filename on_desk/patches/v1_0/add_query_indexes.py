@@ -0,0 +1,5 @@
+from on_desk.setup.indexes import QUERY_INDEXES, add_indexes
+
+
+def execute():
+    add_indexes(QUERY_INDEXES)
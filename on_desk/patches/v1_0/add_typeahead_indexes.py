@@ -0,0 +1,5 @@
+from on_desk.setup.indexes import TYPEAHEAD_INDEXES, add_indexes
+
+
+def execute():
+    add_indexes(TYPEAHEAD_INDEXES)
@@ -3,6 +3,20 @@
  * Provides enhanced filtering, search, and pagination for tickets
  */
 
+// Columns requested from the compact ticket list format
+const TICKET_LIST_COLUMNS = [
+    'name',
+    'subject',
+    'status',
+    'priority',
+    'status_color',
+    'priority_color',
+    'customer_name',
+    'assigned_agents',
+    'creation',
+    'modified'
+];
+
 class AdvancedTicketFilter {
     constructor() {
         this.currentFilters = {};
@@ -12,12 +26,93 @@ class AdvancedTicketFilter {
         this.totalCount = 0;
         this.isLoading = false;
         this.searchTimeout = null;
+        this.sortChosen = false;
 
         this.initializeElements();
         this.bindEvents();
-        this.loadFilterOptions();
-        this.loadFilterPresets();
-        this.loadTickets();
+        this.listenForBulkUpdates();
+
+        const initialState = this.readInitialState();
+        if (initialState) {
+            this.startFromState(initialState);
+        } else {
+            this.loadFilterOptions();
+            this.loadFilterPresets();
+            this.loadTickets();
+        }
+    }
+
+    listenForBulkUpdates() {
+        // Bulk operations save tickets without the usual list_update events
+        const subscribe = () => {
+            if (!frappe.realtime || typeof frappe.realtime.on !== 'function') return;
+
+            if (typeof frappe.realtime.doctype_subscribe === 'function') {
+                frappe.realtime.doctype_subscribe('HD Ticket');
+            }
+            frappe.realtime.on('on_desk_bulk_ticket_update', () => {
+                // Several chunks can finish together, reload once
+                clearTimeout(this.bulkRefreshTimeout);
+                this.bulkRefreshTimeout = setTimeout(() => this.loadTickets(), 500);
+            });
+        };
+
+        if (frappe._isTemporaryFrappe) {
+            document.addEventListener('frappe_loaded', subscribe, { once: true });
+        } else {
+            subscribe();
+        }
+    }
+
+    syncSearchSort() {
+        // Searches are ranked by relevance until another sort is picked
+        if (this.sortChosen || !this.sortBy) return;
+        this.sortBy.value = this.searchInput.value.trim() ? '' : 'modified';
+    }
+
+    readInitialState() {
+        // State rendered with the page by advanced.py
+        const element = document.getElementById('initialTicketState');
+        if (!element) return null;
+
+        try {
+            return JSON.parse(element.textContent);
+        } catch (error) {
+            console.warn('Failed to parse initial ticket state:', error);
+            return null;
+        }
+    }
+
+    startFromState(state) {
+        if (state.filter_options) {
+            this.populateFilterOptions(state.filter_options);
+        } else {
+            this.loadFilterOptions();
+        }
+
+        if (!state.presets) {
+            this.loadFilterPresets();
+        } else {
+            this.renderFilterPresets(state.presets);
+        }
+
+        if (!state.tickets) {
+            this.loadTickets();
+            return;
+        }
+
+        this.pageSize = state.page_size || this.pageSize;
+
+        // The first page was read with the default preset applied
+        const defaultPreset = (state.presets || []).find(preset => preset.name === state.default_preset);
+        if (defaultPreset) {
+            this.setFiltersFromPreset(defaultPreset);
+            const presetDropdown = document.getElementById('presetDropdown');
+            if (presetDropdown) presetDropdown.value = defaultPreset.name;
+        }
+
+        const query = state.query || {};
+        this.showTicketPage(state.tickets, query.filters || {}, query.search_text || '');
     }
 
     initializeElements() {
@@ -36,6 +131,8 @@ class AdvancedTicketFilter {
         this.applyFiltersBtn = document.getElementById('applyFilters');
         this.clearFiltersBtn = document.getElementById('clearFilters');
         this.saveFiltersBtn = document.getElementById('saveFilters');
+        this.exportCsvBtn = document.getElementById('exportCsv');
+        this.exportXlsxBtn = document.getElementById('exportXlsx');
 
         // Sort controls
         this.sortBy = document.getElementById('sortBy');
@@ -56,10 +153,15 @@ class AdvancedTicketFilter {
             clearTimeout(this.searchTimeout);
             this.searchTimeout = setTimeout(() => {
                 this.currentPage = 1;
+                this.syncSearchSort();
                 this.loadTickets();
             }, 500);
         });
 
+        // Customers and agents are searched as the user types
+        this.attachTypeahead(this.customerFilter, 'on_desk.api.search_customers', 'Search customers...');
+        this.attachTypeahead(this.agentFilter, 'on_desk.api.search_agents', 'Search agents...');
+
         // Filter change events
         [this.statusFilter, this.priorityFilter, this.teamFilter, this.typeFilter,
         this.customerFilter, this.agentFilter].forEach(filter => {
@@ -82,6 +184,7 @@ class AdvancedTicketFilter {
 
         // Sort controls
         this.sortBy.addEventListener('change', () => {
+            this.sortChosen = true;
             this.currentPage = 1;
             this.loadTickets();
         });
@@ -105,6 +208,14 @@ class AdvancedTicketFilter {
             this.saveFilterPreset();
         });
 
+        if (this.exportCsvBtn) {
+            this.exportCsvBtn.addEventListener('click', () => this.exportTickets('CSV'));
+        }
+
+        if (this.exportXlsxBtn) {
+            this.exportXlsxBtn.addEventListener('click', () => this.exportTickets('XLSX'));
+        }
+
         // Quick filter buttons
         this.quickFilterBtns.forEach(btn => {
             btn.addEventListener('click', (e) => {
@@ -117,9 +228,7 @@ class AdvancedTicketFilter {
         try {
             console.log('Loading filter options...');
 
-            const response = await frappe.call({
-                method: 'on_desk.api.get_filter_options'
-            });
+            const response = await on_desk.conditional_call('on_desk.api.get_filter_options');
 
             console.log('Filter options response:', response);
 
@@ -214,6 +323,54 @@ class AdvancedTicketFilter {
         });
     }
 
+    attachTypeahead(selectElement, method, placeholder) {
+        if (!selectElement) return;
+
+        const input = document.createElement('input');
+        input.type = 'search';
+        input.className = 'form-control form-control-sm typeahead-input';
+        input.placeholder = placeholder;
+        input.autocomplete = 'off';
+        selectElement.parentNode.insertBefore(input, selectElement);
+
+        let timer = null;
+        const search = () => {
+            on_desk.conditional_call(method, { txt: input.value.trim() })
+                .then(response => {
+                    const results = (response.message && response.message.results) || [];
+                    const selected = selectElement.selectedOptions[0];
+                    // Keep the current selection even when it no longer matches
+                    if (selected && selected.value !== 'All' &&
+                        !results.some(option => option.name === selected.value)) {
+                        results.unshift({ name: selected.value, label: selected.textContent });
+                    }
+                    const value = selectElement.value;
+                    this.populateSelect(selectElement, results);
+                    selectElement.value = value;
+                })
+                .catch(error => {
+                    console.error('Error searching filter options:', error);
+                });
+        };
+
+        input.addEventListener('focus', search, { once: true });
+        input.addEventListener('input', () => {
+            clearTimeout(timer);
+            timer = setTimeout(search, 200);
+        });
+    }
+
+    setSelectValue(selectElement, value) {
+        // Options loaded on demand may not include a preset's value yet
+        if (!Array.from(selectElement.options).some(option => option.value === value)) {
+            const optionElement = document.createElement('option');
+            optionElement.value = value;
+            optionElement.textContent = value;
+            selectElement.appendChild(optionElement);
+        }
+        selectElement.value = value;
+    }
+
     buildFilters() {
         const filters = {};
 
@@ -277,16 +434,15 @@ class AdvancedTicketFilter {
                 page_size: this.pageSize
             });
 
-            const response = await frappe.call({
-                method: 'on_desk.api.get_tickets_advanced',
-                args: {
-                    filters: JSON.stringify(filters),
-                    search_text: searchText,
-                    sort_by: sortBy,
-                    sort_order: sortOrder,
-                    page: this.currentPage,
-                    page_size: this.pageSize
-                }
+            const response = await on_desk.conditional_call('on_desk.api.get_tickets_advanced', {
+                filters: JSON.stringify(filters),
+                search_text: searchText,
+                sort_by: sortBy,
+                sort_order: sortOrder,
+                page: this.currentPage,
+                page_size: this.pageSize,
+                response_format: 'compact',
+                fields: JSON.stringify(TICKET_LIST_COLUMNS)
             });
 
             console.log('API response:', response);
@@ -313,12 +469,7 @@ class AdvancedTicketFilter {
             }
 
             if (response.message.success) {
-                const data = response.message;
-                this.totalCount = data.total_count || 0;
-                this.totalPages = data.total_pages || 1;
-                this.renderTickets(data.tickets || []);
-                this.renderPagination();
-                this.updateResultsInfo();
+                this.showTicketPage(response.message, filters, searchText);
             } else {
                 const errorMessage = response.message.message || 'Failed to load tickets';
                 this.showError(errorMessage);
@@ -332,6 +483,117 @@ class AdvancedTicketFilter {
         }
     }
 
+    showTicketPage(data, filters, searchText) {
+        this.totalCount = data.total_count || 0;
+        this.totalPages = data.total_pages || 1;
+        this.renderTickets(this.unpackTickets(data));
+        this.renderPagination();
+        this.updateResultsInfo();
+        this.loadFacets(filters, searchText);
+    }
+
+    getExportArgs(fileFormat) {
+        return {
+            filters: JSON.stringify(this.buildFilters()),
+            search_text: this.searchInput ? this.searchInput.value.trim() : '',
+            sort_by: this.sortBy ? this.sortBy.value : 'modified',
+            sort_order: this.sortOrder ? this.sortOrder.value : 'desc',
+            file_format: fileFormat
+        };
+    }
+
+    async exportTickets(fileFormat) {
+        const args = this.getExportArgs(fileFormat);
+
+        if (fileFormat === 'CSV') {
+            // The server streams the file, let the browser download it
+            const query = new URLSearchParams(args).toString();
+            window.location.href = `/api/method/on_desk.api.export_tickets?${query}`;
+            return;
+        }
+
+        // Large workbooks are built in the background, the link arrives over realtime
+        if (frappe.realtime && !this.exportListener) {
+            this.exportListener = (data) => {
+                if (data.success) {
+                    window.open(data.file_url, '_blank');
+                } else {
+                    frappe.show_alert({ message: data.message || 'Export failed', indicator: 'red' });
+                }
+            };
+            frappe.realtime.on('on_desk_ticket_export', this.exportListener);
+        }
+
+        try {
+            const response = await frappe.call({
+                method: 'on_desk.api.export_tickets',
+                args: args
+            });
+            if (response.message && response.message.success) {
+                frappe.show_alert({ message: response.message.message, indicator: 'blue' });
+            }
+        } catch (error) {
+            console.error('Error exporting tickets:', error);
+            frappe.show_alert({ message: 'Failed to export tickets', indicator: 'red' });
+        }
+    }
+
+    async loadFacets(filters, searchText) {
+        try {
+            const response = await on_desk.conditional_call('on_desk.api.get_ticket_facets', {
+                filters: JSON.stringify(filters),
+                search_text: searchText
+            });
+
+            if (response.message && response.message.success) {
+                this.updateFacetCounts(response.message.facets || {});
+            }
+        } catch (error) {
+            // Counts are informative only, the filters work without them
+            console.warn('Error loading ticket facets:', error);
+        }
+    }
+
+    updateFacetCounts(facets) {
+        const selects = {
+            status: this.statusFilter,
+            priority: this.priorityFilter,
+            agent_group: this.teamFilter,
+            ticket_type: this.typeFilter
+        };
+
+        Object.keys(selects).forEach(field => {
+            const selectElement = selects[field];
+            if (!selectElement) return;
+
+            const counts = {};
+            (facets[field] || []).forEach(facet => {
+                counts[facet.name] = facet.count;
+            });
+
+            Array.from(selectElement.options).forEach(option => {
+                if (option.value === 'All') return;
+                if (!option.dataset.label) option.dataset.label = option.textContent;
+                option.textContent = `${option.dataset.label} (${counts[option.value] || 0})`;
+            });
+        });
+    }
+
+    unpackTickets(data) {
+        // Compact responses list the columns once and each ticket as an array
+        if (!data.rows) return data.tickets || [];
+
+        return data.rows.map(row => {
+            const ticket = {};
+            data.columns.forEach((column, index) => {
+                ticket[column] = row[index];
+            });
+            ticket.creation_formatted = formatRelativeTime(ticket.creation);
+            ticket.modified_formatted = formatRelativeTime(ticket.modified);
+            return ticket;
+        });
+    }
+
     renderTickets(tickets) {
         if (!tickets || tickets.length === 0) {
             this.showEmptyState();
@@ -484,6 +746,13 @@ class AdvancedTicketFilter {
     }
 
     clearAllFilters() {
+        this.resetFilterControls();
+
+        // Reload tickets
+        this.loadTickets();
+    }
+
+    resetFilterControls() {
         // Reset all filter controls
         this.searchInput.value = '';
         this.statusFilter.value = 'All';
@@ -496,6 +765,7 @@ class AdvancedTicketFilter {
         this.toDateFilter.value = '';
 
         // Reset sort controls
+        this.sortChosen = false;
         this.sortBy.value = 'modified';
         this.sortOrder.value = 'desc';
 
@@ -505,9 +775,6 @@ class AdvancedTicketFilter {
         // Update quick filter buttons
         this.quickFilterBtns.forEach(btn => btn.classList.remove('active'));
         this.quickFilterBtns[0].classList.add('active'); // "All Tickets"
-
-        // Reload tickets
-        this.loadTickets();
     }
 
     applyQuickFilter(filterType, buttonElement = null) {
@@ -681,11 +948,56 @@ class AdvancedTicketFilter {
                 if (preset.is_default) {
                     option.textContent += ' (Default)';
                 }
+                if (preset.match_count !== null && preset.match_count !== undefined) {
+                    option.textContent += ` [${preset.match_count}]`;
+                }
                 presetDropdown.appendChild(option);
             });
         }
     }
 
+    setFiltersFromPreset(preset) {
+        // Parse and apply filters
+        let filters = preset.filters || {};
+        if (typeof filters === 'string') {
+            try {
+                filters = JSON.parse(filters || '{}');
+            } catch (e) {
+                console.warn('Failed to parse preset filters:', e);
+                filters = {};
+            }
+        }
+
+        // Reset all filters first
+        this.resetFilterControls();
+
+        // Apply preset filters with null checks
+        if (filters.status && this.statusFilter) this.statusFilter.value = filters.status;
+        if (filters.priority && this.priorityFilter) this.priorityFilter.value = filters.priority;
+        if (filters.agent_group && this.teamFilter) this.teamFilter.value = filters.agent_group;
+        if (filters.ticket_type && this.typeFilter) this.typeFilter.value = filters.ticket_type;
+        if (filters.customer && this.customerFilter) this.setSelectValue(this.customerFilter, filters.customer);
+        if (filters.assigned_agent && this.agentFilter) this.setSelectValue(this.agentFilter, filters.assigned_agent);
+
+        // Apply date range
+        if (filters.date_range) {
+            if (filters.date_range.from_date && this.fromDateFilter) {
+                this.fromDateFilter.value = filters.date_range.from_date;
+            }
+            if (filters.date_range.to_date && this.toDateFilter) {
+                this.toDateFilter.value = filters.date_range.to_date;
+            }
+        }
+
+        // Apply search and sort
+        if (preset.search_text && this.searchInput) this.searchInput.value = preset.search_text;
+        if (preset.sort_by && this.sortBy) {
+            this.sortBy.value = preset.sort_by;
+            this.sortChosen = true;
+        }
+        if (preset.sort_order && this.sortOrder) this.sortOrder.value = preset.sort_order;
+    }
+
     async applyFilterPreset(presetId) {
         try {
             const response = await frappe.call({
@@ -699,40 +1011,7 @@ class AdvancedTicketFilter {
             if (response && response.message) {
                 const preset = response.message;
 
-                // Parse and apply filters
-                let filters = {};
-                try {
-                    filters = JSON.parse(preset.filters || '{}');
-                } catch (e) {
-                    console.warn('Failed to parse preset filters:', e);
-                    filters = {};
-                }
-
-                // Reset all filters first
-                this.clearAllFilters();
-
-                // Apply preset filters with null checks
-                if (filters.status && this.statusFilter) this.statusFilter.value = filters.status;
-                if (filters.priority && this.priorityFilter) this.priorityFilter.value = filters.priority;
-                if (filters.agent_group && this.teamFilter) this.teamFilter.value = filters.agent_group;
-                if (filters.ticket_type && this.typeFilter) this.typeFilter.value = filters.ticket_type;
-                if (filters.customer && this.customerFilter) this.customerFilter.value = filters.customer;
-                if (filters.assigned_agent && this.agentFilter) this.agentFilter.value = filters.assigned_agent;
-
-                // Apply date range
-                if (filters.date_range) {
-                    if (filters.date_range.from_date && this.fromDateFilter) {
-                        this.fromDateFilter.value = filters.date_range.from_date;
-                    }
-                    if (filters.date_range.to_date && this.toDateFilter) {
-                        this.toDateFilter.value = filters.date_range.to_date;
-                    }
-                }
-
-                // Apply search and sort
-                if (preset.search_text && this.searchInput) this.searchInput.value = preset.search_text;
-                if (preset.sort_by && this.sortBy) this.sortBy.value = preset.sort_by;
-                if (preset.sort_order && this.sortOrder) this.sortOrder.value = preset.sort_order;
+                this.setFiltersFromPreset(preset);
 
                 // Load tickets with applied preset
                 this.currentPage = 1;
@@ -758,6 +1037,35 @@ class AdvancedTicketFilter {
     }
 }
 
+// Format an ISO timestamp like "5 minutes ago", relative to the browser clock
+function formatRelativeTime(value) {
+    if (!value) return '-';
+
+    const date = new Date(value);
+    if (isNaN(date)) return value;
+
+    const seconds = Math.round((Date.now() - date.getTime()) / 1000);
+    if (seconds < 60) return 'just now';
+
+    const units = [
+        ['year', 365 * 24 * 60 * 60],
+        ['month', 30 * 24 * 60 * 60],
+        ['week', 7 * 24 * 60 * 60],
+        ['day', 24 * 60 * 60],
+        ['hour', 60 * 60],
+        ['minute', 60]
+    ];
+
+    for (const [unit, size] of units) {
+        const count = Math.floor(seconds / size);
+        if (count >= 1) {
+            return `${count} ${unit}${count > 1 ? 's' : ''} ago`;
+        }
+    }
+
+    return 'just now';
+}
+
 // Initialize the advanced filtering system
 function initializeAdvancedFiltering() {
     window.ticketFilter = new AdvancedTicketFilter();
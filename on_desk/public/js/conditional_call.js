@@ -0,0 +1,85 @@
+/**
+ * On Desk Conditional Calls
+ *
+ * Calls a whitelisted read API with GET and keeps a local copy of each
+ * response together with its ETag. The ETag is sent back as If-None-Match,
+ * and a 304 answer is served from the local copy.
+ */
+
+window.on_desk = window.on_desk || {};
+
+(function () {
+    const STORAGE_PREFIX = 'on_desk:conditional:';
+    const memoryCopies = {};
+
+    function buildQuery(args) {
+        const params = new URLSearchParams();
+        Object.keys(args || {}).forEach(key => {
+            const value = args[key];
+            if (value === undefined || value === null) return;
+            params.append(key, typeof value === 'object' ? JSON.stringify(value) : value);
+        });
+        return params.toString();
+    }
+
+    function readCopy(key) {
+        if (memoryCopies[key]) return memoryCopies[key];
+        try {
+            const stored = sessionStorage.getItem(STORAGE_PREFIX + key);
+            return stored ? JSON.parse(stored) : null;
+        } catch (e) {
+            return null;
+        }
+    }
+
+    function writeCopy(key, copy) {
+        memoryCopies[key] = copy;
+        try {
+            sessionStorage.setItem(STORAGE_PREFIX + key, JSON.stringify(copy));
+        } catch (e) {
+            // Storage full or disabled, the in-memory copy still works
+        }
+    }
+
+    /**
+     * Call a method like frappe.call, resolving to {message: ...}
+     *
+     * @param {string} method - Dotted path of the whitelisted method
+     * @param {Object} args - Method arguments
+     * @returns {Promise<Object>}
+     */
+    on_desk.conditional_call = async function (method, args) {
+        const query = buildQuery(args);
+        const url = `/api/method/${method}${query ? '?' + query : ''}`;
+        const copy = readCopy(url);
+
+        const headers = { 'Accept': 'application/json' };
+        if (copy && copy.etag) {
+            headers['If-None-Match'] = copy.etag;
+        }
+
+        // The validator is managed here, keep the browser cache out of it
+        const response = await fetch(url, {
+            method: 'GET',
+            headers: headers,
+            credentials: 'same-origin',
+            cache: 'no-store'
+        });
+
+        if (response.status === 304 && copy) {
+            return { message: copy.message };
+        }
+
+        if (!response.ok) {
+            throw new Error(`${method} failed with status ${response.status}`);
+        }
+
+        const data = await response.json();
+        const etag = response.headers.get('ETag');
+        if (etag) {
+            writeCopy(url, { etag: etag, message: data.message });
+        }
+
+        return data;
+    };
+})();
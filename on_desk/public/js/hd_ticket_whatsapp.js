@@ -32,16 +32,13 @@ frappe.ui.form.on('HD Ticket', {
 
 function loadWhatsAppConversation(frm) {
     // Get WhatsApp messages for this ticket
-    frappe.call({
-        method: 'on_desk.on_desk.doctype.od_social_media_message.od_social_media_message.get_messages_for_ticket',
-        args: {
-            ticket_name: frm.doc.name
-        },
-        callback: function(response) {
-            if (response.message) {
-                const messages = response.message;
-                renderWhatsAppConversation(frm, messages);
-            }
+    on_desk.conditional_call(
+        'on_desk.on_desk.doctype.od_social_media_message.od_social_media_message.get_messages_for_ticket',
+        { ticket_name: frm.doc.name }
+    ).then(function(response) {
+        if (response.message) {
+            const messages = response.message;
+            renderWhatsAppConversation(frm, messages);
         }
     });
 }
@@ -199,16 +196,13 @@ function sendWhatsAppMessage(frm) {
 
 function loadSocialMediaMessages(frm) {
     // Get all social media messages for this ticket
-    frappe.call({
-        method: 'on_desk.on_desk.doctype.od_social_media_message.od_social_media_message.get_messages_for_ticket',
-        args: {
-            ticket_name: frm.doc.name
-        },
-        callback: function(response) {
-            if (response.message) {
-                const messages = response.message;
-                renderSocialMediaMessages(frm, messages);
-            }
+    on_desk.conditional_call(
+        'on_desk.on_desk.doctype.od_social_media_message.od_social_media_message.get_messages_for_ticket',
+        { ticket_name: frm.doc.name }
+    ).then(function(response) {
+        if (response.message) {
+            const messages = response.message;
+            renderSocialMediaMessages(frm, messages);
         }
     });
 }
@@ -478,14 +478,15 @@ document.addEventListener('DOMContentLoaded', function () {
 
     // Function to refresh conversations list
     function refreshConversations() {
-        frappe.call({
-            method: 'on_desk.on_desk.www.on-desk.whatsapp.api.get_conversations',
-            callback: function (response) {
+        on_desk.conditional_call('on_desk.on_desk.www.on-desk.whatsapp.api.get_conversations')
+            .then(function (response) {
                 if (response.message) {
                     renderConversations(response.message);
                 }
-            }
-        });
+            })
+            .catch(function (err) {
+                console.error('Error refreshing conversations:', err);
+            });
     }
 
     // Function to render conversations
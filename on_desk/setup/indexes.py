@@ -0,0 +1,64 @@
+import frappe
+
+# Composite indexes matched to the queries on_desk runs, as
+# (doctype, columns). Leading columns are the equality filters, the last one
+# is the ORDER BY / range column.
+QUERY_INDEXES = [
+    # WhatsApp conversation list and message threads
+    ("OD Social Media Message", ["channel", "direction", "creation"]),
+    ("OD Social Media Message", ["channel", "from_number", "creation"]),
+    ("OD Social Media Message", ["channel", "to_number", "creation"]),
+    # Status polling of recent outgoing messages
+    ("OD Social Media Message", ["channel", "direction", "status", "creation"]),
+    # Messages of a ticket / contact
+    ("OD Social Media Message", ["reference_ticket", "timestamp"]),
+    ("OD Social Media Message", ["reference_contact", "timestamp"]),
+    # Open ticket lookup for an incoming WhatsApp number
+    ("HD Ticket", ["raised_by_phone", "status", "creation"]),
+    # Ticket lists filtered by scope and sorted by last update
+    ("HD Ticket", ["status", "modified"]),
+    ("HD Ticket", ["agent_group", "modified"]),
+    ("HD Ticket", ["raised_by", "modified"]),
+    ("HD Ticket", ["customer", "modified"]),
+    # Filter presets of a user
+    ("OD Filter Preset", ["user", "is_default"]),
+]
+
+TYPEAHEAD_INDEXES = [
+    # Typeahead prefix searches
+    ("HD Customer", ["customer_name"]),
+    ("HD Agent", ["agent_name"]),
+    ("Contact", ["full_name"]),
+]
+
+MAINTENANCE_RULE_INDEXES = [
+    # Stale ticket selection of maintenance rules, by status and age
+    ("HD Ticket", ["status", "creation"]),
+    ("HD Ticket", ["status", "response_by"]),
+    ("HD Ticket", ["status", "resolution_by"]),
+]
+
+# Every index, each set is also added by its own patch
+ALL_INDEXES = QUERY_INDEXES + TYPEAHEAD_INDEXES + MAINTENANCE_RULE_INDEXES
+
+
+def get_index_name(fields):
+    return "od_" + "_".join(fields)[:60]
+
+
+def add_indexes(indexes):
+    """Add a set of (doctype, columns) indexes. Safe to run again."""
+    for doctype, fields in indexes:
+        if not frappe.db.table_exists(doctype):
+            continue
+
+        # raised_by_phone and friends are custom fields that may not exist yet
+        if not all(frappe.db.has_column(doctype, field) for field in fields):
+            continue
+
+        frappe.db.add_index(doctype, fields, index_name=get_index_name(fields))
+
+
+def add_query_indexes():
+    """Add every index on_desk queries rely on (after_install)"""
+    add_indexes(ALL_INDEXES)
@@ -0,0 +1,100 @@
+# Copyright (c) 2025, Sydney Kibanga and Contributors
+# See license.txt
+
+import frappe
+from frappe.tests.utils import FrappeTestCase
+from frappe.utils import get_datetime
+
+from on_desk.utils.dashboard_counters import get_counter_changes
+
+DAY = "2025-03-04"
+
+
+def make_ticket(**values):
+    ticket = {
+        "name": "1",
+        "status": "Open",
+        "agent_group": "Billing",
+        "raised_by": "customer@example.com",
+        "_assign": None,
+        "modified": f"{DAY} 10:00:00",
+        "resolution_date": f"{DAY} 10:00:00",
+        "resolution_by": None,
+    }
+    ticket.update(values)
+    return frappe._dict(ticket)
+
+
+class TestDashboardCounterChanges(FrappeTestCase):
+    tokens = ["all", "team:Billing", "raised_by:customer@example.com"]
+
+    def test_new_ticket_is_counted_in_every_scope(self):
+        deltas, (remove, add) = get_counter_changes(None, make_ticket())
+
+        self.assertEqual(
+            deltas, {token: {"total": 1, "in_progress": 1} for token in self.tokens}
+        )
+        self.assertEqual((remove, add), (set(), {}))
+
+    def test_trashed_ticket_is_uncounted(self):
+        deltas, (remove, add) = get_counter_changes(make_ticket(), None)
+
+        self.assertEqual(
+            deltas, {token: {"total": -1, "in_progress": -1} for token in self.tokens}
+        )
+        self.assertEqual(remove, set(self.tokens))
+        self.assertEqual(add, {})
+
+    def test_resolving_moves_the_ticket_to_resolved(self):
+        before = make_ticket(resolution_by="2025-03-05 10:00:00")
+        after = make_ticket(status="Resolved", resolution_by="2025-03-05 10:00:00")
+
+        deltas, (remove, add) = get_counter_changes(before, after)
+
+        # The total does not change, so it has no delta
+        self.assertEqual(
+            deltas,
+            {token: {"in_progress": -1, f"resolved:{DAY}": 1} for token in self.tokens},
+        )
+        # Resolved tickets are never overdue
+        self.assertEqual(remove, set(self.tokens))
+        self.assertEqual(add, {})
+
+    def test_team_change_only_touches_both_teams(self):
+        deltas, _overdue = get_counter_changes(
+            make_ticket(), make_ticket(agent_group="Product Experts")
+        )
+
+        self.assertEqual(
+            deltas,
+            {
+                "team:Billing": {"total": -1, "in_progress": -1},
+                "team:Product Experts": {"total": 1, "in_progress": 1},
+            },
+        )
+
+    def test_unchanged_ticket_has_no_deltas(self):
+        deltas, (remove, add) = get_counter_changes(make_ticket(), make_ticket())
+        self.assertEqual(deltas, {})
+        # Without a deadline the overdue entries are removed and not re-added
+        self.assertEqual(remove, set(self.tokens))
+        self.assertEqual(add, {})
+
+    def test_deadline_scores_the_ticket_as_overdue(self):
+        deadline = "2025-03-05 10:00:00"
+        _deltas, (_remove, add) = get_counter_changes(
+            None, make_ticket(resolution_by=deadline)
+        )
+
+        score = get_datetime(deadline).timestamp()
+        self.assertEqual(add, {token: score for token in self.tokens})
+
+    def test_explicit_tokens_override_the_ticket_scope(self):
+        deltas, (remove, add) = get_counter_changes(
+            make_ticket(), None, before_tokens=["assigned:agent@example.com"]
+        )
+
+        self.assertEqual(
+            deltas, {"assigned:agent@example.com": {"total": -1, "in_progress": -1}}
+        )
+        self.assertEqual(remove, {"assigned:agent@example.com"})
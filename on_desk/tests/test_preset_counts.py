@@ -0,0 +1,133 @@
+# Copyright (c) 2025, Sydney Kibanga and Contributors
+# See license.txt
+
+import json
+
+import frappe
+from frappe.tests.utils import FrappeTestCase
+
+from on_desk.utils.preset_counts import compile_preset, matches_preset
+
+
+def make_preset(filters, search_text=None):
+    return frappe._dict(
+        name="Test Preset",
+        user="Administrator",
+        filters=json.dumps(filters),
+        search_text=search_text,
+    )
+
+
+def make_ticket(**values):
+    ticket = {
+        "status": "Open",
+        "priority": "High",
+        "agent_group": "Billing",
+        "ticket_type": "Bug",
+        "customer": "Acme",
+        "_assign": json.dumps(["agent@example.com"]),
+        "creation": "2025-03-04 10:00:00",
+        "modified": "2025-03-05 10:00:00",
+    }
+    ticket.update(values)
+    return frappe._dict(ticket)
+
+
+class TestCompilePreset(FrappeTestCase):
+    def test_equality_filters(self):
+        predicate = compile_preset(
+            make_preset(
+                {
+                    "status": ["Open", "Replied"],
+                    "priority": "All",
+                    "agent_group": "Billing",
+                }
+            )
+        )
+
+        self.assertEqual(predicate["name"], "Test Preset")
+        self.assertEqual(
+            predicate["equals"],
+            {"status": ["Open", "Replied"], "agent_group": ["Billing"]},
+        )
+
+    def test_assigned_agent_and_ranges(self):
+        predicate = compile_preset(
+            make_preset(
+                {
+                    "assigned_agent": "agent@example.com",
+                    "date_range": {"from_date": "2025-03-01"},
+                    "modified_date_range": {"to_date": "2025-03-31 23:59:59"},
+                }
+            )
+        )
+
+        self.assertEqual(predicate["assigned_agent"], "agent@example.com")
+        self.assertEqual(predicate["creation_range"], ["2025-03-01", None])
+        self.assertEqual(predicate["modified_range"], [None, "2025-03-31 23:59:59"])
+
+        predicate = compile_preset(make_preset({"assigned_agent": "All"}))
+        self.assertIsNone(predicate["assigned_agent"])
+
+    def test_scope_comes_from_the_preset_owner(self):
+        self.assertEqual(compile_preset(make_preset({}))["scope"], ["all"])
+
+    def test_search_presets_are_not_incremental(self):
+        self.assertTrue(compile_preset(make_preset({}, "  "))["incremental"])
+        self.assertFalse(compile_preset(make_preset({}, "printer"))["incremental"])
+
+
+class TestMatchesPreset(FrappeTestCase):
+    scope = {"all", "team:Billing"}
+
+    def matches(self, filters, ticket=None, scope=None):
+        return matches_preset(
+            compile_preset(make_preset(filters)),
+            make_ticket() if ticket is None else ticket,
+            self.scope if scope is None else scope,
+        )
+
+    def test_missing_ticket_never_matches(self):
+        predicate = compile_preset(make_preset({}))
+        self.assertFalse(matches_preset(predicate, None, self.scope))
+
+    def test_ticket_outside_the_scope_does_not_match(self):
+        self.assertTrue(self.matches({}))
+        self.assertFalse(self.matches({}, scope={"team:Product Experts"}))
+
+    def test_equality_filters(self):
+        self.assertTrue(
+            self.matches({"status": ["Open", "Replied"], "priority": "High"})
+        )
+        self.assertFalse(self.matches({"status": "Closed"}))
+        self.assertFalse(self.matches({"customer": "Acme"}, make_ticket(customer=None)))
+
+    def test_assigned_agent(self):
+        self.assertTrue(self.matches({"assigned_agent": "agent@example.com"}))
+        self.assertFalse(self.matches({"assigned_agent": "other@example.com"}))
+        self.assertFalse(
+            self.matches(
+                {"assigned_agent": "agent@example.com"}, make_ticket(_assign=None)
+            )
+        )
+
+    def test_creation_range_compares_dates_like_sql(self):
+        # A date bound is midnight, so to_date excludes later times that day
+        self.assertTrue(self.matches({"date_range": {"from_date": "2025-03-04"}}))
+        self.assertFalse(self.matches({"date_range": {"to_date": "2025-03-04"}}))
+        self.assertTrue(self.matches({"date_range": {"to_date": "2025-03-05"}}))
+        self.assertFalse(self.matches({"date_range": {"from_date": "2025-03-05"}}))
+
+    def test_modified_range_compares_datetimes(self):
+        self.assertTrue(
+            self.matches({"modified_date_range": {"from_date": "2025-03-05 09:59:59"}})
+        )
+        self.assertFalse(
+            self.matches({"modified_date_range": {"to_date": "2025-03-05 09:59:59"}})
+        )
+        self.assertFalse(
+            self.matches(
+                {"modified_date_range": {"from_date": "2025-03-01"}},
+                make_ticket(modified=None),
+            )
+        )
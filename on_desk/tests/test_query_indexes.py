@@ -0,0 +1,159 @@
+# Copyright (c) 2025, Sydney Kibanga and Contributors
+# See license.txt
+
+import importlib
+from unittest.mock import patch
+
+import frappe
+from frappe.tests.utils import FrappeTestCase
+
+from on_desk.api import (
+    build_filter_conditions,
+    get_ticket_page_by_cursor,
+    get_user_ticket_conditions,
+)
+from on_desk.setup.indexes import ALL_INDEXES, add_query_indexes
+
+PHONE = "255700000000"
+
+
+def list_tickets(conditions):
+    get_ticket_page_by_cursor(conditions, "modified", "desc", None, 20)
+
+
+# The on_desk code paths whose queries must use an index, as
+# (description, doctype they need, module, function, kwargs)
+WHATSAPP_API = "on_desk.www.on-desk.whatsapp.api"
+INTEGRATION_API = "on_desk.on_desk.doctype.od_whatsapp_integration.api"
+HOT_PATHS = [
+    (
+        "WhatsApp conversations",
+        "OD Social Media Message",
+        WHATSAPP_API,
+        "get_conversations",
+        {},
+    ),
+    (
+        "WhatsApp thread",
+        "OD Social Media Message",
+        WHATSAPP_API,
+        "get_conversation_messages",
+        {"phone_number": PHONE},
+    ),
+    (
+        "WhatsApp message statuses",
+        "OD Social Media Message",
+        WHATSAPP_API,
+        "get_message_statuses",
+        {"message_ids": ["wamid.test"]},
+    ),
+    (
+        "WhatsApp status webhook",
+        "OD Social Media Message",
+        INTEGRATION_API,
+        "process_status_update",
+        {"status": {"id": "wamid.test", "status": "sent"}, "value": {}, "settings": None},
+    ),
+    (
+        "Open ticket of a WhatsApp number",
+        "HD Ticket",
+        INTEGRATION_API,
+        "find_existing_ticket",
+        {"phone_number": PHONE},
+    ),
+    ("Filter presets", "OD Filter Preset", "on_desk.api", "get_filter_presets", {}),
+]
+
+# Ticket lists of each scope and filter, as (description, conditions)
+TICKET_LISTS = [
+    ("Tickets by status", lambda: build_filter_conditions({"status": "Open"})),
+    (
+        "Tickets of a team",
+        lambda: get_user_ticket_conditions(["team:Billing", "team:Product Experts"]),
+    ),
+    (
+        "Tickets of a customer",
+        lambda: get_user_ticket_conditions(["raised_by:customer@example.com"]),
+    ),
+    (
+        "Tickets assigned to an agent",
+        lambda: get_user_ticket_conditions(["assigned:agent@example.com"]),
+    ),
+]
+
+INDEXED_TABLES = {f"tab{doctype}" for doctype, _fields in ALL_INDEXES} | {
+    "tabOD Ticket Assignment"
+}
+
+
+class TestQueryIndexes(FrappeTestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        add_query_indexes()
+
+    def setUp(self):
+        if frappe.db.db_type != "mariadb":
+            self.skipTest("EXPLAIN checks are written for MariaDB")
+
+        # Test tables are nearly empty, where a scan is as cheap as any
+        # index. Make the optimizer cost lookups as it would on real data.
+        self.max_seeks = frappe.db.sql("SELECT @@session.max_seeks_for_key")[0][0]
+        frappe.db.sql("SET SESSION max_seeks_for_key = 1")
+
+    def tearDown(self):
+        frappe.db.sql(f"SET SESSION max_seeks_for_key = {int(self.max_seeks)}")
+
+    def capture_queries(self, fn, *args, **kwargs):
+        """Run fn and return the (query, values) of the SELECTs it issued"""
+        sql = frappe.db.sql
+        with patch.object(frappe.db, "sql", wraps=sql) as recorder:
+            fn(*args, **kwargs)
+
+        queries = []
+        for call in recorder.call_args_list:
+            query = call.args[0] if call.args else call.kwargs.get("query")
+            values = call.args[1] if len(call.args) > 1 else call.kwargs.get("values", ())
+            if query.lstrip().upper().startswith("SELECT"):
+                queries.append((query, values))
+        return queries
+
+    def assertQueriesUseIndexes(self, description, queries):
+        self.assertTrue(queries, f"{description} ran no queries")
+        for query, values in queries:
+            plan = frappe.db.sql(f"EXPLAIN {query}", values, as_dict=True)
+            for step in plan:
+                table = (step.get("table") or "").strip("`")
+                # "system" tables hold at most a row and are read as a constant
+                if table not in INDEXED_TABLES or step.get("type") == "system":
+                    continue
+                with self.subTest(path=description, table=table):
+                    self.assertTrue(
+                        step.get("key"),
+                        f"{description} scans {table} without an index: "
+                        f"{' '.join(query.split())} -> {step}",
+                    )
+
+    def test_hot_paths_use_indexes(self):
+        """Every on_desk hot path query must be planned on an index"""
+        for description, doctype, module, function, kwargs in HOT_PATHS:
+            if not frappe.db.table_exists(doctype):
+                continue
+
+            # raised_by_phone is a custom field added by the WhatsApp setup
+            if function == "find_existing_ticket" and not frappe.db.has_column(
+                "HD Ticket", "raised_by_phone"
+            ):
+                continue
+
+            fn = getattr(importlib.import_module(module), function)
+            self.assertQueriesUseIndexes(description, self.capture_queries(fn, **kwargs))
+
+    def test_ticket_lists_use_indexes(self):
+        """Ticket list pages of every scope must be planned on an index"""
+        if not frappe.db.table_exists("HD Ticket"):
+            self.skipTest("Helpdesk is not installed")
+
+        for description, get_conditions in TICKET_LISTS:
+            queries = self.capture_queries(list_tickets, get_conditions())
+            self.assertQueriesUseIndexes(description, queries)
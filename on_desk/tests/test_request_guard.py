@@ -0,0 +1,106 @@
+# Copyright (c) 2025, Sydney Kibanga and Contributors
+# See license.txt
+
+from unittest.mock import patch
+
+import frappe
+from frappe.tests.utils import FrappeTestCase
+
+from on_desk.utils.request_guard import idempotent, take_token, throttle
+
+
+class TestTokenBucket(FrappeTestCase):
+    def setUp(self):
+        self.bucket = f"on_desk:test_bucket:{frappe.generate_hash(length=10)}"
+
+    def tearDown(self):
+        frappe.cache().delete_value(self.bucket)
+
+    def take_at(self, now, rate=0.5, capacity=2):
+        with patch("on_desk.utils.request_guard.time.time", return_value=now):
+            return take_token(self.bucket, rate, capacity)
+
+    def test_bucket_allows_a_burst_up_to_capacity(self):
+        self.assertTrue(self.take_at(1000))
+        self.assertTrue(self.take_at(1000))
+        self.assertFalse(self.take_at(1000))
+
+    def test_bucket_refills_at_rate(self):
+        for _ in range(2):
+            self.take_at(1000)
+
+        # Half a token after one second, a whole one after two
+        self.assertFalse(self.take_at(1001))
+        self.assertTrue(self.take_at(1002))
+        self.assertFalse(self.take_at(1002))
+
+    def test_refill_stops_at_capacity(self):
+        self.take_at(1000)
+        results = [self.take_at(2000) for _ in range(3)]
+        self.assertEqual(results, [True, True, False])
+
+
+class TestThrottle(FrappeTestCase):
+    def setUp(self):
+        self.action = f"test_{frappe.generate_hash(length=10)}"
+        self.request_ip = frappe.local.request_ip
+        frappe.local.request_ip = "203.0.113.7"
+
+    def tearDown(self):
+        frappe.local.request_ip = self.request_ip
+        frappe.cache().delete_keys(f"on_desk:rate_limit:{self.action}:")
+
+    def test_calls_beyond_the_burst_are_rejected(self):
+        @throttle(self.action, rate=0.001, capacity=2)
+        def create():
+            return "created"
+
+        self.assertEqual([create(), create()], ["created", "created"])
+        self.assertRaises(frappe.TooManyRequestsError, create)
+
+
+class TestIdempotency(FrappeTestCase):
+    def setUp(self):
+        self.calls = 0
+        self.key = frappe.generate_hash(length=20)
+
+    def tearDown(self):
+        # Drop the stores and releases queued by calls that never committed
+        frappe.db.after_commit.reset()
+        frappe.db.after_rollback.reset()
+        frappe.cache().delete_keys("on_desk:idempotency:test_")
+
+    def make_endpoint(self, success=True):
+        @idempotent("test_create")
+        def create():
+            self.calls += 1
+            return {"success": success, "ticket": self.calls}
+
+        return create
+
+    def test_retry_replays_the_committed_result(self):
+        create = self.make_endpoint()
+        first = create(idempotency_key=self.key)
+        frappe.db.after_commit.run()
+
+        self.assertEqual(create(idempotency_key=self.key), first)
+        self.assertEqual(self.calls, 1)
+
+    def test_retry_while_running_is_rejected(self):
+        create = self.make_endpoint()
+        create(idempotency_key=self.key)
+
+        # Not committed yet, the key is still pending
+        self.assertRaises(frappe.DuplicateEntryError, create, idempotency_key=self.key)
+
+    def test_failed_call_releases_the_key(self):
+        create = self.make_endpoint(success=False)
+        create(idempotency_key=self.key)
+        create(idempotency_key=self.key)
+        self.assertEqual(self.calls, 2)
+
+    def test_calls_without_a_key_always_run(self):
+        create = self.make_endpoint()
+        create()
+        create()
+        self.assertEqual(self.calls, 2)
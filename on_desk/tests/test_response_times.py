@@ -0,0 +1,112 @@
+# Copyright (c) 2025, Sydney Kibanga and Contributors
+# See license.txt
+
+from collections import Counter
+
+import frappe
+from frappe.tests.utils import FrappeTestCase
+from frappe.utils import add_days, getdate, nowdate
+
+from on_desk.utils.response_times import (
+    GAMMA,
+    RELATIVE_ACCURACY,
+    add_to_sketches,
+    format_duration,
+    get_bucket,
+    get_bucket_value,
+    get_merged_sketch,
+    get_quantiles,
+)
+
+
+def make_sketch(values):
+    return Counter(get_bucket(value) for value in values)
+
+
+class TestResponseTimeSketches(FrappeTestCase):
+    def assertWithinAccuracy(self, estimate, expected):
+        self.assertLessEqual(abs(estimate - expected) / expected, RELATIVE_ACCURACY)
+
+    def test_bucket_boundaries(self):
+        # Bucket i holds (gamma^(i-1), gamma^i]
+        for bucket in (1, 5, 100, 500):
+            upper = GAMMA**bucket
+            with self.subTest(bucket=bucket):
+                self.assertEqual(get_bucket(upper * (1 - 1e-9)), bucket)
+                self.assertEqual(get_bucket(upper * (1 + 1e-9)), bucket + 1)
+
+    def test_durations_below_a_second_share_the_first_bucket(self):
+        for seconds in (-5, 0, 0.5, 1):
+            with self.subTest(seconds=seconds):
+                self.assertEqual(get_bucket(seconds), 0)
+
+    def test_bucket_value_is_within_accuracy(self):
+        for seconds in (2, 59, 3600, 86400 * 30):
+            with self.subTest(seconds=seconds):
+                self.assertWithinAccuracy(get_bucket_value(get_bucket(seconds)), seconds)
+
+    def test_quantiles_of_a_known_distribution(self):
+        # 1..1000 seconds: p50 is the 500th and p90 the 900th smallest value
+        quantiles = get_quantiles(make_sketch(range(1, 1001)), [0.5, 0.9])
+        self.assertWithinAccuracy(quantiles[0.5], 501)
+        self.assertWithinAccuracy(quantiles[0.9], 900)
+
+    def test_quantiles_of_a_single_value(self):
+        quantiles = get_quantiles(make_sketch([7200]), [0.5, 0.9])
+        self.assertWithinAccuracy(quantiles[0.5], 7200)
+        self.assertEqual(quantiles[0.5], quantiles[0.9])
+
+    def test_empty_sketch_has_no_quantiles(self):
+        self.assertEqual(get_quantiles(Counter(), [0.5, 0.9]), {0.5: None, 0.9: None})
+
+    def test_merged_sketches_match_a_sketch_of_all_values(self):
+        fast, slow = range(60, 600), range(3600, 7200, 7)
+        merged = make_sketch(fast) + make_sketch(slow)
+
+        self.assertEqual(merged, make_sketch([*fast, *slow]))
+        self.assertEqual(
+            get_quantiles(merged, [0.5, 0.9]),
+            get_quantiles(make_sketch([*fast, *slow]), [0.5, 0.9]),
+        )
+
+    def test_format_duration(self):
+        self.assertEqual(format_duration(None), "N/A")
+        self.assertEqual(format_duration(10), "1m")
+        self.assertEqual(format_duration(45 * 60), "45m")
+        self.assertEqual(format_duration(90 * 60), "1.5h")
+        self.assertEqual(format_duration(3 * 86400), "3.0d")
+
+
+class TestResponseTimeStorage(FrappeTestCase):
+    metric = "test_first_response"
+
+    def tearDown(self):
+        frappe.cache().delete_keys(f"on_desk:response_sketch:{self.metric}:")
+
+    def record(self, team, day, seconds):
+        pipe = frappe.cache().pipeline()
+        add_to_sketches(pipe, self.metric, team, day, seconds)
+        pipe.execute()
+
+    def test_days_and_teams_are_merged(self):
+        today = getdate(nowdate())
+        yesterday = add_days(today, -1)
+
+        self.record("Billing", today, 60)
+        self.record("Billing", yesterday, 120)
+        self.record("Product Experts", today, 3600)
+        self.record(None, today, 7200)
+
+        billing = get_merged_sketch(self.metric, ["Billing"], days=2)
+        self.assertEqual(sum(billing.values()), 2)
+        self.assertEqual(billing, make_sketch([60, 120]))
+
+        # Only today
+        self.assertEqual(
+            get_merged_sketch(self.metric, ["Billing"], days=1), make_sketch([60])
+        )
+
+        # Every ticket, with or without a team, is in the "all" sketches
+        self.assertEqual(
+            get_merged_sketch(self.metric, days=2), make_sketch([60, 120, 3600, 7200])
+        )
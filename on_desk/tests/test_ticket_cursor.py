@@ -0,0 +1,120 @@
+# Copyright (c) 2025, Sydney Kibanga and Contributors
+# See license.txt
+
+import datetime
+
+import frappe
+from frappe.tests.utils import FrappeTestCase
+from frappe.utils import get_datetime
+
+from on_desk.api import (
+    decode_ticket_cursor,
+    encode_ticket_cursor,
+    get_ticket_page_by_cursor,
+    get_tickets_advanced,
+)
+
+
+class TestTicketCursorEncoding(FrappeTestCase):
+    def test_round_trip_keeps_microseconds(self):
+        modified = datetime.datetime(2025, 3, 4, 10, 20, 30, 123456)
+        cursor = encode_ticket_cursor({"name": "42", "modified": modified}, "modified", "next")
+
+        position = decode_ticket_cursor(cursor)
+        self.assertEqual(position["name"], "42")
+        self.assertEqual(position["direction"], "next")
+        self.assertEqual(get_datetime(position["value"]), modified)
+
+    def test_round_trip_prev_direction(self):
+        cursor = encode_ticket_cursor({"name": "7", "creation": "2025-01-01"}, "creation", "prev")
+        self.assertEqual(decode_ticket_cursor(cursor)["direction"], "prev")
+
+    def test_cursor_is_url_safe(self):
+        cursor = encode_ticket_cursor(
+            {"name": "a/b+c?", "modified": "2025-01-01 00:00:00"}, "modified", "next"
+        )
+        self.assertNotRegex(cursor, r"[+/]")
+
+    def test_invalid_cursor_is_rejected(self):
+        for cursor in ("not a cursor", encode_ticket_cursor({"name": ""}, "name", "next")):
+            with self.subTest(cursor=cursor):
+                self.assertRaises(frappe.ValidationError, decode_ticket_cursor, cursor)
+
+    def test_cursor_pagination_rejects_other_sorts(self):
+        result = get_tickets_advanced(sort_by="priority", pagination="cursor")
+        self.assertFalse(result["success"])
+
+
+class TestTicketCursorPaging(FrappeTestCase):
+    """Walk a set of tickets whose sort values tie in pages of two"""
+
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        if not frappe.db.exists("DocType", "HD Ticket"):
+            raise cls.skipTest(cls, "Helpdesk is not installed")
+
+        # Three tickets share a timestamp, so only the name orders them
+        timestamps = [
+            "2025-01-01 09:00:00.000001",
+            "2025-01-01 09:00:00.500000",
+            "2025-01-01 09:00:00.500000",
+            "2025-01-01 09:00:00.500000",
+            "2025-01-01 09:00:01.000000",
+        ]
+        cls.names = []
+        for i, timestamp in enumerate(timestamps):
+            ticket = frappe.get_doc(
+                {
+                    "doctype": "HD Ticket",
+                    "subject": f"Cursor test {i}",
+                    "raised_by": "cursor-test@example.com",
+                    "description": "Cursor test",
+                }
+            ).insert(ignore_permissions=True)
+            frappe.db.set_value(
+                "HD Ticket", ticket.name, "modified", timestamp, update_modified=False
+            )
+            cls.names.append(ticket.name)
+
+    def get_expected(self, sort_order):
+        return frappe.get_all(
+            "HD Ticket",
+            filters={"name": ["in", self.names]},
+            order_by=f"modified {sort_order}, name {sort_order}",
+            pluck="name",
+        )
+
+    def walk(self, sort_order):
+        conditions = [["name", "in", self.names]]
+        pages, cursor = [], None
+        while True:
+            tickets, cursors = get_ticket_page_by_cursor(
+                conditions, "modified", sort_order, cursor, 2
+            )
+            pages.append((tickets, cursors))
+            if not cursors["has_more"]:
+                return pages
+            cursor = cursors["next_cursor"]
+
+    def test_next_pages_cover_every_ticket_once(self):
+        for sort_order in ("asc", "desc"):
+            with self.subTest(sort_order=sort_order):
+                pages = self.walk(sort_order)
+                seen = [ticket.name for tickets, _cursors in pages for ticket in tickets]
+                self.assertEqual(seen, self.get_expected(sort_order))
+                self.assertIsNone(pages[-1][1]["next_cursor"])
+
+    def test_prev_pages_return_the_same_pages(self):
+        conditions = [["name", "in", self.names]]
+        for sort_order in ("asc", "desc"):
+            with self.subTest(sort_order=sort_order):
+                pages = self.walk(sort_order)
+                for (previous, _cursors), (_tickets, cursors) in zip(pages, pages[1:]):
+                    tickets, _back = get_ticket_page_by_cursor(
+                        conditions, "modified", sort_order, cursors["prev_cursor"], 2
+                    )
+                    self.assertEqual(
+                        [ticket.name for ticket in tickets],
+                        [ticket.name for ticket in previous],
+                    )
@@ -0,0 +1,85 @@
+# Copyright (c) 2025, Sydney Kibanga and Contributors
+# See license.txt
+
+from unittest.mock import patch
+
+import frappe
+from frappe.tests.utils import FrappeTestCase
+
+from on_desk.api import get_user_ticket_scope
+from on_desk.utils.ticket_cache import make_ticket_cache_key, normalize_ticket_filters
+
+
+class TestNormalizeTicketFilters(FrappeTestCase):
+    def test_empty_and_all_filters_are_dropped(self):
+        self.assertEqual(
+            normalize_ticket_filters(
+                {
+                    "status": "Open",
+                    "priority": "All",
+                    "agent_group": "",
+                    "customer": None,
+                    "ticket_type": [],
+                    "date_range": {},
+                }
+            ),
+            {"status": "Open"},
+        )
+
+    def test_multi_value_filters_are_sorted(self):
+        self.assertEqual(
+            normalize_ticket_filters({"status": ["Replied", "Open"]}),
+            {"status": ["Open", "Replied"]},
+        )
+
+    def test_equivalent_filters_share_a_cache_key(self):
+        first = normalize_ticket_filters(
+            {"status": ["Replied", "Open"], "priority": "All"}
+        )
+        second = normalize_ticket_filters(
+            {"priority": "", "status": ["Open", "Replied"]}
+        )
+        self.assertEqual(
+            make_ticket_cache_key("ticket_list", ["all"], first),
+            make_ticket_cache_key("ticket_list", ["all"], second),
+        )
+
+    def test_no_filters(self):
+        self.assertEqual(normalize_ticket_filters(None), {})
+
+
+class TestUserTicketScope(FrappeTestCase):
+    def scope_with_roles(self, roles, teams=()):
+        team_members = [frappe._dict(parent=team) for team in teams]
+        with patch("frappe.get_roles", return_value=roles), patch(
+            "on_desk.api.has_doctype", return_value=True
+        ), patch("frappe.get_all", return_value=team_members):
+            return get_user_ticket_scope("agent@example.com")
+
+    def test_managers_see_all_tickets(self):
+        for role in ("Administrator", "System Manager", "Helpdesk Manager"):
+            with self.subTest(role=role):
+                self.assertEqual(
+                    self.scope_with_roles([role, "Helpdesk Agent"]), ["all"]
+                )
+
+    def test_agents_see_their_teams(self):
+        self.assertEqual(
+            self.scope_with_roles(["Helpdesk Agent"], ["Product Experts", "Billing"]),
+            ["team:Billing", "team:Product Experts"],
+        )
+
+    def test_agents_without_a_team_see_their_assignments(self):
+        self.assertEqual(
+            self.scope_with_roles(["Agent"]), ["assigned:agent@example.com"]
+        )
+
+    def test_other_users_see_tickets_they_raised(self):
+        self.assertEqual(
+            self.scope_with_roles(["Customer"]), ["raised_by:agent@example.com"]
+        )
+
+    def test_defaults_to_the_session_user(self):
+        self.assertEqual(
+            get_user_ticket_scope(), get_user_ticket_scope(frappe.session.user)
+        )
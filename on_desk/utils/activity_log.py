@@ -0,0 +1,72 @@
+# Copyright (c) 2025, Sydney Kibanga and contributors
+# For license information, please see license.txt
+
+import frappe
+from frappe.utils import now_datetime
+
+from on_desk.utils.capabilities import has_doctype
+
+# HD Ticket Activity rows logged during a request are kept on frappe.local and
+# written with one bulk insert just before the transaction commits. Rows of a
+# transaction that rolls back are dropped with it.
+ACTIVITY_FIELDS = [
+    "name",
+    "creation",
+    "modified",
+    "owner",
+    "modified_by",
+    "reference_ticket",
+    "action",
+    "description",
+]
+
+
+def log_ticket_activity(ticket, action, description):
+    """
+    Queue an activity log entry for a ticket
+
+    Args:
+        ticket (str): HD Ticket name
+        action (str): Short action label, e.g. "Status Updated"
+        description (str): What happened
+    """
+    if not has_doctype("HD Ticket Activity"):
+        return
+
+    buffer = getattr(frappe.local, "on_desk_activity_log", None)
+    if buffer is None:
+        buffer = frappe.local.on_desk_activity_log = []
+        frappe.db.before_commit.add(flush_ticket_activities)
+        frappe.db.after_rollback.add(discard_ticket_activities)
+
+    timestamp = now_datetime()
+    buffer.append(
+        (
+            frappe.generate_hash(length=10),
+            timestamp,
+            timestamp,
+            frappe.session.user,
+            frappe.session.user,
+            ticket,
+            action,
+            description,
+        )
+    )
+
+
+def flush_ticket_activities():
+    """Write the queued activity rows (before commit)"""
+    rows = getattr(frappe.local, "on_desk_activity_log", None)
+    frappe.local.on_desk_activity_log = None
+    if not rows:
+        return
+
+    try:
+        frappe.db.bulk_insert("HD Ticket Activity", ACTIVITY_FIELDS, rows)
+    except Exception as e:
+        frappe.logger().error(f"Error creating activity log: {str(e)}")
+
+
+def discard_ticket_activities():
+    """Drop the queued activity rows (after rollback)"""
+    frappe.local.on_desk_activity_log = None
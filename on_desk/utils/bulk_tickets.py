@@ -0,0 +1,261 @@
+# Copyright (c) 2025, Sydney Kibanga and contributors
+# For license information, please see license.txt
+
+import frappe
+from frappe import _
+from frappe.desk.form.assign_to import add as add_assignment
+
+from on_desk.api import (
+    build_filter_conditions,
+    build_search_conditions,
+    get_user_ticket_conditions,
+    get_user_ticket_scope,
+)
+from on_desk.utils.activity_log import log_ticket_activity
+
+# Tickets committed per transaction by background jobs
+BULK_CHUNK_SIZE = 100
+
+# Larger sets are processed by a background job that reports its progress
+BULK_BACKGROUND_THRESHOLD = 200
+
+BULK_UPDATE_FIELDS = ["status", "priority"]
+
+
+def get_bulk_ticket_names(tickets=None, filters=None, search_text=None, user=None):
+    """
+    Get the tickets a bulk operation applies to, within the user's scope
+
+    Args:
+        tickets (list): Ticket names, takes precedence over filters
+        filters (dict): Advanced filter criteria, as for get_tickets_advanced
+        search_text (str): Text to search across multiple fields
+        user (str): User to scope the tickets to, defaults to the session user
+    """
+    conditions = get_user_ticket_conditions(get_user_ticket_scope(user))
+
+    if tickets:
+        conditions = conditions + [["name", "in", tickets]]
+    elif filters or (search_text or "").strip():
+        search_conditions, _relevance = build_search_conditions(search_text)
+        conditions = conditions + build_filter_conditions(filters) + search_conditions
+    else:
+        frappe.throw(_("Select the tickets to update"))
+
+    return frappe.get_all(
+        "HD Ticket", filters=conditions, pluck="name", order_by="name asc", limit=0
+    )
+
+
+def publish_bulk_progress(bulk_id, done, total, user):
+    frappe.publish_realtime(
+        "on_desk_bulk_ticket_progress",
+        {"bulk_id": bulk_id, "done": done, "total": total},
+        user=user,
+    )
+
+
+def check_write_permission(name):
+    """Fail a ticket the acting user cannot change, like the form would"""
+    if not frappe.has_permission("HD Ticket", "write", name):
+        frappe.throw(
+            _("Not permitted to update ticket {0}").format(name),
+            frappe.PermissionError,
+        )
+
+
+def apply_in_chunks(names, apply, bulk_id=None, user=None):
+    """
+    Apply a change to tickets, each one rolled back on its own if it fails
+
+    In a background job every chunk is committed, so progress survives a
+    failure later on. In a request the usual commit at its end applies.
+
+    Args:
+        names (list): Ticket names
+        apply (callable): Changes one ticket, returns True if it changed
+        bulk_id (str): Background operation to report progress for
+        user (str): User the progress is reported to
+
+    Returns:
+        tuple: (changed ticket names, {ticket name: error message})
+    """
+    changed = []
+    failed = {}
+
+    for start in range(0, len(names), BULK_CHUNK_SIZE):
+        for name in names[start : start + BULK_CHUNK_SIZE]:
+            frappe.db.savepoint("on_desk_bulk_ticket")
+            try:
+                if apply(name):
+                    changed.append(name)
+            except Exception as e:
+                frappe.db.rollback(save_point="on_desk_bulk_ticket")
+                failed[name] = str(e)
+            frappe.clear_messages()
+
+        if bulk_id:
+            # Queued activity rows are written by this commit in one insert
+            frappe.db.commit()
+            publish_bulk_progress(
+                bulk_id, min(start + BULK_CHUNK_SIZE, len(names)), len(names), user
+            )
+
+    return changed, failed
+
+
+def update_tickets(names, values, bulk_id=None, user=None):
+    """
+    Set status and/or priority on tickets
+
+    Args:
+        names (list): Ticket names
+        values (dict): New values of fields in BULK_UPDATE_FIELDS
+    """
+
+    def apply(name):
+        check_write_permission(name)
+        ticket_doc = frappe.get_doc("HD Ticket", name)
+        activities = []
+        for field, value in values.items():
+            if ticket_doc.get(field) != value:
+                activities.append(
+                    (
+                        f"{frappe.unscrub(field)} Updated",
+                        f"{frappe.unscrub(field)} changed from {ticket_doc.get(field)} to {value}",
+                    )
+                )
+                ticket_doc.set(field, value)
+
+        if not activities:
+            return False
+
+        # One aggregated event is sent for the whole operation
+        ticket_doc.flags.notify_update = False
+        ticket_doc.save()
+
+        for action, description in activities:
+            log_ticket_activity(name, action, description)
+        return True
+
+    changed, failed = apply_in_chunks(names, apply, bulk_id, user)
+    return finish_bulk_operation("update", changed, failed, values, bulk_id, user)
+
+
+def assign_tickets(names, assignee, bulk_id=None, user=None):
+    """
+    Assign tickets to a user
+
+    Args:
+        names (list): Ticket names
+        assignee (str): User the tickets are assigned to
+    """
+
+    def apply(name):
+        check_write_permission(name)
+        assigned = frappe.get_all(
+            "ToDo",
+            filters={
+                "reference_type": "HD Ticket",
+                "reference_name": name,
+                "allocated_to": assignee,
+                "status": "Open",
+            },
+            limit=1,
+        )
+        if assigned:
+            return False
+
+        # The ToDo hook keeps the assignment table in sync
+        add_assignment(
+            {
+                "assign_to": [assignee],
+                "doctype": "HD Ticket",
+                "name": name,
+                "description": f"Ticket {name} assigned",
+            }
+        )
+        log_ticket_activity(name, "Assignment", f"Ticket assigned to {assignee}")
+        return True
+
+    changed, failed = apply_in_chunks(names, apply, bulk_id, user)
+    return finish_bulk_operation(
+        "assign", changed, failed, {"assigned_to": assignee}, bulk_id, user
+    )
+
+
+def publish_bulk_ticket_update(operation, changed):
+    """Tell the open ticket lists which tickets a bulk change touched"""
+    # Only users who can read HD Ticket join its room. The new values and
+    # the errors go to the acting user alone, with the operation's result.
+    frappe.publish_realtime(
+        "on_desk_bulk_ticket_update",
+        {"operation": operation, "updated": changed},
+        doctype="HD Ticket",
+    )
+
+
+def finish_bulk_operation(operation, changed, failed, values, bulk_id=None, user=None):
+    """Send one realtime event for every ticket changed and build the result"""
+    result = {
+        "success": True,
+        "operation": operation,
+        "values": values,
+        "updated": changed,
+        "failed": failed,
+        "bulk_id": bulk_id,
+    }
+
+    if changed:
+        publish_bulk_ticket_update(operation, changed)
+    if bulk_id:
+        frappe.publish_realtime("on_desk_bulk_ticket_done", result, user=user)
+
+    return result
+
+
+def run_bulk_operation(operation, names, bulk_id, user, **kwargs):
+    """Background job of a bulk operation too large to run in the request"""
+    try:
+        if operation == "assign":
+            assign_tickets(names, kwargs["assignee"], bulk_id, user)
+        else:
+            update_tickets(names, kwargs["values"], bulk_id, user)
+    except Exception as e:
+        frappe.log_error(
+            f"Error in bulk ticket {operation}: {str(e)}", "Bulk Ticket Error"
+        )
+        frappe.publish_realtime(
+            "on_desk_bulk_ticket_done",
+            {"success": False, "bulk_id": bulk_id, "message": str(e)},
+            user=user,
+        )
+
+
+def start_bulk_operation(operation, names, **kwargs):
+    """Run a bulk operation now, or in a background job for large sets"""
+    if len(names) <= BULK_BACKGROUND_THRESHOLD:
+        if operation == "assign":
+            return assign_tickets(names, kwargs["assignee"])
+        return update_tickets(names, kwargs["values"])
+
+    bulk_id = frappe.generate_hash(length=10)
+    frappe.enqueue(
+        "on_desk.utils.bulk_tickets.run_bulk_operation",
+        queue="long",
+        timeout=3600,
+        operation=operation,
+        names=names,
+        bulk_id=bulk_id,
+        user=frappe.session.user,
+        **kwargs,
+    )
+    return {
+        "success": True,
+        "queued": True,
+        "bulk_id": bulk_id,
+        "total": len(names),
+        "message": _("{0} tickets are being updated in the background").format(
+            len(names)
+        ),
+    }
@@ -0,0 +1,121 @@
+# Copyright (c) 2025, Sydney Kibanga and contributors
+# For license information, please see license.txt
+
+import frappe
+
+# on_desk works with or without parts of Helpdesk installed. Which doctypes
+# and columns exist is recorded once in a registry instead of being probed
+# with frappe.db.exists("DocType", ...) on every request.
+#
+# The registry is stored in Redis and kept per process, keyed by site. A
+# version stamp, read once per request, tells a process its copy is stale.
+CAPABILITIES_KEY = "on_desk:capabilities"
+CAPABILITIES_VERSION_KEY = "on_desk:capabilities_version"
+
+HELPDESK_DOCTYPES = [
+    "HD Ticket",
+    "HD Ticket Activity",
+    "HD Ticket Status",
+    "HD Ticket Priority",
+    "HD Ticket Type",
+    "HD Team",
+    "HD Team Member",
+    "HD Agent",
+    "HD Agent Group",
+    "HD Customer",
+]
+
+# Doctypes whose columns are recorded, for optional and custom fields
+FIELD_DOCTYPES = ["HD Ticket"]
+
+_registry = {}
+
+
+def build_capabilities():
+    """Probe the database for the doctypes and fields on_desk adapts to"""
+    doctypes = frappe.get_all(
+        "DocType", filters={"name": ["in", HELPDESK_DOCTYPES]}, pluck="name"
+    )
+    fields = {
+        doctype: frappe.db.get_table_columns(doctype)
+        for doctype in FIELD_DOCTYPES
+        if doctype in doctypes and frappe.db.table_exists(doctype)
+    }
+
+    return {
+        "version": frappe.generate_hash(length=10),
+        "doctypes": sorted(doctypes),
+        "fields": fields,
+        "fulltext_indexes": get_fulltext_indexes(),
+    }
+
+
+def get_fulltext_indexes():
+    """Names of the FULLTEXT indexes of the ticket search index"""
+    # Import here to avoid circular import
+    from on_desk.utils.ticket_search import SEARCH_INDEX_DOCTYPE, SEARCH_INDEX_TABLE
+
+    if frappe.db.db_type != "mariadb" or not frappe.db.table_exists(
+        SEARCH_INDEX_DOCTYPE
+    ):
+        return []
+
+    return sorted(
+        {
+            row.Key_name
+            for row in frappe.db.sql(
+                f"SHOW INDEX FROM `{SEARCH_INDEX_TABLE}` WHERE Index_type = 'FULLTEXT'",
+                as_dict=True,
+            )
+        }
+    )
+
+
+def refresh_capabilities(doc=None, method=None):
+    """Rebuild the registry (after_migrate, after_install, Custom Field changes)"""
+    if doc and doc.get("dt") not in FIELD_DOCTYPES:
+        return
+
+    capabilities = build_capabilities()
+    frappe.cache().set_value(CAPABILITIES_KEY, capabilities)
+    frappe.cache().set_value(CAPABILITIES_VERSION_KEY, capabilities["version"])
+    _registry.pop(frappe.local.site, None)
+
+
+def get_capabilities():
+    version = frappe.cache().get_value(CAPABILITIES_VERSION_KEY)
+    capabilities = _registry.get(frappe.local.site)
+    if capabilities and capabilities["version"] == version:
+        return capabilities
+
+    capabilities = frappe.cache().get_value(CAPABILITIES_KEY)
+    if not capabilities or capabilities["version"] != version:
+        refresh_capabilities()
+        capabilities = frappe.cache().get_value(CAPABILITIES_KEY)
+
+    capabilities = {
+        "version": capabilities["version"],
+        "doctypes": set(capabilities["doctypes"]),
+        "fields": {
+            doctype: set(columns)
+            for doctype, columns in capabilities["fields"].items()
+        },
+        "fulltext_indexes": set(capabilities.get("fulltext_indexes") or ()),
+    }
+    _registry[frappe.local.site] = capabilities
+    return capabilities
+
+
+def has_doctype(doctype):
+    """Whether a Helpdesk doctype is installed"""
+    return doctype in get_capabilities()["doctypes"]
+
+
+def has_field(doctype, fieldname):
+    """Whether a doctype listed in FIELD_DOCTYPES has a column"""
+    return fieldname in get_capabilities()["fields"].get(doctype, ())
+
+
+def has_fulltext_index(index_name):
+    """Whether the ticket search index has a FULLTEXT index"""
+    return index_name in get_capabilities()["fulltext_indexes"]
@@ -0,0 +1,310 @@
+# Copyright (c) 2025, Sydney Kibanga and contributors
+# For license information, please see license.txt
+
+from collections import Counter, defaultdict
+
+import frappe
+from frappe.utils import get_datetime, getdate, now_datetime, nowdate
+
+from on_desk.utils.capabilities import has_field
+from on_desk.utils.ticket_cache import get_ticket_scope_tokens
+
+# Dashboard totals are kept in Redis per ticket scope token (see
+# on_desk.utils.ticket_cache), so the dashboard reads a few keys instead of
+# scanning HD Ticket.
+#
+#   DASHBOARD_COUNTERS_KEY   hash per token: total, in_progress and
+#                            resolved:<date>, the tickets resolved on a date
+#   DASHBOARD_OVERDUE_KEY    sorted set per token of unresolved tickets
+#                            scored by resolution_by, overdue ones are the
+#                            members scored before now
+#   DASHBOARD_CUSTOMERS_KEY  number of HD Customers
+#
+# HD Ticket hooks apply the difference a write makes after it commits, the
+# hourly reconcile rebuilds everything from the database.
+DASHBOARD_COUNTERS_KEY = "on_desk:dashboard_counters:{0}"
+DASHBOARD_OVERDUE_KEY = "on_desk:dashboard_overdue:{0}"
+DASHBOARD_CUSTOMERS_KEY = "on_desk:dashboard_customers"
+DASHBOARD_RECONCILED_KEY = "on_desk:dashboard_reconciled"
+
+RESOLVED_STATUSES = ["Resolved", "Closed"]
+
+
+def get_resolved_on(ticket):
+    """Date a resolved ticket counts as resolved on"""
+    if has_field("HD Ticket", "resolution_date") and ticket.get("resolution_date"):
+        return getdate(ticket.get("resolution_date"))
+    return getdate(ticket.get("modified") or now_datetime())
+
+
+def get_ticket_counters(ticket):
+    """Counter increments a ticket contributes to each of its scope tokens"""
+    if ticket.get("status") in RESOLVED_STATUSES:
+        return {"total": 1, f"resolved:{get_resolved_on(ticket)}": 1}
+    return {"total": 1, "in_progress": 1}
+
+
+def get_overdue_score(ticket):
+    """Sorted set score of an unresolved ticket with a resolution deadline"""
+    if ticket.get("status") in RESOLVED_STATUSES or not ticket.get("resolution_by"):
+        return None
+    return get_datetime(ticket.get("resolution_by")).timestamp()
+
+
+def get_counter_changes(before, after, before_tokens=None, after_tokens=None):
+    """
+    Get the counter deltas and sorted set changes that turn the contribution
+    of `before` into that of `after`. Either can be None.
+    """
+    deltas = defaultdict(Counter)
+    overdue_remove = set()
+    overdue_add = {}
+
+    if before:
+        for token in before_tokens or get_ticket_scope_tokens(before):
+            for field, value in get_ticket_counters(before).items():
+                deltas[token][field] -= value
+            overdue_remove.add(token)
+
+    if after:
+        score = get_overdue_score(after)
+        for token in after_tokens or get_ticket_scope_tokens(after):
+            for field, value in get_ticket_counters(after).items():
+                deltas[token][field] += value
+            if score is not None:
+                overdue_add[token] = score
+
+    deltas = {
+        token: {field: delta for field, delta in fields.items() if delta}
+        for token, fields in deltas.items()
+    }
+    return {token: fields for token, fields in deltas.items() if fields}, (
+        overdue_remove,
+        overdue_add,
+    )
+
+
+def apply_counter_changes(ticket_name, deltas, overdue):
+    cache = frappe.cache()
+    overdue_remove, overdue_add = overdue
+
+    pipe = cache.pipeline()
+    for token, fields in deltas.items():
+        key = cache.make_key(DASHBOARD_COUNTERS_KEY.format(token))
+        for field, delta in fields.items():
+            pipe.hincrby(key, field, delta)
+    for token in overdue_remove:
+        pipe.zrem(cache.make_key(DASHBOARD_OVERDUE_KEY.format(token)), ticket_name)
+    for token, score in overdue_add.items():
+        pipe.zadd(
+            cache.make_key(DASHBOARD_OVERDUE_KEY.format(token)), {ticket_name: score}
+        )
+    pipe.execute()
+
+
+def queue_counter_changes(ticket_name, before, after, **tokens):
+    deltas, overdue = get_counter_changes(before, after, **tokens)
+    if deltas or overdue[0] or overdue[1]:
+        frappe.db.after_commit.add(
+            lambda: apply_counter_changes(ticket_name, deltas, overdue)
+        )
+
+
+def update_dashboard_counters(doc, method=None):
+    """HD Ticket after_insert / on_update / on_trash"""
+    if method == "on_update" and doc.flags.in_insert:
+        # Counted by after_insert
+        return
+
+    if method == "after_insert":
+        before, after = None, doc
+    elif method == "on_trash":
+        before, after = doc, None
+    else:
+        before, after = doc.get_doc_before_save(), doc
+
+    queue_counter_changes(doc.name, before, after)
+
+
+def move_assignment_counters(ticket, added=None, removed=None):
+    """
+    Count a ticket under the assigned:<user> tokens of new assignees and
+    remove it from those of former ones. Assignments change without HD
+    Ticket hooks.
+    """
+    values = frappe.db.get_value(
+        "HD Ticket", ticket, get_counter_fields(), as_dict=True
+    )
+    if not values:
+        return
+
+    if removed:
+        queue_counter_changes(
+            ticket, values, None, before_tokens=[f"assigned:{u}" for u in removed]
+        )
+    if added:
+        queue_counter_changes(
+            ticket, None, values, after_tokens=[f"assigned:{u}" for u in added]
+        )
+
+
+def update_customer_count(doc, method=None):
+    """HD Customer after_insert / on_trash"""
+    delta = -1 if method == "on_trash" else 1
+    frappe.db.after_commit.add(
+        lambda: frappe.cache().incrby(
+            frappe.cache().make_key(DASHBOARD_CUSTOMERS_KEY), delta
+        )
+    )
+
+
+def get_counter_fields():
+    fields = ["name", "status", "agent_group", "raised_by", "_assign", "modified"]
+    for field in ("resolution_by", "resolution_date"):
+        if has_field("HD Ticket", field):
+            fields.append(field)
+    return fields
+
+
+def get_dashboard_counters(scope):
+    """
+    Get the dashboard totals of the tickets in a scope
+
+    Scopes with several tokens are teams, and a ticket belongs to one team,
+    so the totals of the tokens add up.
+
+    Args:
+        scope (list): Scope tokens, as from get_user_ticket_scope
+
+    Returns:
+        dict: total_tickets, resolved_tickets (today), in_progress_tickets,
+            overdue_tickets and total_customers
+    """
+    cache = frappe.cache()
+    if not cache.exists(cache.make_key(DASHBOARD_RECONCILED_KEY)):
+        # Counters were lost, e.g. with a Redis flush
+        frappe.enqueue(
+            "on_desk.utils.dashboard_counters.reconcile_dashboard_counters",
+            queue="long",
+            job_id="on_desk_reconcile_dashboard_counters",
+            deduplicate=True,
+        )
+
+    resolved_field = f"resolved:{nowdate()}"
+    now = now_datetime().timestamp()
+
+    pipe = cache.pipeline()
+    for token in scope:
+        pipe.hmget(
+            cache.make_key(DASHBOARD_COUNTERS_KEY.format(token)),
+            ["total", resolved_field, "in_progress"],
+        )
+        pipe.zcount(cache.make_key(DASHBOARD_OVERDUE_KEY.format(token)), "-inf", now)
+    pipe.get(cache.make_key(DASHBOARD_CUSTOMERS_KEY))
+    results = pipe.execute()
+
+    stats = Counter()
+    for counters, overdue in zip(results[0:-1:2], results[1:-1:2]):
+        total, resolved, in_progress = (int(value or 0) for value in counters)
+        stats["total_tickets"] += total
+        stats["resolved_tickets"] += resolved
+        stats["in_progress_tickets"] += in_progress
+        stats["overdue_tickets"] += overdue
+
+    return {
+        "total_tickets": stats["total_tickets"],
+        "resolved_tickets": stats["resolved_tickets"],
+        "in_progress_tickets": stats["in_progress_tickets"],
+        "overdue_tickets": stats["overdue_tickets"],
+        "total_customers": int(results[-1] or 0),
+    }
+
+
+def count_tickets_by(group_expr=None, joins=""):
+    """Count tickets per scope group with one GROUP BY query, or all tickets"""
+    if has_field("HD Ticket", "resolution_date"):
+        resolved_on = "DATE(COALESCE(t.resolution_date, t.modified))"
+    else:
+        resolved_on = "DATE(t.modified)"
+
+    group_by = f"GROUP BY {group_expr}" if group_expr else ""
+
+    return frappe.db.sql(
+        f"""
+        SELECT {group_expr or "'all'"} AS token,
+            COUNT(*) AS total,
+            SUM(t.status NOT IN %(resolved)s) AS in_progress,
+            SUM(t.status IN %(resolved)s AND {resolved_on} = %(today)s) AS resolved_today
+        FROM `tabHD Ticket` t {joins}
+        {group_by}
+    """,
+        {"resolved": tuple(RESOLVED_STATUSES), "today": nowdate()},
+        as_dict=True,
+    )
+
+
+def reconcile_dashboard_counters():
+    """
+    Rebuild the dashboard counters from the database (hourly, after_migrate)
+
+    The new counters replace the old ones in one Redis transaction, so the
+    dashboard never reads a half built set.
+    """
+    if not frappe.db.table_exists("HD Ticket"):
+        return
+
+    counters = {}
+    for prefix, group_expr, joins in (
+        ("all", None, ""),
+        ("team", "t.agent_group", ""),
+        ("raised_by", "t.raised_by", ""),
+        (
+            "assigned",
+            "a.user",
+            "INNER JOIN `tabOD Ticket Assignment` a ON a.ticket = t.name",
+        ),
+    ):
+        for row in count_tickets_by(group_expr, joins):
+            if not row.token:
+                continue
+            token = "all" if prefix == "all" else f"{prefix}:{row.token}"
+            counters[token] = {
+                "total": int(row.total or 0),
+                "in_progress": int(row.in_progress or 0),
+                f"resolved:{nowdate()}": int(row.resolved_today or 0),
+            }
+
+    overdue = defaultdict(dict)
+    if has_field("HD Ticket", "resolution_by"):
+        for ticket in frappe.get_all(
+            "HD Ticket",
+            filters={
+                "status": ["not in", RESOLVED_STATUSES],
+                "resolution_by": ["is", "set"],
+            },
+            fields=["name", "status", "agent_group", "raised_by", "_assign", "resolution_by"],
+            limit=0,
+        ):
+            score = get_overdue_score(ticket)
+            for token in get_ticket_scope_tokens(ticket):
+                overdue[token][ticket.name] = score
+
+    customers = (
+        frappe.db.count("HD Customer") if frappe.db.table_exists("HD Customer") else 0
+    )
+
+    cache = frappe.cache()
+    stale = cache.get_keys("on_desk:dashboard_counters:") + cache.get_keys(
+        "on_desk:dashboard_overdue:"
+    )
+
+    pipe = cache.pipeline()
+    if stale:
+        pipe.delete(*stale)
+    for token, fields in counters.items():
+        pipe.hset(cache.make_key(DASHBOARD_COUNTERS_KEY.format(token)), mapping=fields)
+    for token, members in overdue.items():
+        pipe.zadd(cache.make_key(DASHBOARD_OVERDUE_KEY.format(token)), members)
+    pipe.set(cache.make_key(DASHBOARD_CUSTOMERS_KEY), customers)
+    pipe.set(cache.make_key(DASHBOARD_RECONCILED_KEY), nowdate())
+    pipe.execute()
@@ -0,0 +1,83 @@
+# Copyright (c) 2025, Sydney Kibanga and contributors
+# For license information, please see license.txt
+
+import frappe
+
+from on_desk.utils.etag import bump_resource_version
+
+# Redis hashes mapping document names to display names, one per doctype
+DISPLAY_NAME_FIELDS = {
+    "HD Customer": "customer_name",
+    "User": "full_name",
+}
+
+DISPLAY_NAME_TTL = 24 * 60 * 60
+
+
+def get_display_name_key(doctype):
+    return frappe.cache().make_key(f"on_desk:display_names:{doctype}")
+
+
+def get_display_names(doctype, names):
+    """
+    Resolve many document names to display names at once.
+
+    Names are read from a Redis hash first. The misses are loaded with a
+    single IN query and written back to the hash.
+
+    Args:
+        doctype (str): A doctype listed in DISPLAY_NAME_FIELDS
+        names (iterable): Document names, empty values are ignored
+
+    Returns:
+        dict: name -> display name, falling back to the name itself
+    """
+    names = list({name for name in names if name})
+    if not names:
+        return {}
+
+    cache = frappe.cache()
+    key = get_display_name_key(doctype)
+    field = DISPLAY_NAME_FIELDS[doctype]
+
+    display_names = {}
+    missing = []
+    for name, value in zip(names, cache.hmget(key, names)):
+        if value is None:
+            missing.append(name)
+        else:
+            display_names[name] = value.decode()
+
+    if missing:
+        loaded = {
+            row.name: row.get(field) or row.name
+            for row in frappe.get_all(
+                doctype,
+                filters={"name": ["in", missing]},
+                fields=["name", field],
+                limit=0,
+            )
+        }
+
+        if loaded:
+            pipe = cache.pipeline()
+            pipe.hset(key, mapping=loaded)
+            pipe.expire(key, DISPLAY_NAME_TTL)
+            pipe.execute()
+
+        for name in missing:
+            display_names[name] = loaded.get(name, name)
+
+    return display_names
+
+
+def clear_display_name(doc, method=None):
+    """Forget the cached display name of a renamed or deleted document"""
+    if doc.doctype in DISPLAY_NAME_FIELDS:
+        frappe.cache().hdel(f"on_desk:display_names:{doc.doctype}", doc.name)
+
+        # Ticket lists served with an ETag show display names
+        if method == "on_trash" or doc.has_value_changed(
+            DISPLAY_NAME_FIELDS[doc.doctype]
+        ):
+            bump_resource_version("display_names")
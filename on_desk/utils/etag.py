@@ -0,0 +1,137 @@
+# Copyright (c) 2025, Sydney Kibanga and contributors
+# For license information, please see license.txt
+
+import functools
+import hashlib
+import json
+
+import frappe
+from werkzeug.wrappers import Response
+
+# Version stamps of the data behind the read APIs, one per resource family.
+# An ETag is built from the versions a response depends on, so bumping a
+# family makes every client copy built from it stale.
+#
+# Families:
+#   filter_options             masters listed in the ticket filters
+#   conversations              the WhatsApp conversation list
+#   ticket_messages:<ticket>   the social media messages of a ticket
+#   display_names              customer and agent names shown in ticket lists
+#
+# Ticket lists use the ticket scope versions from on_desk.utils.ticket_cache.
+RESOURCE_VERSION_KEY = "on_desk:resource_version:{0}"
+
+# Returned by an endpoint when the client's copy is still current
+NOT_MODIFIED = object()
+
+
+def get_resource_version(family):
+    key = RESOURCE_VERSION_KEY.format(family)
+    version = frappe.cache().get_value(key)
+    if not version:
+        version = frappe.generate_hash(length=10)
+        frappe.cache().set_value(key, version)
+    return version
+
+
+def bump_resource_version(*families):
+    """Make every ETag built from these families stale"""
+
+    def bump():
+        for family in families:
+            frappe.cache().set_value(
+                RESOURCE_VERSION_KEY.format(family), frappe.generate_hash(length=10)
+            )
+
+    # Bump again after commit so a copy read mid-transaction is not kept
+    bump()
+    frappe.db.after_commit.add(bump)
+
+
+def make_etag(*parts):
+    digest = hashlib.sha1(
+        json.dumps(parts, sort_keys=True, default=str).encode()
+    ).hexdigest()
+    return f'W/"{digest}"'
+
+
+def is_not_modified(etag):
+    """
+    Check the request's If-None-Match against the current ETag.
+
+    Only has an effect inside an endpoint wrapped with conditional_get. The
+    ETag is remembered and sent back with the response.
+    """
+    if not wants_etag():
+        return False
+
+    frappe.local.on_desk_etag = etag
+    header = frappe.get_request_header("If-None-Match") or ""
+    validators = [value.strip() for value in header.split(",")]
+    return etag in validators or "*" in validators
+
+
+def wants_etag():
+    """Whether the current call is served with an ETag, to skip building one"""
+    return getattr(frappe.local, "on_desk_etag", None) is not None
+
+
+def is_conditional_request(fn):
+    """Whether fn is being called directly as a GET API method"""
+    request = getattr(frappe.local, "request", None)
+    return (
+        bool(request)
+        and request.method == "GET"
+        and request.path.startswith("/api/method/")
+        and request.path.endswith(f".{fn.__name__}")
+    )
+
+
+def conditional_get(fn):
+    """
+    Serve GET calls of a whitelisted method with an ETag.
+
+    The method calls is_not_modified(etag) once it knows its ETag and returns
+    NOT_MODIFIED when that is true, which is answered with a bodiless 304.
+    Python callers and POST requests get the plain return value.
+    """
+
+    @functools.wraps(fn)
+    def wrapper(*args, **kwargs):
+        if getattr(
+            frappe.local, "on_desk_etag", None
+        ) is not None or not is_conditional_request(fn):
+            return fn(*args, **kwargs)
+
+        frappe.local.on_desk_etag = ""
+        try:
+            result = fn(*args, **kwargs)
+            etag = frappe.local.on_desk_etag
+        finally:
+            frappe.local.on_desk_etag = None
+
+        headers = {"ETag": etag, "Cache-Control": "private, no-cache"}
+        if result is NOT_MODIFIED:
+            return Response(status=304, headers=headers)
+
+        if not etag:
+            return result
+
+        return Response(
+            frappe.as_json({"message": result}, indent=None, separators=(",", ":")),
+            content_type="application/json",
+            headers=headers,
+        )
+
+    return wrapper
+
+
+def invalidate_conversations(doc, method=None):
+    """OD Social Media Message on_update / on_trash, Contact on_update"""
+    families = {"conversations"}
+    if doc.doctype == "OD Social Media Message":
+        before = doc.get_doc_before_save()
+        for message in (doc, before):
+            if message and message.get("reference_ticket"):
+                families.add(f"ticket_messages:{message.reference_ticket}")
+    bump_resource_version(*families)
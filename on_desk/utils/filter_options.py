@@ -0,0 +1,88 @@
+# Copyright (c) 2025, Sydney Kibanga and contributors
+# For license information, please see license.txt
+
+import frappe
+
+from on_desk.utils.etag import bump_resource_version
+
+# The ticket filter options bundle, cached per role scope. Cleared by doc
+# hooks on the master doctypes it lists and warmed after migrate.
+FILTER_OPTIONS_KEY = "on_desk:filter_options:{0}"
+
+FILTER_ROLE_SCOPES = ["manager", "agent", "customer"]
+
+
+def get_filter_role_scope(user=None):
+    """Get the role scope a user's filter options are cached under"""
+    user_roles = frappe.get_roles(user or frappe.session.user)
+
+    if any(
+        role in user_roles
+        for role in ["Administrator", "System Manager", "Helpdesk Manager"]
+    ):
+        return "manager"
+    elif "Helpdesk Agent" in user_roles or "Agent" in user_roles:
+        return "agent"
+    return "customer"
+
+
+def get_cached_filter_options(role_scope=None):
+    """Get the filter options bundle with a single cache read"""
+    # Import here to avoid circular import
+    from on_desk.api import build_filter_options
+
+    role_scope = role_scope or get_filter_role_scope()
+    key = FILTER_OPTIONS_KEY.format(role_scope)
+
+    options = frappe.cache().get_value(key)
+    if options is None:
+        options = build_filter_options()
+        frappe.cache().set_value(key, options)
+    return options
+
+
+def clear_filter_options():
+    for role_scope in FILTER_ROLE_SCOPES:
+        frappe.cache().delete_value(FILTER_OPTIONS_KEY.format(role_scope))
+
+
+def invalidate_filter_options(doc=None, method=None):
+    """Master doctype on_update / on_trash"""
+    clear_filter_options()
+    bump_resource_version("filter_options")
+    # A request that read the old masters mid-transaction could cache them again
+    frappe.db.after_commit.add(clear_filter_options)
+
+
+def is_listed_option(option_key, value):
+    """Whether every cached bundle already lists a value"""
+    for role_scope in FILTER_ROLE_SCOPES:
+        options = frappe.cache().get_value(FILTER_OPTIONS_KEY.format(role_scope))
+        if options is None:
+            continue
+        if value not in {option["name"] for option in options.get(option_key) or []}:
+            return False
+    return True
+
+
+def invalidate_ticket_filter_options(doc, method=None):
+    """
+    HD Ticket on_update: statuses and priorities are also read from tickets
+
+    Only a value the cached bundles do not list yet clears them. A value no
+    ticket uses any more stays listed until the next rebuild.
+    """
+    for field, option_key in (("status", "statuses"), ("priority", "priorities")):
+        value = doc.get(field)
+        if not value or not doc.has_value_changed(field):
+            continue
+        if not is_listed_option(option_key, value):
+            invalidate_filter_options()
+            return
+
+
+def warm_filter_options():
+    """Build the bundle of every role scope (after_migrate)"""
+    clear_filter_options()
+    for role_scope in FILTER_ROLE_SCOPES:
+        get_cached_filter_options(role_scope)
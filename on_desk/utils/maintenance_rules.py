@@ -0,0 +1,231 @@
+# Copyright (c) 2025, Sydney Kibanga and contributors
+# For license information, please see license.txt
+
+import json
+import time
+
+import frappe
+from frappe.utils import add_days, cint, now_datetime
+
+from on_desk.utils.activity_log import log_ticket_activity
+from on_desk.utils.bulk_tickets import publish_bulk_ticket_update
+from on_desk.utils.capabilities import has_doctype, has_field
+from on_desk.utils.dashboard_counters import (
+    RESOLVED_STATUSES,
+    get_counter_fields,
+    queue_counter_changes,
+)
+from on_desk.utils.filter_options import invalidate_filter_options
+from on_desk.utils.preset_counts import clear_preset_counts
+from on_desk.utils.response_times import record_duration
+from on_desk.utils.ticket_cache import bump_scope_versions, get_ticket_scope_tokens
+
+# OD Ticket Maintenance Rules change stale tickets in bulk. Targets are read
+# by seeking on (age field, name) over the (status, age field) indexes, each
+# chunk is written with one UPDATE and committed, and the position reached is
+# saved on the rule so the next run resumes there. The caches that the
+# HD Ticket hooks would keep up to date are invalidated once per chunk, and
+# the dashboard counters and resolution times are recorded the same way the
+# hooks record them.
+MAINTENANCE_RULE_DOCTYPE = "OD Ticket Maintenance Rule"
+
+# Seconds of work per scheduler run, across all rules
+MAINTENANCE_TIME_BUDGET = 60
+
+DEFAULT_CHUNK_SIZE = 100
+
+ACTION_FIELDS = {"Set Status": "status", "Set Priority": "priority"}
+
+
+def run_maintenance_rules():
+    """Scheduled: work through the enabled rules until the time budget is spent"""
+    if not has_doctype("HD Ticket"):
+        return
+
+    deadline = time.monotonic() + MAINTENANCE_TIME_BUDGET
+
+    # Rules that waited longest go first, so one slow rule cannot starve others
+    rules = frappe.get_all(
+        MAINTENANCE_RULE_DOCTYPE,
+        filters={"enabled": 1},
+        fields=[
+            "name",
+            "ticket_status",
+            "ticket_priority",
+            "age_field",
+            "age_days",
+            "action",
+            "action_value",
+            "chunk_size",
+            "checkpoint",
+        ],
+        order_by="last_run asc",
+    )
+
+    for rule in rules:
+        if time.monotonic() >= deadline:
+            break
+
+        try:
+            run_maintenance_rule(rule, deadline)
+        except Exception as e:
+            frappe.db.rollback()
+            frappe.log_error(
+                f"Error running maintenance rule {rule.name}: {str(e)}",
+                "Ticket Maintenance Error",
+            )
+
+
+def get_rule_targets(rule, field, checkpoint, limit):
+    """
+    Get the next chunk of tickets a rule applies to, after the checkpoint
+
+    Args:
+        rule (dict): Maintenance rule values
+        field (str): HD Ticket field the rule sets
+        checkpoint (dict): {"value", "name"} of the last ticket processed
+        limit (int): Chunk size
+    """
+    age_field = rule.age_field or "modified"
+    cutoff = add_days(now_datetime(), -cint(rule.age_days))
+
+    conditions = [
+        ["status", "=", rule.ticket_status],
+        [age_field, "<", cutoff],
+        [field, "!=", rule.action_value],
+    ]
+    if rule.ticket_priority:
+        conditions.append(["priority", "=", rule.ticket_priority])
+
+    or_conditions = None
+    if checkpoint:
+        # (age_field, name) > checkpoint, as in get_ticket_page_by_cursor
+        conditions.append([age_field, ">=", checkpoint["value"]])
+        or_conditions = [
+            [age_field, ">", checkpoint["value"]],
+            ["name", ">", checkpoint["name"]],
+        ]
+
+    return frappe.get_all(
+        "HD Ticket",
+        fields=list({age_field, field, "creation", *get_counter_fields()}),
+        filters=conditions,
+        or_filters=or_conditions,
+        order_by=f"{age_field} asc, name asc",
+        page_length=limit,
+    )
+
+
+def apply_rule_chunk(rule, field, tickets):
+    """Write a rule's change to a chunk of tickets with a single UPDATE"""
+    names = [ticket.name for ticket in tickets]
+    modified = now_datetime()
+
+    # Resolving sets resolution_date, reopened tickets keep their first one
+    resolving = field == "status" and rule.action_value in RESOLVED_STATUSES
+    has_resolution_date = has_field("HD Ticket", "resolution_date")
+    set_resolution_date = (
+        "`resolution_date` = COALESCE(`resolution_date`, %(modified)s),"
+        if resolving and has_resolution_date
+        else ""
+    )
+
+    frappe.db.sql(
+        f"""
+        UPDATE `tabHD Ticket`
+        SET `{field}` = %(value)s,
+            {set_resolution_date}
+            `modified` = %(modified)s,
+            `modified_by` = %(user)s
+        WHERE `name` IN %(names)s
+    """,
+        {
+            "value": rule.action_value,
+            "modified": modified,
+            "user": frappe.session.user,
+            "names": tuple(names),
+        },
+    )
+
+    label = frappe.unscrub(field)
+    scope = set()
+    for ticket in tickets:
+        scope.update(get_ticket_scope_tokens(ticket))
+        after = {**ticket, field: rule.action_value, "modified": modified}
+
+        if resolving and ticket.status not in RESOLVED_STATUSES:
+            if has_resolution_date:
+                after["resolution_date"] = ticket.get("resolution_date") or modified
+            if not ticket.get("resolution_date"):
+                record_duration(
+                    "resolution", ticket.agent_group, ticket.creation, modified
+                )
+
+        queue_counter_changes(ticket.name, ticket, after)
+        log_ticket_activity(
+            ticket.name,
+            f"{label} Updated",
+            f"{label} changed from {ticket.get(field)} to {rule.action_value} "
+            f"by maintenance rule {rule.name}",
+        )
+
+    scope = list(scope)
+    bump_scope_versions(scope)
+    frappe.db.after_commit.add(lambda: bump_scope_versions(scope))
+    clear_preset_counts()
+
+
+def run_maintenance_rule(rule, deadline):
+    """
+    Run one rule in committed chunks until it has no targets left or the
+    deadline passes
+
+    Returns:
+        int: Number of tickets changed
+    """
+    field = ACTION_FIELDS.get(rule.action)
+    if not field or not rule.ticket_status or not rule.action_value:
+        return 0
+
+    limit = cint(rule.chunk_size) or DEFAULT_CHUNK_SIZE
+    age_field = rule.age_field or "modified"
+    checkpoint = json.loads(rule.checkpoint) if rule.checkpoint else None
+
+    changed = []
+    while time.monotonic() < deadline:
+        tickets = get_rule_targets(rule, field, checkpoint, limit)
+        if tickets:
+            apply_rule_chunk(rule, field, tickets)
+            changed.extend(ticket.name for ticket in tickets)
+
+        if len(tickets) < limit:
+            # Pass complete, the next run starts over for newly stale tickets
+            checkpoint = None
+        else:
+            last = tickets[-1]
+            checkpoint = {"value": str(last.get(age_field)), "name": last.name}
+
+        save_rule_progress(rule.name, checkpoint, len(changed))
+        frappe.db.commit()
+
+        if not checkpoint:
+            break
+
+    if changed:
+        invalidate_filter_options()
+        publish_bulk_ticket_update("maintenance", changed)
+
+    return len(changed)
+
+
+def save_rule_progress(rule_name, checkpoint, processed):
+    frappe.db.set_value(
+        MAINTENANCE_RULE_DOCTYPE,
+        rule_name,
+        {
+            "checkpoint": json.dumps(checkpoint) if checkpoint else None,
+            "last_run": now_datetime(),
+            "last_processed": processed,
+        },
+        update_modified=False,
+    )
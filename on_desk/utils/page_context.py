@@ -0,0 +1,133 @@
+# Copyright (c) 2025, Sydney Kibanga and contributors
+# For license information, please see license.txt
+
+import frappe
+from frappe.utils import get_gravatar
+
+# The header block of the /on-desk pages (user name, image and role label) is
+# cached per user, and the app name once per site. User and Has Role changes
+# clear a user's block, Website Settings changes clear the app name.
+PAGE_USER_KEY = "on_desk:page_user:{0}"
+APP_NAME_KEY = "on_desk:app_name"
+
+APP_LOGO = "/assets/on_desk/img/icons/logo1.png"
+
+# Role labels shown in the header, highest first
+ROLE_LABELS = [
+    "Administrator",
+    "System Manager",
+    "Helpdesk Manager",
+    "Helpdesk Agent",
+]
+
+
+def build_page_user(user):
+    user_doc = frappe.get_doc("User", user)
+    full_name = user_doc.full_name or user
+    roles = frappe.get_roles(user)
+
+    return {
+        "full_name": full_name,
+        "first_name": user_doc.first_name or full_name.split(" ")[0],
+        "image": user_doc.user_image or get_gravatar(user_doc.email),
+        "role": next((role for role in ROLE_LABELS if role in roles), "User"),
+        "roles": roles,
+    }
+
+
+def get_page_user(user=None):
+    """Get the cached header block of a user"""
+    user = user or frappe.session.user
+    key = PAGE_USER_KEY.format(user)
+
+    page_user = frappe.cache().get_value(key)
+    if page_user is None:
+        page_user = build_page_user(user)
+        frappe.cache().set_value(key, page_user)
+    return page_user
+
+
+def get_app_name():
+    app_name = frappe.cache().get_value(APP_NAME_KEY)
+    if app_name is None:
+        app_name = (
+            frappe.db.get_single_value("Website Settings", "app_name") or "On Desk"
+        )
+        frappe.cache().set_value(APP_NAME_KEY, app_name)
+    return app_name
+
+
+def build_page_context(context, current_page, page_title):
+    """
+    Fill in the context every /on-desk page shares
+
+    Redirects guests to the login page.
+
+    Args:
+        context (dict): Page context
+        current_page (str): Sidebar item to highlight
+        page_title (str): Title of the page
+
+    Returns:
+        dict: The user's header block, with their roles
+    """
+    context.no_cache = 1
+
+    # Check if user is logged in
+    if frappe.session.user == "Guest":
+        frappe.local.flags.redirect_location = "/login"
+        raise frappe.Redirect
+
+    page_user = get_page_user()
+    context.user_full_name = page_user["full_name"]
+    context.user_first_name = page_user["first_name"]
+    context.user_image = page_user["image"]
+    context.user_role = page_user["role"]
+
+    context.app_name = get_app_name()
+    context.app_logo = APP_LOGO
+    context.dark_mode = True
+
+    # Set current page for sidebar highlighting
+    context.current_page = current_page
+    context.page_title = page_title
+
+    return page_user
+
+
+def get_filter_options_for_context():
+    """Get the ticket filter options rendered with the ticket pages"""
+    try:
+        # Import here to avoid circular import
+        from on_desk.api import get_filter_options
+
+        result = get_filter_options()
+        if result.get("success"):
+            return result.get("options", {})
+        return {}
+    except Exception:
+        return {
+            "statuses": [{"name": "All", "label": "All Statuses"}],
+            "priorities": [{"name": "All", "label": "All Priorities"}],
+            "agent_groups": [{"name": "All", "label": "All Teams"}],
+            "ticket_types": [{"name": "All", "label": "All Types"}],
+            "customers": [{"name": "All", "label": "All Customers"}],
+            "agents": [{"name": "All", "label": "All Agents"}],
+        }
+
+
+def clear_page_user(doc, method=None):
+    """User / Has Role on_update and on_trash"""
+    if doc.doctype == "Has Role":
+        if doc.parenttype != "User":
+            return
+        user = doc.parent
+    else:
+        user = doc.name
+
+    frappe.cache().delete_value(PAGE_USER_KEY.format(user))
+
+
+def clear_app_name(doc=None, method=None):
+    """Website Settings on_update"""
+    frappe.cache().delete_value(APP_NAME_KEY)
@@ -0,0 +1,260 @@
+# Copyright (c) 2025, Sydney Kibanga and contributors
+# For license information, please see license.txt
+
+import frappe
+from frappe.utils import cint, get_datetime, getdate
+
+from on_desk.utils.ticket_assignment import parse_assign
+from on_desk.utils.ticket_cache import count_tickets, get_ticket_scope_tokens
+
+# Match counts of OD Filter Presets are kept in a Redis hash. A preset is
+# counted with a query once, after that every HD Ticket write is checked
+# against the compiled preset predicates and only the counts of presets the
+# ticket entered or left are incremented or decremented.
+PRESET_COUNTS_KEY = "on_desk:preset_counts"
+PRESET_PREDICATES_KEY = "on_desk:preset_predicates"
+
+# Filters on a ticket's own fields that a predicate can check in Python
+EQUALITY_FILTERS = ["status", "priority", "agent_group", "ticket_type", "customer"]
+
+
+def compile_preset(preset):
+    """
+    Compile a preset into a predicate spec that can be checked against a
+    ticket without a query.
+
+    Presets with search text need the full-text index, they are marked as not
+    incremental and recounted when tickets change.
+    """
+    # Import here to avoid circular import
+    from on_desk.api import get_user_ticket_scope
+
+    filters = preset.get("filters") or {}
+    if isinstance(filters, str):
+        filters = frappe.parse_json(filters) or {}
+
+    equals = {}
+    for field in EQUALITY_FILTERS:
+        value = filters.get(field)
+        if value and value != "All":
+            values = value if isinstance(value, list) else [value]
+            equals[field] = [str(v) for v in values]
+
+    assigned_agent = filters.get("assigned_agent")
+    date_range = filters.get("date_range") or {}
+    modified_range = filters.get("modified_date_range") or {}
+
+    return {
+        "name": preset.get("name"),
+        "scope": get_user_ticket_scope(preset.get("user")),
+        "equals": equals,
+        "assigned_agent": assigned_agent if assigned_agent != "All" else None,
+        "creation_range": [date_range.get("from_date"), date_range.get("to_date")],
+        "modified_range": [
+            modified_range.get("from_date"),
+            modified_range.get("to_date"),
+        ],
+        "incremental": not (preset.get("search_text") or "").strip(),
+    }
+
+
+def get_preset_predicates():
+    """Get the compiled predicates of every preset, built once and cached"""
+    predicates = frappe.cache().get_value(PRESET_PREDICATES_KEY)
+    if predicates is None:
+        predicates = [
+            compile_preset(preset)
+            for preset in frappe.get_all(
+                "OD Filter Preset",
+                fields=["name", "user", "filters", "search_text"],
+                limit=0,
+            )
+        ]
+        frappe.cache().set_value(PRESET_PREDICATES_KEY, predicates)
+    return predicates
+
+
+def in_range(value, bounds, to_datetime):
+    # Same comparisons as the SQL conditions of build_filter_conditions
+    start, end = bounds
+    if not (start or end):
+        return True
+    if not value:
+        return False
+    value = get_datetime(value)
+    if start and value < to_datetime(start):
+        return False
+    if end and value > to_datetime(end):
+        return False
+    return True
+
+
+def matches_preset(predicate, ticket, scope_tokens):
+    """
+    Whether a ticket is counted by a compiled preset
+
+    Args:
+        predicate (dict): A predicate built by compile_preset
+        ticket (dict): Ticket values, or None for a ticket that does not exist
+        scope_tokens (set): The ticket's scope tokens
+    """
+    if not ticket:
+        return False
+
+    if not scope_tokens.intersection(predicate["scope"]):
+        return False
+
+    for field, values in predicate["equals"].items():
+        if str(ticket.get(field) or "") not in values:
+            return False
+
+    if predicate["assigned_agent"] and predicate["assigned_agent"] not in parse_assign(
+        ticket.get("_assign")
+    ):
+        return False
+
+    def date_to_datetime(value):
+        return get_datetime(getdate(value))
+
+    return in_range(
+        ticket.get("creation"), predicate["creation_range"], date_to_datetime
+    ) and in_range(ticket.get("modified"), predicate["modified_range"], get_datetime)
+
+
+def update_preset_counts(doc, method=None):
+    """
+    HD Ticket on_update / on_trash: move the ticket between preset counts.
+
+    Counts are only adjusted once the transaction commits, and only for
+    presets that have been counted already. Presets that cannot be checked
+    incrementally are dropped and recounted on their next read.
+    """
+    if method == "on_trash":
+        before, after = doc, None
+    else:
+        before, after = doc.get_doc_before_save(), doc
+
+    before_tokens = set(get_ticket_scope_tokens(before)) if before else set()
+    after_tokens = set(get_ticket_scope_tokens(after)) if after else set()
+
+    deltas = {}
+    stale = []
+    for predicate in get_preset_predicates():
+        if not predicate["incremental"]:
+            stale.append(predicate["name"])
+            continue
+
+        delta = cint(matches_preset(predicate, after, after_tokens)) - cint(
+            matches_preset(predicate, before, before_tokens)
+        )
+        if delta:
+            deltas[predicate["name"]] = delta
+
+    if deltas or stale:
+        frappe.db.after_commit.add(lambda: apply_preset_count_deltas(deltas, stale))
+
+
+def forget_preset_counts(names):
+    if names:
+        cache = frappe.cache()
+        cache.pipeline().hdel(cache.make_key(PRESET_COUNTS_KEY), *names).execute()
+
+
+def apply_preset_count_deltas(deltas, stale=None):
+    cache = frappe.cache()
+    key = cache.make_key(PRESET_COUNTS_KEY)
+
+    forget_preset_counts(stale)
+    if not deltas:
+        return
+
+    # A preset that was never counted will be counted from the database
+    names = list(deltas)
+    counted = [
+        name
+        for name, value in zip(names, cache.hmget(key, names))
+        if value is not None
+    ]
+    if counted:
+        pipe = cache.pipeline()
+        for name in counted:
+            pipe.hincrby(key, name, deltas[name])
+        pipe.execute()
+
+
+def get_preset_counts(presets):
+    """
+    Get the match counts of presets, counting the ones not cached yet
+
+    Args:
+        presets (list): Presets with name, user, filters and search_text
+
+    Returns:
+        dict: preset name -> number of matching tickets
+    """
+    # Import here to avoid circular import
+    from on_desk.api import (
+        build_filter_conditions,
+        build_search_conditions,
+        get_user_ticket_conditions,
+    )
+
+    if not presets:
+        return {}
+
+    cache = frappe.cache()
+    key = cache.make_key(PRESET_COUNTS_KEY)
+    names = [preset.name for preset in presets]
+
+    counts = {}
+    missing = []
+    for preset, value in zip(presets, cache.hmget(key, names)):
+        if value is None:
+            missing.append(preset)
+        else:
+            counts[preset.name] = int(value)
+
+    for preset in missing:
+        filters = preset.filters or {}
+        if isinstance(filters, str):
+            filters = frappe.parse_json(filters) or {}
+
+        search_conditions, _relevance = build_search_conditions(preset.search_text)
+        conditions = (
+            get_user_ticket_conditions(compile_preset(preset)["scope"])
+            + build_filter_conditions(filters)
+            + search_conditions
+        )
+        counts[preset.name] = count_tickets(conditions)
+
+    if missing:
+        cache.pipeline().hset(
+            key, mapping={preset.name: counts[preset.name] for preset in missing}
+        ).execute()
+
+    return counts
+
+
+def clear_preset_counts(preset_names=None):
+    """Forget cached counts and predicates, e.g. after a preset changed"""
+    if preset_names:
+        forget_preset_counts(preset_names)
+    else:
+        frappe.cache().delete_value(PRESET_COUNTS_KEY)
+    frappe.cache().delete_value(PRESET_PREDICATES_KEY)
+
+
+def clear_assignment_preset_counts():
+    """Assignments are written without HD Ticket hooks, recount presets using them"""
+    forget_preset_counts(
+        [
+            predicate["name"]
+            for predicate in get_preset_predicates()
+            if predicate["assigned_agent"]
+        ]
+    )
+
+
+def reconcile_preset_counts():
+    """Scheduled: recount every preset from scratch on its next read"""
+    clear_preset_counts()
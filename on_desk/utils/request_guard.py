@@ -0,0 +1,204 @@
+# Copyright (c) 2025, Sydney Kibanga and contributors
+# For license information, please see license.txt
+
+import functools
+import hashlib
+import json
+import time
+
+import frappe
+from frappe import _
+
+# Guards for write endpoints that guests can call. Both work on Redis alone,
+# so a retry or a flood is answered before any database work.
+#
+# throttle: token buckets per client IP and per login session. A bucket holds
+# up to `capacity` tokens, refills at `rate` tokens per second and each call
+# takes one. Guests share the "Guest" session id, only their IP is limited.
+#
+# idempotent: a call made with an Idempotency-Key header (or idempotency_key
+# argument) stores its result for IDEMPOTENCY_TTL seconds. Retries with the
+# same key get that result back instead of running again.
+RATE_LIMIT_KEY = "on_desk:rate_limit:{0}:{1}:{2}"
+IDEMPOTENCY_KEY = "on_desk:idempotency:{0}:{1}"
+
+IDEMPOTENCY_TTL = 24 * 60 * 60
+
+# Stored while the first call with a key is still running. It expires on its
+# own if that call never commits.
+IDEMPOTENCY_PENDING = "pending"
+IDEMPOTENCY_PENDING_TTL = 60
+
+# Takes a token if one is available. Runs atomically in Redis.
+TOKEN_BUCKET_SCRIPT = """
+local rate = tonumber(ARGV[1])
+local capacity = tonumber(ARGV[2])
+local now = tonumber(ARGV[3])
+local tokens = tonumber(redis.call('HGET', KEYS[1], 'tokens'))
+local updated = tonumber(redis.call('HGET', KEYS[1], 'updated'))
+if tokens == nil then
+    tokens = capacity
+    updated = now
+end
+tokens = math.min(capacity, tokens + math.max(0, now - updated) * rate)
+local allowed = 0
+if tokens >= 1 then
+    tokens = tokens - 1
+    allowed = 1
+end
+redis.call('HSET', KEYS[1], 'tokens', tostring(tokens), 'updated', tostring(now))
+redis.call('EXPIRE', KEYS[1], math.ceil(capacity / rate))
+return allowed
+"""
+
+
+def take_token(bucket, rate, capacity):
+    """
+    Take a token from a bucket
+
+    Args:
+        bucket (str): Bucket key, without the site prefix
+        rate (float): Tokens added per second
+        capacity (int): Most tokens the bucket holds
+
+    Returns:
+        bool: False when the bucket is empty
+    """
+    cache = frappe.cache()
+    try:
+        return bool(
+            cache.eval(
+                TOKEN_BUCKET_SCRIPT,
+                1,
+                cache.make_key(bucket),
+                rate,
+                capacity,
+                time.time(),
+            )
+        )
+    except Exception as e:
+        # A Redis outage must not take ticket creation down with it
+        frappe.logger().error(f"Error checking rate limit {bucket}: {str(e)}")
+        return True
+
+
+def get_client_buckets(action):
+    buckets = [("ip", frappe.local.request_ip or "unknown")]
+    sid = frappe.session.sid
+    if sid and sid != "Guest":
+        buckets.append(("session", sid))
+    return [RATE_LIMIT_KEY.format(action, kind, value) for kind, value in buckets]
+
+
+def throttle(action, rate, capacity):
+    """
+    Reject calls once the client's IP or session bucket is empty
+
+    Args:
+        action (str): Name the buckets are kept under
+        rate (float): Tokens added per second
+        capacity (int): Burst size
+    """
+
+    def decorator(fn):
+        @functools.wraps(fn)
+        def wrapper(*args, **kwargs):
+            for bucket in get_client_buckets(action):
+                if not take_token(bucket, rate, capacity):
+                    frappe.throw(
+                        _("Too many requests, please try again in a few minutes"),
+                        frappe.TooManyRequestsError,
+                    )
+            return fn(*args, **kwargs)
+
+        return wrapper
+
+    return decorator
+
+
+def get_idempotency_key(kwargs):
+    key = kwargs.pop("idempotency_key", None)
+    key = frappe.get_request_header("Idempotency-Key") or key
+    return (key or "").strip()[:255] or None
+
+
+def get_idempotency_cache_key(action, key):
+    # Keys are per caller, a guest's key cannot replay another client's result
+    caller = frappe.session.user
+    if caller == "Guest":
+        caller = f"Guest:{frappe.local.request_ip}"
+    digest = hashlib.sha1(json.dumps([caller, key]).encode()).hexdigest()
+    return IDEMPOTENCY_KEY.format(action, digest)
+
+
+def idempotent(action):
+    """
+    Return the stored result of an earlier call made with the same
+    Idempotency-Key
+
+    Only successful results are kept. A failed call releases its key so the
+    client can retry it.
+    """
+
+    def decorator(fn):
+        @functools.wraps(fn)
+        def wrapper(*args, **kwargs):
+            key = get_idempotency_key(kwargs)
+            if not key:
+                return fn(*args, **kwargs)
+
+            cache = frappe.cache()
+            cache_key = cache.make_key(get_idempotency_cache_key(action, key))
+
+            # Claim the key, unless an earlier call already did
+            if not cache.set(
+                cache_key, IDEMPOTENCY_PENDING, nx=True, ex=IDEMPOTENCY_PENDING_TTL
+            ):
+                return get_stored_result(cache_key)
+
+            def release():
+                cache.delete(cache_key)
+
+            try:
+                result = fn(*args, **kwargs)
+            except Exception:
+                release()
+                raise
+
+            if not (isinstance(result, dict) and result.get("success")):
+                release()
+                return result
+
+            stored = frappe.as_json(
+                {"result": result, "location": get_redirect_location()}, indent=None
+            )
+            # Kept once the ticket is committed, dropped if it is rolled back
+            frappe.db.after_commit.add(
+                lambda: cache.set(cache_key, stored, ex=IDEMPOTENCY_TTL)
+            )
+            frappe.db.after_rollback.add(release)
+            return result
+
+        return wrapper
+
+    return decorator
+
+
+def get_redirect_location():
+    if frappe.local.response.get("type") == "redirect":
+        return frappe.local.response.get("location")
+
+
+def get_stored_result(cache_key):
+    stored = frappe.cache().get(cache_key)
+    if stored is None or stored.decode() == IDEMPOTENCY_PENDING:
+        frappe.throw(
+            _("A request with this Idempotency-Key is still being processed"),
+            frappe.DuplicateEntryError,
+        )
+
+    stored = json.loads(stored)
+    if stored.get("location"):
+        frappe.local.response["type"] = "redirect"
+        frappe.local.response["location"] = stored["location"]
+    return stored["result"]
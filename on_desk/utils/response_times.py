@@ -0,0 +1,281 @@
+# Copyright (c) 2025, Sydney Kibanga and contributors
+# For license information, please see license.txt
+
+import math
+from collections import Counter
+
+import frappe
+from frappe.utils import add_days, get_datetime, getdate, now_datetime, nowdate
+
+from on_desk.utils.capabilities import has_field
+from on_desk.utils.dashboard_counters import RESOLVED_STATUSES
+
+# First response and resolution times are recorded as they happen into
+# quantile sketches, one per metric, team and day, so percentiles over a
+# window are read from at most RESPONSE_SKETCH_DAYS small hashes.
+#
+# A sketch is a histogram over logarithmic buckets: a duration of x seconds
+# goes to bucket ceil(log(x) / log(gamma)), and every value in a bucket is
+# within RELATIVE_ACCURACY of the bucket's estimate. Sketches merge by adding
+# bucket counts, so a Redis hash per sketch updated with HINCRBY is enough,
+# and days and teams combine by summing hashes.
+RESPONSE_SKETCH_KEY = "on_desk:response_sketch:{0}:{1}:{2}"
+RESPONSE_SKETCH_BUILT_KEY = "on_desk:response_sketch_built"
+
+RESPONSE_METRICS = ["first_response", "resolution"]
+
+# Days of sketches kept, also the longest window that can be queried
+RESPONSE_SKETCH_DAYS = 90
+
+RELATIVE_ACCURACY = 0.02
+GAMMA = (1 + RELATIVE_ACCURACY) / (1 - RELATIVE_ACCURACY)
+LOG_GAMMA = math.log(GAMMA)
+
+# Sketches that cover every team
+ALL_TEAMS = "all"
+
+
+def get_bucket(seconds):
+    return math.ceil(math.log(max(seconds, 1)) / LOG_GAMMA)
+
+
+def get_bucket_value(bucket):
+    # Midpoint estimate of the bucket's (gamma^(i-1), gamma^i] range
+    return 2 * GAMMA**bucket / (GAMMA + 1)
+
+
+def get_sketch_key(metric, team, day):
+    return RESPONSE_SKETCH_KEY.format(metric, team or ALL_TEAMS, day)
+
+
+def add_to_sketches(pipe, metric, team, day, seconds):
+    cache = frappe.cache()
+    bucket = get_bucket(seconds)
+    for sketch_team in {ALL_TEAMS, team or ALL_TEAMS}:
+        key = cache.make_key(get_sketch_key(metric, sketch_team, day))
+        pipe.hincrby(key, bucket, 1)
+        pipe.expire(key, (RESPONSE_SKETCH_DAYS + 1) * 24 * 60 * 60)
+
+
+def record_duration(metric, team, started, ended):
+    """
+    Add a duration to the sketches of its team and day, once committed
+
+    Args:
+        metric (str): One of RESPONSE_METRICS
+        team (str): HD Team of the ticket, if any
+        started (datetime): When the ticket was opened
+        ended (datetime): When it was first responded to or resolved
+    """
+    if not (started and ended):
+        return
+
+    started, ended = get_datetime(started), get_datetime(ended)
+    seconds = (ended - started).total_seconds()
+    if seconds < 0:
+        return
+
+    def record():
+        pipe = frappe.cache().pipeline()
+        add_to_sketches(pipe, metric, team, getdate(ended), seconds)
+        pipe.execute()
+
+    frappe.db.after_commit.add(record)
+
+
+def record_ticket_times(doc, method=None):
+    """
+    HD Ticket on_update: record the first response and the first resolution
+    when they happen
+    """
+    before = doc.get_doc_before_save()
+
+    if (
+        has_field("HD Ticket", "first_responded_on")
+        and doc.get("first_responded_on")
+        and not (before and before.get("first_responded_on"))
+    ):
+        record_duration(
+            "first_response", doc.agent_group, doc.creation, doc.first_responded_on
+        )
+
+    was_resolved = before and before.get("status") in RESOLVED_STATUSES
+    if doc.status in RESOLVED_STATUSES and not was_resolved:
+        if has_field("HD Ticket", "resolution_date"):
+            # Reopened tickets keep their first resolution date
+            if before and before.get("resolution_date"):
+                return
+            resolved_on = doc.get("resolution_date") or now_datetime()
+        else:
+            resolved_on = now_datetime()
+        record_duration("resolution", doc.agent_group, doc.creation, resolved_on)
+
+
+def record_message_response(doc, method=None):
+    """
+    OD Social Media Message on_update: an outgoing message is the first
+    response of its ticket if the ticket has none yet
+
+    Runs when the message is linked to a ticket, on insert or later.
+    """
+    if doc.direction != "Outgoing" or not doc.reference_ticket:
+        return
+    if not doc.has_value_changed("reference_ticket"):
+        return
+    if not has_field("HD Ticket", "first_responded_on"):
+        return
+
+    ticket = frappe.db.get_value(
+        "HD Ticket",
+        doc.reference_ticket,
+        ["name", "agent_group", "creation", "first_responded_on"],
+        as_dict=True,
+    )
+    if not ticket or ticket.first_responded_on:
+        return
+
+    responded_on = doc.get("timestamp") or doc.creation or now_datetime()
+    frappe.db.set_value(
+        "HD Ticket",
+        ticket.name,
+        "first_responded_on",
+        responded_on,
+        update_modified=False,
+    )
+    record_duration("first_response", ticket.agent_group, ticket.creation, responded_on)
+
+
+def get_merged_sketch(metric, teams=None, days=7):
+    """Sum the sketches of some teams over the last `days` days"""
+    cache = frappe.cache()
+    days = max(1, min(int(days or 7), RESPONSE_SKETCH_DAYS))
+    today = getdate(nowdate())
+
+    pipe = cache.pipeline()
+    for offset in range(days):
+        day = add_days(today, -offset)
+        for team in teams or [ALL_TEAMS]:
+            pipe.hgetall(cache.make_key(get_sketch_key(metric, team, day)))
+
+    sketch = Counter()
+    for counts in pipe.execute():
+        for bucket, count in counts.items():
+            sketch[int(bucket)] += int(count)
+    return sketch
+
+
+def get_quantiles(sketch, quantiles):
+    """Estimate quantiles, in seconds, from a merged sketch"""
+    total = sum(sketch.values())
+    if not total:
+        return {q: None for q in quantiles}
+
+    buckets = sorted(sketch)
+    results = {}
+    for q in quantiles:
+        rank = q * (total - 1)
+        seen = 0
+        for bucket in buckets:
+            seen += sketch[bucket]
+            if seen > rank:
+                results[q] = get_bucket_value(bucket)
+                break
+    return results
+
+
+def get_response_time_percentiles(teams=None, days=7):
+    """
+    Get p50 and p90 first response and resolution times
+
+    Args:
+        teams (list): HD Teams to merge, or None for every ticket
+        days (int): Window, up to RESPONSE_SKETCH_DAYS days ending today
+
+    Returns:
+        dict: metric -> {"count", "p50", "p90"}, times in seconds
+    """
+    if not frappe.cache().exists(frappe.cache().make_key(RESPONSE_SKETCH_BUILT_KEY)):
+        # Sketches were lost, e.g. with a Redis flush
+        frappe.enqueue(
+            "on_desk.utils.response_times.rebuild_response_sketches",
+            queue="long",
+            job_id="on_desk_rebuild_response_sketches",
+            deduplicate=True,
+        )
+
+    stats = {}
+    for metric in RESPONSE_METRICS:
+        sketch = get_merged_sketch(metric, teams, days)
+        quantiles = get_quantiles(sketch, [0.5, 0.9])
+        stats[metric] = {
+            "count": sum(sketch.values()),
+            "p50": quantiles[0.5],
+            "p90": quantiles[0.9],
+        }
+    return stats
+
+
+def format_duration(seconds):
+    """Format seconds like 45m, 1.8h or 3.2d"""
+    if seconds is None:
+        return "N/A"
+    if seconds < 60 * 60:
+        return f"{max(1, round(seconds / 60))}m"
+    if seconds < 24 * 60 * 60:
+        return f"{seconds / 3600:.1f}h"
+    return f"{seconds / 86400:.1f}d"
+
+
+def rebuild_response_sketches():
+    """
+    Rebuild the sketches of the last RESPONSE_SKETCH_DAYS days from HD Ticket
+    (after_migrate, or when they are missing)
+    """
+    if not frappe.db.table_exists("HD Ticket"):
+        return
+
+    has_first_response = has_field("HD Ticket", "first_responded_on")
+    has_resolution_date = has_field("HD Ticket", "resolution_date")
+    if not (has_first_response or has_resolution_date):
+        return
+
+    since = add_days(nowdate(), -RESPONSE_SKETCH_DAYS)
+    fields = ["name", "agent_group", "creation"]
+    or_filters = []
+    if has_first_response:
+        fields.append("first_responded_on")
+        or_filters.append(["first_responded_on", ">=", since])
+    if has_resolution_date:
+        fields.append("resolution_date")
+        or_filters.append(["resolution_date", ">=", since])
+
+    sketches = {}
+    for ticket in frappe.get_all(
+        "HD Ticket", fields=fields, or_filters=or_filters, limit=0
+    ):
+        for metric, ended in (
+            ("first_response", ticket.get("first_responded_on")),
+            ("resolution", ticket.get("resolution_date")),
+        ):
+            if not ended or getdate(ended) < getdate(since):
+                continue
+            seconds = (get_datetime(ended) - get_datetime(ticket.creation)).total_seconds()
+            if seconds < 0:
+                continue
+            bucket = get_bucket(seconds)
+            for team in {ALL_TEAMS, ticket.agent_group or ALL_TEAMS}:
+                key = get_sketch_key(metric, team, getdate(ended))
+                sketches.setdefault(key, Counter())[bucket] += 1
+
+    cache = frappe.cache()
+    stale = cache.get_keys("on_desk:response_sketch:")
+
+    pipe = cache.pipeline()
+    if stale:
+        pipe.delete(*stale)
+    for key, buckets in sketches.items():
+        key = cache.make_key(key)
+        pipe.hset(key, mapping=dict(buckets))
+        pipe.expire(key, (RESPONSE_SKETCH_DAYS + 1) * 24 * 60 * 60)
+    pipe.set(cache.make_key(RESPONSE_SKETCH_BUILT_KEY), nowdate())
+    pipe.execute()
@@ -0,0 +1,124 @@
+# Copyright (c) 2025, Sydney Kibanga and contributors
+# For license information, please see license.txt
+
+import json
+
+import frappe
+
+ASSIGNMENT_DOCTYPE = "OD Ticket Assignment"
+
+REBUILD_CHUNK_SIZE = 500
+
+
+def get_assigned_ticket_condition(user):
+    """
+    Filter condition matching the tickets assigned to exactly this user
+
+    A subquery on the (user, ticket) index, which the database plans as a
+    semi-join. Raw SQL conditions work with frappe.get_all but not with
+    frappe.db.count, count with get_all instead.
+    """
+    return (
+        f"`tabHD Ticket`.`name` in (select `ticket` from `tab{ASSIGNMENT_DOCTYPE}` "
+        f"where `user` = {frappe.db.escape(user)})"
+    )
+
+
+def parse_assign(assign):
+    """Parse the _assign JSON column of a document"""
+    try:
+        return json.loads(assign) if assign else []
+    except ValueError:
+        return []
+
+
+def sync_ticket_assignments(ticket):
+    """Make the assignment rows of a ticket match its _assign column"""
+    values = frappe.db.get_value(
+        "HD Ticket", ticket, ["agent_group", "raised_by", "_assign"], as_dict=True
+    )
+    users = set(parse_assign(values._assign)) if values else set()
+
+    existing = frappe.get_all(
+        ASSIGNMENT_DOCTYPE, filters={"ticket": ticket}, fields=["name", "user"]
+    )
+
+    stale = [row.name for row in existing if row.user not in users]
+    if stale:
+        frappe.db.delete(ASSIGNMENT_DOCTYPE, {"name": ["in", stale]})
+
+    added = users - {row.user for row in existing}
+    for user in added:
+        frappe.get_doc(
+            {"doctype": ASSIGNMENT_DOCTYPE, "ticket": ticket, "user": user}
+        ).insert(ignore_permissions=True)
+
+    if values and (stale or added):
+        # Import here to avoid circular import
+        from on_desk.utils.dashboard_counters import move_assignment_counters
+        from on_desk.utils.preset_counts import clear_assignment_preset_counts
+        from on_desk.utils.ticket_cache import (
+            bump_scope_versions,
+            get_ticket_scope_tokens,
+        )
+
+        # Assignments change what agents can see
+        removed = [row.user for row in existing if row.name in stale]
+        bump_scope_versions(get_ticket_scope_tokens(values, users=removed))
+        clear_assignment_preset_counts()
+        move_assignment_counters(ticket, added=added, removed=removed)
+
+
+def sync_assignments_from_todo(doc, method=None):
+    """ToDo on_update / on_trash: assignments of HD Tickets are ToDos"""
+    if doc.reference_type == "HD Ticket" and doc.reference_name:
+        sync_ticket_assignments(doc.reference_name)
+
+
+def remove_ticket_assignments(doc, method=None):
+    """HD Ticket on_trash: drop the assignment rows of a deleted ticket"""
+    frappe.db.delete(ASSIGNMENT_DOCTYPE, {"ticket": doc.name})
+
+
+def setup_ticket_assignment_index():
+    """Add the (user, ticket) index and backfill an empty table (after_migrate)"""
+    if not frappe.db.table_exists(ASSIGNMENT_DOCTYPE):
+        return
+
+    frappe.db.add_index(ASSIGNMENT_DOCTYPE, ["user", "ticket"])
+
+    if frappe.db.exists("DocType", "HD Ticket") and not frappe.db.count(
+        ASSIGNMENT_DOCTYPE
+    ):
+        frappe.enqueue(
+            "on_desk.utils.ticket_assignment.rebuild_ticket_assignments",
+            queue="long",
+            job_id="on_desk_rebuild_ticket_assignments",
+            deduplicate=True,
+        )
+
+
+def rebuild_ticket_assignments():
+    """Rebuild the assignment table from _assign in chunks"""
+    last_name = None
+
+    while True:
+        filters = [["_assign", "is", "set"]]
+        if last_name:
+            filters.append(["name", ">", last_name])
+
+        names = frappe.get_all(
+            "HD Ticket",
+            filters=filters,
+            order_by="name asc",
+            limit=REBUILD_CHUNK_SIZE,
+            pluck="name",
+        )
+        if not names:
+            break
+
+        for name in names:
+            sync_ticket_assignments(name)
+
+        frappe.db.commit()
+        last_name = names[-1]
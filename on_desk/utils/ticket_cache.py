@@ -0,0 +1,175 @@
+# Copyright (c) 2025, Sydney Kibanga and contributors
+# For license information, please see license.txt
+
+import hashlib
+import json
+
+import frappe
+from frappe.utils import cint
+
+from on_desk.utils.ticket_assignment import parse_assign
+
+# Cached ticket list data is keyed by the versions of the visibility scopes it
+# was built for. A ticket write replaces the versions of every scope the ticket
+# is visible in, which orphans exactly the cached data it could have changed.
+#
+# Scope tokens:
+#   all               managers and admins
+#   team:<team>       agents of a team
+#   assigned:<user>   agents without a team
+#   raised_by:<user>  customers
+SCOPE_VERSION_KEY = "on_desk:ticket_scope_version:{0}"
+
+COUNT_CACHE_TTL = 60
+RESULT_CACHE_TTL = 120
+
+# Above this many (estimated) rows an exact COUNT(*) is not worth the scan
+ESTIMATED_COUNT_THRESHOLD = 50000
+
+
+def get_scope_versions(scope):
+    """Get the current version of each scope token"""
+    versions = []
+    for token in scope:
+        key = SCOPE_VERSION_KEY.format(token)
+        version = frappe.cache().get_value(key)
+        if not version:
+            version = frappe.generate_hash(length=10)
+            frappe.cache().set_value(key, version)
+        versions.append(version)
+    return versions
+
+
+def bump_scope_versions(scope):
+    """Invalidate cached ticket list data of the given scope tokens"""
+    for token in set(scope):
+        frappe.cache().set_value(
+            SCOPE_VERSION_KEY.format(token), frappe.generate_hash(length=10)
+        )
+
+
+def get_ticket_scope_tokens(ticket, users=None):
+    """
+    Get the scope tokens a ticket is visible in.
+
+    Args:
+        ticket (dict): Ticket values with agent_group, raised_by and _assign
+        users (iterable): Extra assignees, e.g. ones that were just removed
+    """
+    scope = ["all"]
+    if ticket.get("agent_group"):
+        scope.append(f"team:{ticket.get('agent_group')}")
+    if ticket.get("raised_by"):
+        scope.append(f"raised_by:{ticket.get('raised_by')}")
+    for user in parse_assign(ticket.get("_assign")) + list(users or []):
+        scope.append(f"assigned:{user}")
+    return scope
+
+
+def invalidate_ticket_scopes(doc, method=None):
+    """
+    HD Ticket on_update / on_trash: invalidate every scope the ticket was or
+    is visible in.
+
+    The versions are bumped again after commit, so a list request that read
+    the old rows while this transaction was open cannot leave stale results
+    cached under the new version.
+    """
+    scope = get_ticket_scope_tokens(doc)
+    before = doc.get_doc_before_save()
+    if before:
+        scope += get_ticket_scope_tokens(before)
+
+    bump_scope_versions(scope)
+    frappe.db.after_commit.add(lambda: bump_scope_versions(scope))
+
+
+def make_ticket_cache_key(prefix, scope, *parts):
+    """Build a cache key tied to the current versions of a scope"""
+    versions = get_scope_versions(scope)
+    digest = hashlib.sha1(
+        json.dumps([scope, versions, parts], sort_keys=True, default=str).encode()
+    ).hexdigest()
+    return f"on_desk:{prefix}:{digest}"
+
+
+def normalize_ticket_filters(filters):
+    """Drop empty and "All" filters and sort multi-value ones"""
+    normalized = {}
+    for key, value in (filters or {}).items():
+        if value in (None, "", "All", [], {}):
+            continue
+        if isinstance(value, list):
+            value = sorted(value, key=str)
+        normalized[key] = value
+    return normalized
+
+
+def get_cached_ticket_list(cache_key):
+    return frappe.cache().get_value(cache_key)
+
+
+def set_cached_ticket_list(cache_key, result):
+    frappe.cache().set_value(cache_key, result, expires_in_sec=RESULT_CACHE_TTL)
+
+
+def get_ticket_count(conditions, scope, mode="exact"):
+    """
+    Count HD Tickets matching the given filters, with caching.
+
+    Args:
+        conditions (list): Filters as passed to frappe.get_all, including the
+            user's visibility conditions
+        scope (list): Scope tokens of the user the conditions were built for
+        mode (str): "exact" or "estimated". Estimated counts use the query
+            planner's row estimate when it exceeds ESTIMATED_COUNT_THRESHOLD
+
+    Returns:
+        tuple: (count, is_estimated)
+    """
+    cache_key = make_ticket_cache_key("ticket_count", scope, mode, conditions)
+    cached = frappe.cache().get_value(cache_key)
+    if cached is not None:
+        return cached["count"], cached["estimated"]
+
+    count, estimated = None, False
+    if mode == "estimated":
+        estimate = estimate_ticket_count(conditions)
+        if estimate is not None and estimate >= ESTIMATED_COUNT_THRESHOLD:
+            count, estimated = estimate, True
+
+    if count is None:
+        count = count_tickets(conditions)
+
+    frappe.cache().set_value(
+        cache_key,
+        {"count": count, "estimated": estimated},
+        expires_in_sec=COUNT_CACHE_TTL,
+    )
+    return count, estimated
+
+
+def count_tickets(conditions):
+    """COUNT(*) of the HD Tickets matching filter conditions, raw SQL ones included"""
+    return frappe.get_all(
+        "HD Ticket", filters=conditions, fields=["count(*) as count"]
+    )[0].count
+
+
+def estimate_ticket_count(conditions):
+    """
+    Estimate the number of matching HD Tickets from the query plan.
+
+    Returns None when the database cannot provide an estimate.
+    """
+    if frappe.db.db_type != "mariadb":
+        return None
+
+    try:
+        query = frappe.get_all("HD Ticket", fields=["name"], filters=conditions, run=0)
+        plan = frappe.db.sql(f"EXPLAIN {query}", as_dict=True)
+    except Exception:
+        return None
+
+    rows = [cint(step.get("rows")) for step in plan if step.get("rows")]
+    return max(rows) if rows else None
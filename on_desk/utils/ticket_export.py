@@ -0,0 +1,213 @@
+# Copyright (c) 2025, Sydney Kibanga and contributors
+# For license information, please see license.txt
+
+import csv
+import datetime
+import io
+import tempfile
+
+import frappe
+from frappe.utils import now_datetime
+from werkzeug.wrappers import Response
+from werkzeug.wsgi import wrap_file
+
+from on_desk.api import (
+    KEYSET_SORT_FIELDS,
+    TICKET_LIST_FIELDS,
+    build_filter_conditions,
+    build_search_conditions,
+    build_sort_order,
+    enhance_ticket_data,
+    get_ticket_page_by_cursor,
+    get_ticket_page_by_rank,
+    get_user_ticket_conditions,
+    get_user_ticket_scope,
+)
+
+# Tickets read, enriched and written per batch. Memory use depends on this,
+# not on the number of tickets exported.
+EXPORT_CHUNK_SIZE = 1000
+
+EXPORT_COLUMNS = [
+    ("name", "Ticket"),
+    ("subject", "Subject"),
+    ("status", "Status"),
+    ("priority", "Priority"),
+    ("ticket_type", "Type"),
+    ("agent_group", "Team"),
+    ("customer", "Customer"),
+    ("customer_name", "Customer Name"),
+    ("raised_by", "Raised By"),
+    ("assigned_agents", "Assigned To"),
+    ("creation", "Created"),
+    ("modified", "Last Updated"),
+    ("response_by", "Response By"),
+    ("resolution_by", "Resolution By"),
+]
+
+
+def iter_ticket_chunks(
+    filters=None, search_text=None, sort_by=None, sort_order="desc", user=None
+):
+    """
+    Yield the tickets matching a ticket list query in enriched batches.
+
+    Takes the same filters, search and sort as get_tickets_advanced. Keyset
+    sort fields are read by seeking past the last (sort key, name) of each
+    batch, so every batch is an index range scan however deep the export goes.
+    """
+    scope = get_user_ticket_scope(user)
+    search_conditions, relevance = build_search_conditions(search_text)
+    conditions = (
+        get_user_ticket_conditions(scope)
+        + build_filter_conditions(filters)
+        + search_conditions
+    )
+    fields = [field for field, label in EXPORT_COLUMNS]
+
+    def enrich(tickets):
+        return enhance_ticket_data(tickets, fields=fields, format_dates=False)
+
+    if relevance and not sort_by:
+        start = 0
+        while True:
+            tickets = get_ticket_page_by_rank(
+                conditions, relevance, start, EXPORT_CHUNK_SIZE
+            )
+            if tickets:
+                yield enrich(tickets)
+            if len(tickets) < EXPORT_CHUNK_SIZE:
+                break
+            start += EXPORT_CHUNK_SIZE
+        return
+
+    if (sort_by or "modified") in KEYSET_SORT_FIELDS:
+        cursor = None
+        while True:
+            tickets, cursors = get_ticket_page_by_cursor(
+                conditions, sort_by, sort_order, cursor, EXPORT_CHUNK_SIZE
+            )
+            if tickets:
+                yield enrich(tickets)
+            if not cursors["has_more"]:
+                break
+            cursor = cursors["next_cursor"]
+        return
+
+    # Other sort fields can be empty, which a seek cannot step over
+    start = 0
+    while True:
+        tickets = frappe.get_all(
+            "HD Ticket",
+            fields=TICKET_LIST_FIELDS,
+            filters=conditions,
+            order_by=f"{build_sort_order(sort_by, sort_order)}, name asc",
+            start=start,
+            page_length=EXPORT_CHUNK_SIZE,
+        )
+        if tickets:
+            yield enrich(tickets)
+        if len(tickets) < EXPORT_CHUNK_SIZE:
+            break
+        start += EXPORT_CHUNK_SIZE
+
+
+def get_export_row(ticket):
+    row = []
+    for field, label in EXPORT_COLUMNS:
+        value = ticket.get(field)
+        if isinstance(value, datetime.datetime):
+            value = value.isoformat(sep=" ", timespec="seconds")
+        elif isinstance(value, datetime.date):
+            value = value.isoformat()
+        row.append(value)
+    return row
+
+
+def get_export_file_name(extension, unique=False):
+    name = f"tickets-{now_datetime().strftime('%Y%m%d-%H%M%S')}"
+    if unique:
+        # Saved files are shared by name, two exports in a second must not collide
+        name = f"{name}-{frappe.generate_hash(length=10)}"
+    return f"{name}.{extension}"
+
+
+def export_tickets_csv(filters=None, search_text=None, sort_by=None, sort_order="desc"):
+    """
+    Write the matching tickets to a CSV response.
+
+    Batches are written to a temporary file as they are read, and the file is
+    streamed to the client from disk.
+    """
+    spool = tempfile.TemporaryFile()
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+
+    def flush():
+        spool.write(buffer.getvalue().encode("utf-8"))
+        buffer.seek(0)
+        buffer.truncate()
+
+    writer.writerow([label for field, label in EXPORT_COLUMNS])
+    for tickets in iter_ticket_chunks(filters, search_text, sort_by, sort_order):
+        writer.writerows(get_export_row(ticket) for ticket in tickets)
+        flush()
+    flush()
+    spool.seek(0)
+
+    response = Response(
+        wrap_file(frappe.local.request.environ, spool),
+        mimetype="text/csv",
+        direct_passthrough=True,
+    )
+    response.headers["Content-Disposition"] = (
+        f'attachment; filename="{get_export_file_name("csv")}"'
+    )
+    return response
+
+
+def export_tickets_xlsx(
+    user, filters=None, search_text=None, sort_by=None, sort_order="desc"
+):
+    """
+    Background job: write the matching tickets to a private XLSX file.
+
+    The workbook is written in write-only mode, so rows go to disk as they are
+    appended. The user is notified with the file URL when it is ready.
+    """
+    from openpyxl import Workbook
+
+    try:
+        workbook = Workbook(write_only=True)
+        sheet = workbook.create_sheet("Tickets")
+        sheet.append([label for field, label in EXPORT_COLUMNS])
+
+        for tickets in iter_ticket_chunks(
+            filters, search_text, sort_by, sort_order, user=user
+        ):
+            for ticket in tickets:
+                sheet.append(get_export_row(ticket))
+
+        file_name = get_export_file_name("xlsx", unique=True)
+        workbook.save(frappe.get_site_path("private", "files", file_name))
+
+        file_doc = frappe.get_doc(
+            {
+                "doctype": "File",
+                "file_name": file_name,
+                "file_url": f"/private/files/{file_name}",
+                "is_private": 1,
+            }
+        ).insert(ignore_permissions=True)
+        frappe.db.commit()
+
+        frappe.publish_realtime(
+            "on_desk_ticket_export",
+            {"success": True, "file_url": file_doc.file_url},
+            user=user,
+        )
+    except Exception as e:
+        frappe.log_error(f"Error exporting tickets: {str(e)}", "Ticket Export Error")
+        frappe.publish_realtime(
+            "on_desk_ticket_export", {"success": False, "message": str(e)}, user=user
+        )
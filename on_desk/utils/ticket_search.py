@@ -0,0 +1,256 @@
+# Copyright (c) 2025, Sydney Kibanga and contributors
+# For license information, please see license.txt
+
+import re
+
+import frappe
+from frappe.utils import strip_html_tags, validate_email_address
+
+from on_desk.utils.capabilities import has_fulltext_index, refresh_capabilities
+
+SEARCH_INDEX_DOCTYPE = "OD Ticket Search Index"
+SEARCH_INDEX_TABLE = "tabOD Ticket Search Index"
+FULLTEXT_INDEX_NAME = "od_ticket_fulltext"
+FULLTEXT_COLUMNS = ["subject", "content", "customer_name", "contact_name"]
+
+# InnoDB leaves words shorter than innodb_ft_min_token_size (3 by default)
+# and its default stopwords out of the index. Requiring one of them would
+# match nothing, so they are dropped from the search.
+FULLTEXT_MIN_TOKEN_SIZE = 3
+FULLTEXT_STOPWORDS = frozenset(
+    "a about an are as at be by com de en for from how i in is it la of on or "
+    "that the this to was what when where who will with und www".split()
+)
+
+# Doctypes whose names are indexed with their tickets:
+# doctype -> (HD Ticket link field, name field, index column)
+SEARCH_NAME_SOURCES = {
+    "HD Customer": ("customer", "customer_name", "customer_name"),
+    "Contact": ("contact", "full_name", "contact_name"),
+}
+
+REBUILD_CHUNK_SIZE = 500
+
+
+def search_tickets(search_text):
+    """
+    Resolve a search string to ticket filter conditions.
+
+    An exact ticket ID or email address goes straight to an indexed lookup.
+    Anything else is matched against the full-text index with a subquery, so
+    scope, filters, sort, paging and counts all apply to every match.
+
+    Returns:
+        tuple: (conditions, relevance). relevance is the full-text query to
+        rank the matches by, or None when they have no relevance order
+    """
+    search_text = (search_text or "").strip()
+    if not search_text:
+        return [], None
+
+    if frappe.db.exists("HD Ticket", search_text):
+        return [["name", "=", search_text]], None
+
+    if validate_email_address(search_text):
+        return [["raised_by", "=", search_text]], None
+
+    against = get_fulltext_query(search_text)
+    if against and has_fulltext_index(FULLTEXT_INDEX_NAME):
+        return [
+            f"`tabHD Ticket`.`name` in (select `ticket` from `{SEARCH_INDEX_TABLE}` "
+            f"where {get_match_expression(against)})"
+        ], against
+
+    return [get_like_condition(search_text)], None
+
+
+def get_fulltext_query(search_text):
+    """
+    Build a boolean mode query requiring every indexed term of the search.
+
+    The last term may still be being typed and is matched as a prefix.
+    Returns None when no term can be matched by the index.
+    """
+    terms = [term for term in re.split(r"\W+", search_text) if term]
+    required = [
+        f"+{term}"
+        for term in terms
+        if len(term) >= FULLTEXT_MIN_TOKEN_SIZE
+        and term.lower() not in FULLTEXT_STOPWORDS
+    ]
+    if not required:
+        return None
+
+    if required[-1] == f"+{terms[-1]}":
+        required[-1] += "*"
+    return " ".join(required)
+
+
+def get_match_expression(against):
+    return (
+        f"MATCH({', '.join(FULLTEXT_COLUMNS)}) "
+        f"AGAINST ({frappe.db.escape(against)} IN BOOLEAN MODE)"
+    )
+
+
+def get_like_condition(search_text):
+    """Substring search for words the full-text index cannot match"""
+    # Import here to avoid circular import
+    from on_desk.api import escape_like
+
+    pattern = frappe.db.escape(f"%{escape_like(search_text)}%")
+    fields = ["name", "subject", "raised_by", "customer"]
+    return "({})".format(
+        " or ".join(f"`tabHD Ticket`.`{field}` like {pattern}" for field in fields)
+    )
+
+
+def get_ranked_ticket_names(conditions, against, start, page_length):
+    """
+    Get one page of the tickets meeting the conditions, best matches first
+
+    The conditions limit the tickets in a subquery, the ranking and paging
+    run on the search index.
+    """
+    visible = frappe.get_all("HD Ticket", filters=conditions, fields=["name"], run=0)
+    match = get_match_expression(against)
+
+    return frappe.db.sql_list(
+        f"""
+        SELECT ticket
+        FROM `{SEARCH_INDEX_TABLE}`
+        WHERE {match}
+            AND ticket IN ({visible})
+        ORDER BY {match} DESC, ticket ASC
+        LIMIT %(start)s, %(page_length)s
+    """,
+        {"start": int(start), "page_length": int(page_length)},
+    )
+
+
+def get_ticket_search_values(doc):
+    """Collect the text of a ticket that should be searchable"""
+    customer_name = None
+    if doc.get("customer"):
+        customer_name = (
+            frappe.db.get_value("HD Customer", doc.customer, "customer_name")
+            or doc.customer
+        )
+
+    contact_name = None
+    if doc.get("contact"):
+        contact_name = (
+            frappe.db.get_value("Contact", doc.contact, "full_name") or doc.contact
+        )
+
+    return {
+        "subject": doc.get("subject"),
+        "content": strip_html_tags(doc.get("description") or ""),
+        "customer_name": customer_name,
+        "contact_name": contact_name,
+        "raised_by": doc.get("raised_by"),
+    }
+
+
+def update_ticket_search_index(doc, method=None):
+    """Keep the search index row of a ticket in sync (HD Ticket on_update)"""
+    try:
+        values = get_ticket_search_values(doc)
+
+        if frappe.db.exists(SEARCH_INDEX_DOCTYPE, doc.name):
+            frappe.db.set_value(
+                SEARCH_INDEX_DOCTYPE, doc.name, values, update_modified=False
+            )
+        else:
+            frappe.get_doc(
+                {
+                    "doctype": SEARCH_INDEX_DOCTYPE,
+                    "name": doc.name,
+                    "ticket": doc.name,
+                    **values,
+                }
+            ).db_insert()
+    except Exception as e:
+        # Search must never block saving a ticket
+        frappe.log_error(
+            f"Error indexing ticket {doc.name}: {str(e)}", "Ticket Search Index Error"
+        )
+
+
+def refresh_name_in_search_index(doc, method=None, *args):
+    """
+    HD Customer / Contact on_update and after_rename: update the name their
+    tickets are indexed with
+    """
+    link, name_field, column = SEARCH_NAME_SOURCES[doc.doctype]
+    if method == "on_update" and not doc.has_value_changed(name_field):
+        return
+
+    frappe.db.sql(
+        f"""
+        UPDATE `{SEARCH_INDEX_TABLE}` s
+        INNER JOIN `tabHD Ticket` t ON t.name = s.ticket
+        SET s.`{column}` = %(label)s
+        WHERE t.`{link}` = %(name)s
+    """,
+        {"label": doc.get(name_field) or doc.name, "name": doc.name},
+    )
+
+
+def remove_ticket_search_index(doc, method=None):
+    """Drop the search index row of a deleted ticket (HD Ticket on_trash)"""
+    frappe.db.delete(SEARCH_INDEX_DOCTYPE, {"ticket": doc.name})
+
+
+def setup_ticket_search_index():
+    """Create the FULLTEXT index and backfill it if empty (after_migrate)"""
+    if frappe.db.db_type != "mariadb":
+        return
+
+    if not frappe.db.table_exists(SEARCH_INDEX_DOCTYPE):
+        return
+
+    existing = frappe.db.sql(
+        f"SHOW INDEX FROM `{SEARCH_INDEX_TABLE}` WHERE Key_name = %s",
+        FULLTEXT_INDEX_NAME,
+    )
+    if not existing:
+        frappe.db.sql_ddl(
+            f"ALTER TABLE `{SEARCH_INDEX_TABLE}` "
+            f"ADD FULLTEXT INDEX `{FULLTEXT_INDEX_NAME}` ({', '.join(FULLTEXT_COLUMNS)})"
+        )
+        # Searches switch from the LIKE fallback to the index
+        refresh_capabilities()
+
+    if frappe.db.exists("DocType", "HD Ticket") and not frappe.db.count(
+        SEARCH_INDEX_DOCTYPE
+    ):
+        frappe.enqueue(
+            "on_desk.utils.ticket_search.rebuild_ticket_search_index",
+            queue="long",
+            job_id="on_desk_rebuild_ticket_search_index",
+            deduplicate=True,
+        )
+
+
+def rebuild_ticket_search_index():
+    """Re-index every ticket in chunks"""
+    last_name = None
+
+    while True:
+        filters = {"name": [">", last_name]} if last_name else {}
+        names = frappe.get_all(
+            "HD Ticket",
+            filters=filters,
+            order_by="name asc",
+            limit=REBUILD_CHUNK_SIZE,
+            pluck="name",
+        )
+        if not names:
+            break
+
+        for name in names:
+            update_ticket_search_index(frappe.get_doc("HD Ticket", name))
+
+        frappe.db.commit()
+        last_name = names[-1]
@@ -48,3 +48,74 @@ def get_whatsapp_integration(throw_if_not_found=False):
         frappe.throw(_("WhatsApp integration is not configured"))
     
     return integration
+
+
+# Outbound sender pool
+# --------------------
+# Meta keeps a customer's 24 hour service window on the business number they
+# wrote to, so a conversation is pinned to that number for as long as the
+# window can be open.
+
+CONVERSATION_SENDER_TTL = 24 * 60 * 60
+
+
+def normalize_phone_number(phone_number):
+    """Strip everything but digits so cache keys match across formats"""
+    return "".join(c for c in (phone_number or "") if c.isdigit())
+
+
+def get_conversation_sender_key(phone_number):
+    return f"on_desk:whatsapp_sender:{normalize_phone_number(phone_number)}"
+
+
+def remember_conversation_sender(phone_number, phone_number_id):
+    """
+    Pin a customer's conversation to a business phone number.
+
+    Args:
+        phone_number (str): The customer's phone number
+        phone_number_id (str): The Meta phone number ID the conversation uses
+    """
+    if not phone_number or not phone_number_id:
+        return
+
+    frappe.cache().set_value(
+        get_conversation_sender_key(phone_number),
+        phone_number_id,
+        expires_in_sec=CONVERSATION_SENDER_TTL,
+    )
+
+
+def get_conversation_sender(phone_number):
+    """
+    Get the business phone number ID a customer last wrote to.
+
+    Returns:
+        str: The Meta phone number ID or None if the conversation is not pinned
+    """
+    if not phone_number:
+        return None
+
+    phone_number_id = frappe.cache().get_value(get_conversation_sender_key(phone_number))
+    if phone_number_id:
+        return phone_number_id
+
+    # Fall back to the last incoming message when the cache was flushed
+    digits = normalize_phone_number(phone_number)
+    phone_number_id = frappe.db.get_value(
+        "OD Social Media Message",
+        {
+            "channel": "WhatsApp",
+            "direction": "Incoming",
+            "from_number": ["in", [digits, f"+{digits}"]],
+            "phone_number_id": ["is", "set"],
+            "creation": [">", frappe.utils.add_to_date(None, seconds=-CONVERSATION_SENDER_TTL)],
+        },
+        "phone_number_id",
+        order_by="creation desc",
+    )
+
+    if phone_number_id:
+        remember_conversation_sender(phone_number, phone_number_id)
+
+    return phone_number_id
@@ -1,55 +1,26 @@
 import frappe
 from frappe import _
-from frappe.utils import get_gravatar
+from on_desk.utils.dashboard_counters import get_dashboard_counters
+from on_desk.utils.page_context import build_page_context
+from on_desk.utils.response_times import (
+    format_duration,
+    get_response_time_percentiles,
+)
 
 
 def get_context(context):
-    context.no_cache = 1
-
-    # Check if user is logged in
-    if frappe.session.user == "Guest":
-        frappe.local.flags.redirect_location = "/login"
-        raise frappe.Redirect
-
-    # Get user information
-    user = frappe.get_doc("User", frappe.session.user)
-    context.user_full_name = user.full_name
-    context.user_first_name = user.first_name or user.full_name.split(" ")[0]
-    context.user_image = user.user_image or get_gravatar(user.email)
-
-    # Get user role
-    user_roles = frappe.get_roles(frappe.session.user)
-    if "Administrator" in user_roles:
-        context.user_role = "Administrator"
-    elif "System Manager" in user_roles:
-        context.user_role = "System Manager"
-    elif "Helpdesk Manager" in user_roles:
-        context.user_role = "Helpdesk Manager"
-    elif "Helpdesk Agent" in user_roles:
-        context.user_role = "Helpdesk Agent"
-    else:
-        context.user_role = "User"
-
-    # Get app settings
-    context.app_name = frappe_get_website_settings("app_name") or "On Desk"
-    context.app_logo = "/assets/on_desk/img/icons/logo1.png"
-    context.dark_mode = True
-
-    # Set current page for sidebar highlighting
-    context.current_page = "dashboard"
-    context.page_title = "Dashboard"
+    build_page_context(context, "dashboard", "Dashboard")
 
     # Get dashboard statistics
     try:
-        # This is a placeholder for future implementation
-        # When we create the Ticket doctype, we'll update this to fetch real data
         context.stats = get_dashboard_stats()
 
         # For backward compatibility
         context.open_tickets = context.stats["in_progress_tickets"]
         context.resolved_today = context.stats["resolved_tickets"]
-        context.avg_response_time = "1.8h"
-        context.total_customers = "156"
+        context.response_times = get_response_times()
+        context.avg_response_time = context.response_times["first_response_p50"]
+        context.total_customers = context.stats["total_customers"]
 
         # Get recent activities
         context.activities = get_recent_activities()
@@ -59,34 +30,47 @@ def get_context(context):
         context.open_tickets = "N/A"
         context.resolved_today = "N/A"
         context.avg_response_time = "N/A"
+        context.response_times = {
+            "first_response_p50": "N/A",
+            "first_response_p90": "N/A",
+            "resolution_p50": "N/A",
+            "resolution_p90": "N/A",
+        }
         context.total_customers = "N/A"
         context.stats = {
             "total_tickets": 0,
             "resolved_tickets": 0,
             "in_progress_tickets": 0,
             "overdue_tickets": 0,
+            "total_customers": 0,
         }
         context.activities = []
 
     return context
 
 
-def frappe_get_website_settings(key):
-    """Helper function to get website settings"""
-    try:
-        return frappe.db.get_single_value("Website Settings", key)
-    except:
-        return None
+def get_dashboard_stats():
+    """Get dashboard statistics from the counters kept in Redis"""
+    # Import here to avoid circular import
+    from on_desk.api import get_user_ticket_scope
 
+    return get_dashboard_counters(get_user_ticket_scope())
 
-def get_dashboard_stats():
-    """Get dashboard statistics"""
-    # In a real implementation, this would fetch actual data from the database
+
+def get_response_times(days=7):
+    """Get p50 and p90 first response and resolution times of the last week"""
+    # Import here to avoid circular import
+    from on_desk.api import get_user_ticket_scope
+
+    # Sketches are kept per team, other scopes see every ticket's times
+    scope = get_user_ticket_scope()
+    teams = [token[5:] for token in scope if token.startswith("team:")] or None
+
+    percentiles = get_response_time_percentiles(teams, days)
     return {
-        "total_tickets": 248,
-        "resolved_tickets": 192,
-        "in_progress_tickets": 42,
-        "overdue_tickets": 14,
+        f"{metric}_{q}": format_duration(values[q])
+        for metric, values in percentiles.items()
+        for q in ("p50", "p90")
     }
 
 
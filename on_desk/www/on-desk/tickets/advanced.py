@@ -1,70 +1,85 @@
 import frappe
 from frappe import _
-from frappe.utils import get_gravatar
+from on_desk.utils.page_context import (
+    build_page_context,
+    get_filter_options_for_context,
+)
+
+# Tickets rendered with the page, the same page size the list pages with
+INITIAL_PAGE_SIZE = 20
 
 
 def get_context(context):
     """Get context for advanced tickets page"""
-    context.no_cache = 1
-
-    # Check if user is logged in
-    if frappe.session.user == "Guest":
-        frappe.local.flags.redirect_location = "/login"
-        raise frappe.Redirect
-
-    # Get user information
-    user = frappe.get_doc("User", frappe.session.user)
-    context.user_full_name = user.full_name
-    context.user_first_name = user.first_name or user.full_name.split(" ")[0]
-    context.user_image = user.user_image or get_gravatar(user.email)
-
-    # Get user role
-    user_roles = frappe.get_roles(frappe.session.user)
-    if "Administrator" in user_roles:
-        context.user_role = "Administrator"
-    elif "System Manager" in user_roles:
-        context.user_role = "System Manager"
-    elif "Helpdesk Manager" in user_roles:
-        context.user_role = "Helpdesk Manager"
-    elif "Helpdesk Agent" in user_roles:
-        context.user_role = "Helpdesk Agent"
-    else:
-        context.user_role = "User"
-
-    # Get app settings
-    context.app_name = (
-        frappe.db.get_single_value("Website Settings", "app_name") or "On Desk"
-    )
-    context.app_logo = "/assets/on_desk/img/icons/logo1.png"
-    context.dark_mode = True
-
-    # Set current page for sidebar highlighting
-    context.current_page = "tickets"
-    context.page_title = "Tickets - Advanced"
+    build_page_context(context, "tickets", "Tickets - Advanced")
 
     # Advanced filtering is always enabled for this page
     context.use_advanced_filtering = True
-    context.tickets = []  # Will be loaded via AJAX
     context.filter_options = get_filter_options_for_context()
+    context.initial_state = get_initial_state(context.filter_options)
 
     return context
 
 
-def get_filter_options_for_context():
-    """Get filter options for the frontend context"""
+def get_initial_state(filter_options):
+    """
+    Get the state the ticket list starts from: filter options, presets, the
+    default preset and the first page of tickets, so the page renders without
+    any API call.
+    """
     try:
-        from on_desk.api import get_filter_options
-        
-        result = get_filter_options()
-        if result.get("success"):
-            return result.get("options", {})
-        return {}
-    except Exception:
-        return {
-            "statuses": [{"name": "All", "label": "All Statuses"}],
-            "priorities": [{"name": "All", "label": "All Priorities"}],
-            "agent_groups": [{"name": "All", "label": "All Teams"}],
-            "ticket_types": [{"name": "All", "label": "All Types"}],
-            "customers": [{"name": "All", "label": "All Customers"}],
-            "agents": [{"name": "All", "label": "All Agents"}],
+        # Import here to avoid circular import
+        from on_desk.api import (
+            DEFAULT_COMPACT_FIELDS,
+            get_filter_presets,
+            get_tickets_advanced,
+        )
+
+        presets = get_filter_presets().get("presets") or []
+        default_preset = next((preset for preset in presets if preset.is_default), None)
+
+        query = {
+            "filters": {},
+            "search_text": "",
+            "sort_by": "modified",
+            "sort_order": "desc",
+        }
+        if default_preset:
+            query.update(
+                {
+                    "filters": default_preset.filters or {},
+                    "search_text": default_preset.search_text or "",
+                    "sort_by": default_preset.sort_by or "modified",
+                    "sort_order": default_preset.sort_order or "desc",
+                }
+            )
+
+        tickets = get_tickets_advanced(
+            filters=query["filters"],
+            search_text=query["search_text"],
+            sort_by=query["sort_by"],
+            sort_order=query["sort_order"],
+            page=1,
+            page_size=INITIAL_PAGE_SIZE,
+            response_format="compact",
+            fields=DEFAULT_COMPACT_FIELDS,
+        )
+        if not tickets.get("success"):
+            tickets = None
+
+        state = {
+            "filter_options": filter_options,
+            "presets": presets,
+            "default_preset": default_preset.name if default_preset else None,
+            "query": query,
+            "page_size": INITIAL_PAGE_SIZE,
+            "tickets": tickets,
         }
+    except Exception as e:
+        frappe.log_error(
+            f"Error building initial ticket state: {str(e)}", "Advanced Tickets Error"
+        )
+        state = {"filter_options": filter_options}
+
+    # Inlined in a script tag, "</" must not end it early
+    return frappe.as_json(state, indent=None).replace("</", "<\\/")
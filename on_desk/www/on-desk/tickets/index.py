@@ -1,45 +1,18 @@
 import frappe
 from frappe import _
-from frappe.utils import get_gravatar, pretty_date
+from frappe.utils import pretty_date
+from on_desk.utils.capabilities import has_doctype
+from on_desk.utils.page_context import (
+    build_page_context,
+    get_filter_options_for_context,
+)
 
+# Tickets rendered with the page, the rest are loaded as the user scrolls
+TICKETS_PAGE_SIZE = 25
 
-def get_context(context):
-    context.no_cache = 1
-
-    # Check if user is logged in
-    if frappe.session.user == "Guest":
-        frappe.local.flags.redirect_location = "/login"
-        raise frappe.Redirect
-
-    # Get user information
-    user = frappe.get_doc("User", frappe.session.user)
-    context.user_full_name = user.full_name
-    context.user_first_name = user.first_name or user.full_name.split(" ")[0]
-    context.user_image = user.user_image or get_gravatar(user.email)
-
-    # Get user role
-    user_roles = frappe.get_roles(frappe.session.user)
-    if "Administrator" in user_roles:
-        context.user_role = "Administrator"
-    elif "System Manager" in user_roles:
-        context.user_role = "System Manager"
-    elif "Helpdesk Manager" in user_roles:
-        context.user_role = "Helpdesk Manager"
-    elif "Helpdesk Agent" in user_roles:
-        context.user_role = "Helpdesk Agent"
-    else:
-        context.user_role = "User"
-
-    # Get app settings
-    context.app_name = (
-        frappe.db.get_single_value("Website Settings", "app_name") or "On Desk"
-    )
-    context.app_logo = "/assets/on_desk/img/icons/logo1.png"
-    context.dark_mode = True
 
-    # Set current page for sidebar highlighting
-    context.current_page = "tickets"
-    context.page_title = "Tickets"
+def get_context(context):
+    build_page_context(context, "tickets", "Tickets")
 
     # Check if we should use advanced filtering
     use_advanced = frappe.form_dict.get("advanced", "0") == "1"
@@ -53,8 +26,12 @@ def get_context(context):
         # Use legacy filtering for backward compatibility
         context.use_advanced_filtering = False
 
-        # Get tickets
-        context.tickets = get_tickets()
+        # Default filters
+        context.current_filter = frappe.form_dict.get("status", "All")
+
+        # Get the first page of tickets, newest first
+        context.tickets, context.next_cursor = get_tickets(context.current_filter)
+        context.page_size = TICKETS_PAGE_SIZE
 
         # Get ticket statuses for filtering
         context.statuses = get_ticket_statuses()
@@ -62,166 +39,37 @@ def get_context(context):
         # Get ticket priorities for filtering
         context.priorities = get_ticket_priorities()
 
-        # Default filters
-        context.current_filter = frappe.form_dict.get("status", "All")
-
-        # Apply filters if provided
-        if context.current_filter != "All":
-            context.tickets = [
-                t for t in context.tickets if t.status == context.current_filter
-            ]
-
-        # Sort tickets by creation date (newest first)
-        context.tickets.sort(key=lambda x: x.creation, reverse=True)
-
     return context
 
 
-def get_filter_options_for_context():
-    """Get filter options for the frontend context"""
-    try:
-        from on_desk.api import get_filter_options
-
-        result = get_filter_options()
-        if result.get("success"):
-            return result.get("options", {})
-        return {}
-    except Exception:
-        return {
-            "statuses": [{"name": "All", "label": "All Statuses"}],
-            "priorities": [{"name": "All", "label": "All Priorities"}],
-            "agent_groups": [{"name": "All", "label": "All Teams"}],
-            "ticket_types": [{"name": "All", "label": "All Types"}],
-            "customers": [{"name": "All", "label": "All Customers"}],
-            "agents": [{"name": "All", "label": "All Agents"}],
-        }
+def get_tickets(status="All"):
+    """
+    Get the first page of tickets for the current user
 
+    Uses the same scoped, indexed query as the advanced ticket list, the
+    following pages are loaded by the page script as the user scrolls.
 
-def get_tickets():
-    """Get tickets for the current user"""
+    Returns:
+        tuple: (tickets, next_cursor)
+    """
     try:
-        # Check if HD Ticket DocType exists
-        if not frappe.db.exists("DocType", "HD Ticket"):
-            # Return sample data if DocType doesn't exist
-            return get_sample_tickets()
-
-        user_roles = frappe.get_roles(frappe.session.user)
-
-        # Different query based on user role
-        if any(
-            role in user_roles
-            for role in ["Administrator", "System Manager", "Helpdesk Manager"]
-        ):
-            # Admins and managers can see all tickets
-            tickets = frappe.get_all(
-                "HD Ticket",
-                fields=[
-                    "name",
-                    "subject",
-                    "status",
-                    "priority",
-                    "creation",
-                    "modified",
-                    "raised_by",
-                    "contact",
-                    "customer",
-                ],
-                order_by="creation desc",
-            )
-        elif "Helpdesk Agent" in user_roles:
-            # Agents can see tickets assigned to them or their team
-            agent_groups = []
-            if frappe.db.exists("DocType", "HD Agent Group Member"):
-                agent_groups = frappe.get_all(
-                    "HD Agent Group Member",
-                    filters={"user": frappe.session.user},
-                    fields=["parent"],
-                )
-            agent_group_names = [d.parent for d in agent_groups]
-
-            if agent_group_names:
-                tickets = frappe.get_all(
-                    "HD Ticket",
-                    filters=[
-                        ["HD Ticket", "agent_group", "in", agent_group_names],
-                        ["HD Ticket", "_assign", "like", f"%{frappe.session.user}%"],
-                    ],
-                    fields=[
-                        "name",
-                        "subject",
-                        "status",
-                        "priority",
-                        "creation",
-                        "modified",
-                        "raised_by",
-                        "contact",
-                        "customer",
-                    ],
-                    order_by="creation desc",
-                )
-            else:
-                tickets = frappe.get_all(
-                    "HD Ticket",
-                    filters=[
-                        ["HD Ticket", "_assign", "like", f"%{frappe.session.user}%"],
-                    ],
-                    fields=[
-                        "name",
-                        "subject",
-                        "status",
-                        "priority",
-                        "creation",
-                        "modified",
-                        "raised_by",
-                        "contact",
-                        "customer",
-                    ],
-                    order_by="creation desc",
-                )
-        else:
-            # Regular users can only see their own tickets
-            tickets = frappe.get_all(
-                "HD Ticket",
-                filters={"raised_by": frappe.session.user},
-                fields=[
-                    "name",
-                    "subject",
-                    "status",
-                    "priority",
-                    "creation",
-                    "modified",
-                    "raised_by",
-                    "contact",
-                    "customer",
-                ],
-                order_by="creation desc",
-            )
-
-        # Enhance ticket data
-        for ticket in tickets:
-            ticket.creation_formatted = pretty_date(ticket.creation)
-            ticket.modified_formatted = pretty_date(ticket.modified)
-
-            # Get status color
-            ticket.status_color = get_status_color(ticket.status)
-
-            # Get priority color
-            ticket.priority_color = get_priority_color(ticket.priority)
-
-            # Get customer name if available
-            if ticket.customer and frappe.db.exists("DocType", "HD Customer"):
-                try:
-                    customer_doc = frappe.get_cached_doc("HD Customer", ticket.customer)
-                    ticket.customer_name = customer_doc.name
-                except:
-                    ticket.customer_name = ticket.raised_by
-            else:
-                ticket.customer_name = ticket.raised_by
-
-        return tickets
+        from on_desk.api import get_tickets_advanced
+
+        result = get_tickets_advanced(
+            filters={"status": status},
+            sort_by="creation",
+            sort_order="desc",
+            pagination="cursor",
+            page_size=TICKETS_PAGE_SIZE,
+        )
+        if not result.get("success"):
+            frappe.log_error(f"Error fetching tickets: {result.get('message')}")
+            return get_sample_tickets(), None
+
+        return result.get("tickets", []), result.get("next_cursor")
     except Exception as e:
         frappe.log_error(f"Error fetching tickets: {str(e)}")
-        return get_sample_tickets()
+        return get_sample_tickets(), None
 
 
 def get_sample_tickets():
@@ -302,7 +150,7 @@ def get_priority_color(priority):
 def get_ticket_statuses():
     """Get all ticket statuses"""
     try:
-        if frappe.db.exists("DocType", "HD Ticket Status"):
+        if has_doctype("HD Ticket Status"):
             statuses = frappe.get_all(
                 "HD Ticket Status", fields=["name", "color"], order_by="name"
             )
@@ -329,7 +177,7 @@ def get_ticket_statuses():
 def get_ticket_priorities():
     """Get all ticket priorities"""
     try:
-        if frappe.db.exists("DocType", "HD Ticket Priority"):
+        if has_doctype("HD Ticket Priority"):
             priorities = frappe.get_all(
                 "HD Ticket Priority", fields=["name", "color"], order_by="name"
             )
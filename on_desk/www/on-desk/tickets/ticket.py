@@ -1,45 +1,12 @@
 import frappe
 from frappe import _
 from frappe.utils import get_gravatar, pretty_date
+from on_desk.utils.capabilities import has_doctype
+from on_desk.utils.page_context import build_page_context
 
 
 def get_context(context):
-    context.no_cache = 1
-
-    # Check if user is logged in
-    if frappe.session.user == "Guest":
-        frappe.local.flags.redirect_location = "/login"
-        raise frappe.Redirect
-
-    # Get user information
-    user = frappe.get_doc("User", frappe.session.user)
-    context.user_full_name = user.full_name
-    context.user_first_name = user.first_name or user.full_name.split(" ")[0]
-    context.user_image = user.user_image or get_gravatar(user.email)
-
-    # Get user role
-    user_roles = frappe.get_roles(frappe.session.user)
-    if "Administrator" in user_roles:
-        context.user_role = "Administrator"
-    elif "System Manager" in user_roles:
-        context.user_role = "System Manager"
-    elif "Helpdesk Manager" in user_roles:
-        context.user_role = "Helpdesk Manager"
-    elif "Helpdesk Agent" in user_roles:
-        context.user_role = "Helpdesk Agent"
-    else:
-        context.user_role = "User"
-
-    # Get app settings
-    context.app_name = (
-        frappe.db.get_single_value("Website Settings", "app_name") or "On Desk"
-    )
-    context.app_logo = "/assets/on_desk/img/icons/logo1.png"
-    context.dark_mode = True
-
-    # Set current page for sidebar highlighting
-    context.current_page = "tickets"
-    context.page_title = "Ticket Details"
+    build_page_context(context, "tickets", "Ticket Details")
 
     # Get ticket ID from URL
     ticket_id = frappe.form_dict.get("ticket_id")
@@ -48,7 +15,7 @@ def get_context(context):
         raise frappe.Redirect
 
     # Check if HD Ticket DocType exists
-    if not frappe.db.exists("DocType", "HD Ticket"):
+    if not has_doctype("HD Ticket"):
         # If the DocType doesn't exist, redirect to tickets list
         frappe.local.flags.redirect_location = "/on-desk/tickets"
         raise frappe.Redirect
@@ -208,7 +175,7 @@ def get_priority_color(priority):
 def get_ticket_statuses():
     """Get all ticket statuses"""
     try:
-        if frappe.db.exists("DocType", "HD Ticket Status"):
+        if has_doctype("HD Ticket Status"):
             statuses = frappe.get_all(
                 "HD Ticket Status", fields=["name", "color"], order_by="name"
             )
@@ -235,7 +202,7 @@ def get_ticket_statuses():
 def get_ticket_priorities():
     """Get all ticket priorities"""
     try:
-        if frappe.db.exists("DocType", "HD Ticket Priority"):
+        if has_doctype("HD Ticket Priority"):
             priorities = frappe.get_all(
                 "HD Ticket Priority", fields=["name", "color"], order_by="name"
             )
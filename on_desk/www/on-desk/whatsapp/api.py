@@ -1,6 +1,13 @@
 import frappe
 from frappe import _
-from frappe.utils import pretty_date
+from frappe.utils import now_datetime, pretty_date
+from on_desk.utils.etag import (
+    NOT_MODIFIED,
+    conditional_get,
+    get_resource_version,
+    is_not_modified,
+    make_etag,
+)
 from on_desk.utils.whatsapp import get_whatsapp_integration
 
 
@@ -28,8 +35,16 @@ def get_contact_display_name(contact):
 
 
 @frappe.whitelist()
+@conditional_get
 def get_conversations():
     """Get recent WhatsApp conversations"""
+    # Message times are shown relative to now, so a copy is good for a minute
+    etag = make_etag(
+        get_resource_version("conversations"), now_datetime().strftime("%Y%m%d%H%M")
+    )
+    if is_not_modified(etag):
+        return NOT_MODIFIED
+
     # Get unique phone numbers from social media messages
     phone_numbers = frappe.db.sql(
         """
@@ -1,6 +1,7 @@
 import frappe
 from frappe import _
-from frappe.utils import get_gravatar, pretty_date
+from frappe.utils import pretty_date
+from on_desk.utils.page_context import build_page_context
 
 
 def get_contact_display_name(contact):
@@ -27,42 +28,7 @@ def get_contact_display_name(contact):
 
 
 def get_context(context):
-    context.no_cache = 1
-
-    # Check if user is logged in
-    if frappe.session.user == "Guest":
-        frappe.local.flags.redirect_location = "/login"
-        raise frappe.Redirect
-
-    # Get user information
-    user = frappe.get_doc("User", frappe.session.user)
-    context.user_full_name = user.full_name
-    context.user_first_name = user.first_name or user.full_name.split(" ")[0]
-    context.user_image = user.user_image or get_gravatar(user.email)
-
-    # Get user role
-    user_roles = frappe.get_roles(frappe.session.user)
-    if "Administrator" in user_roles:
-        context.user_role = "Administrator"
-    elif "System Manager" in user_roles:
-        context.user_role = "System Manager"
-    elif "Helpdesk Manager" in user_roles:
-        context.user_role = "Helpdesk Manager"
-    elif "Helpdesk Agent" in user_roles:
-        context.user_role = "Helpdesk Agent"
-    else:
-        context.user_role = "User"
-
-    # Get app settings
-    context.app_name = (
-        frappe.db.get_single_value("Website Settings", "app_name") or "On Desk"
-    )
-    context.app_logo = "/assets/on_desk/img/icons/logo1.png"
-    context.dark_mode = True
-
-    # Set current page for sidebar highlighting
-    context.current_page = "whatsapp"
-    context.page_title = "WhatsApp Integration"
+    build_page_context(context, "whatsapp", "WhatsApp Integration")
 
     # Get WhatsApp conversations
     context.conversations = get_whatsapp_conversations()